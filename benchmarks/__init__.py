@@ -0,0 +1,3 @@
+#====================================================================================================
+# BENCHMARKS - executar a partir da raiz do projeto: python -m benchmarks.<módulo>
+#====================================================================================================
@@ -0,0 +1,130 @@
+#====================================================================================================
+# TEMPO DE IMPORTAÇÃO DAS PÁGINAS: python -m benchmarks.bench_imports [--ref REVISÃO] [--repeat N]
+#====================================================================================================
+
+# Mede o custo de partida a frio de cada página: os imports do topo do script (lidos do próprio
+# arquivo) rodam num interpretador novo com `python -X importtime`, e o tempo da página é a soma do
+# tempo acumulado dos módulos importados diretamente por ela, sem os módulos que o interpretador
+# já carrega ao iniciar. Reporta o melhor de algumas execuções e os pacotes mais pesados de cada
+# página.
+#
+# Com --ref, a mesma medida é feita numa cópia da árvore em outra revisão do git (git archive) e
+# as duas são comparadas, para mostrar o ganho (ou a perda) de cada página.
+
+import argparse
+import ast
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+#====================================================================================================
+# CONSTANTES
+#====================================================================================================
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Scripts das páginas
+PAGES = {'Home': '📊Home.py',
+         'Country': 'pages/1_🌎Country.py',
+         'City': 'pages/2_🏙️City.py',
+         'Gastronomic': 'pages/3_🍽️Gastronomic.py',
+         'Nearby': 'pages/4_📍Nearby.py'}
+
+REPEAT = 5
+
+# Pacotes listados por página
+TOP_PACKAGES = 5
+
+# Linha do -X importtime: "import time:  self |  cumulative | <recuo>módulo"
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)')
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Comandos de import do topo de um script
+
+def page_imports(source):
+    arvore = ast.parse(source)
+
+    return '\n'.join(ast.get_source_segment(source, node) for node in arvore.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+# Módulos importados no nível 0 de um código (nome, tempo acumulado em ms), num interpretador novo
+
+def import_profile(codigo, cwd):
+    env = dict(os.environ, PYTHONPATH = cwd)
+    saida = subprocess.run([sys.executable, '-X', 'importtime', '-c', codigo], cwd = cwd, env = env,
+                           capture_output = True, text = True, check = True).stderr
+
+    return [(modulo, int(cumulativo) / 1000)
+            for _, cumulativo, recuo, modulo in IMPORTTIME_LINE.findall(saida) if len(recuo) == 0]
+
+# Perfil de uma página: tempo total (melhor das repetições) e tempo por pacote de topo
+
+def page_profile(script, cwd = ROOT, repeat = REPEAT):
+    with open(os.path.join(cwd, script), encoding = 'utf-8') as arquivo:
+        codigo = page_imports(arquivo.read())
+
+    partida = {modulo for modulo, _ in import_profile('pass', cwd)}
+
+    melhor = None
+    for _ in range(repeat):
+        perfil = [(modulo, ms) for modulo, ms in import_profile(codigo, cwd) if modulo not in partida]
+        if melhor is None or sum(ms for _, ms in perfil) < sum(ms for _, ms in melhor):
+            melhor = perfil
+
+    pacotes = pd.Series([ms for _, ms in melhor], index = [modulo.split('.')[0] for modulo, _ in melhor], dtype = float)
+
+    return pacotes.groupby(level = 0).sum().sort_values(ascending = False)
+
+# Tempo de importação de todas as páginas numa árvore
+
+def run(cwd = ROOT, repeat = REPEAT):
+    linhas = []
+    for page, script in PAGES.items():
+        if not os.path.exists(os.path.join(cwd, script)):
+            continue
+
+        pacotes = page_profile(script, cwd, repeat)
+        linhas.append({'pagina': page,
+                       'ms': pacotes.sum(),
+                       'pacotes': ', '.join(f'{nome} {ms:.0f}' for nome, ms in pacotes.head(TOP_PACKAGES).items())})
+
+    return pd.DataFrame(linhas)
+
+# Mesma medida numa outra revisão do git, extraída numa pasta temporária
+
+def run_ref(ref, repeat = REPEAT):
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivo = subprocess.run(['git', 'archive', '--format=tar', ref], cwd = ROOT, capture_output = True, check = True).stdout
+        subprocess.run(['tar', '-x', '-C', pasta], input = arquivo, check = True)
+
+        return run(pasta, repeat)
+
+#====================================================================================================
+# EXECUÇÃO
+#====================================================================================================
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--ref')
+    parser.add_argument('--repeat', type = int, default = REPEAT)
+    args = parser.parse_args()
+
+    atual = run(repeat = args.repeat)
+    print(atual.round(1).to_string(index = False))
+
+    if args.ref:
+        anterior = run_ref(args.ref, args.repeat)
+        print(f'\nComparação com {args.ref}:')
+        print(anterior.round(1).to_string(index = False))
+
+        comparacao = anterior[['pagina', 'ms']].merge(atual[['pagina', 'ms']], on = 'pagina', suffixes = ('_ref', ''))
+        comparacao['reducao_ms'] = comparacao['ms_ref'] - comparacao['ms']
+        print()
+        print(comparacao.round(1).to_string(index = False))
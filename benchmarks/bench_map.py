@@ -0,0 +1,58 @@
+#====================================================================================================
+# BENCHMARK DO MAPA DA HOME: python -m benchmarks.bench_map [escala]
+#====================================================================================================
+
+# Compara o mapa original (um folium.Marker por restaurante) com o mapa em lote
+# (FastMarkerCluster) e com o mapa por viewport (grupos pré-calculados no servidor): tempo de
+# construção, tempo de renderização do HTML e tamanho do HTML enviado ao navegador. A escala
+# replica o dataframe limpo N vezes.
+
+import sys
+import time
+
+import pandas as pd
+
+from fome_zero.data import load_clean_data
+from fome_zero.maps import build_fast_map, build_marker_map, build_tiled_map
+from fome_zero.tiles import EXPAND_ZOOM, WORLD_VIEW, build_pyramid
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+def measure(build, data):
+    inicio = time.perf_counter()
+    mapa = build(data)
+    construcao = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    html = mapa.get_root().render()
+    renderizacao = time.perf_counter() - inicio
+
+    return {'construcao_s': construcao, 'renderizacao_s': renderizacao, 'html_mb': len(html.encode('utf-8')) / 1024 ** 2}
+
+def run(escala = 1):
+    data = load_clean_data(compact = True)
+    if escala > 1:
+        data = pd.concat([data] * escala, ignore_index = True)
+
+    # A pirâmide é construída uma vez por versão dos dados; cada vista só consulta as células
+    pyramid = build_pyramid(data)
+    cidade = {'zoom': EXPAND_ZOOM + 1, 'bounds': [[28.60, 77.18], [28.65, 77.25]]}
+
+    resultados = {'marker (original)': measure(build_marker_map, data),
+                  'fast (em lote)': measure(build_fast_map, data),
+                  'tiled (mundo)': measure(lambda data: build_tiled_map(pyramid, WORLD_VIEW, points = lambda: data)[0], data),
+                  'tiled (Nova Délhi, zoom alto)': measure(lambda data: build_tiled_map(pyramid, cidade, points = lambda: data)[0], data)}
+
+    return pd.DataFrame(resultados).T
+
+#====================================================================================================
+# EXECUÇÃO
+#====================================================================================================
+
+if __name__ == '__main__':
+
+    escala = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    print(f'Restaurantes x{escala}')
+    print(run(escala).round(3).to_string())
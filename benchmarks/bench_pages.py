@@ -0,0 +1,260 @@
+#====================================================================================================
+# BENCHMARK DAS PÁGINAS: python -m benchmarks.bench_pages [escala ...] [--save arq.json] [--compare arq.json]
+#====================================================================================================
+
+# Mede, sem o Streamlit, o custo de cada etapa do app: leitura do CSV, verificação de qualidade,
+# limpeza, estruturas pré-calculadas (ponte de culinárias, cubo, cubo lido do CSV em blocos,
+# sketches do modo aproximado, pirâmide do mapa), agregações de cada página (primeira carga e troca do filtro de países),
+# consultas de fome_zero.queries fora do cache, gráficos de cada página e o mapa da Home. Para
+# cada etapa reporta o melhor tempo de algumas repetições e o pico de memória alocada
+# (tracemalloc, medido numa execução à parte para não distorcer o tempo). As escalas acima de 1
+# usam os arquivos de benchmarks.synthetic.
+#
+# Com --save os resultados são gravados em JSON; com --compare são comparados a um JSON anterior e
+# as etapas mais lentas que a tolerância são marcadas como regressão.
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.synthetic import write_synthetic
+from fome_zero import queries
+from fome_zero.charts import bar_avaliacao, bar_graph, bar_graph_city, treemap_graph
+from fome_zero.cube import build_cube
+from fome_zero.cuisines import CuisineBridge
+from fome_zero.data import clean_code, clean_code_vectorized, read_raw
+from fome_zero.incremental import CountryPartials, IncrementalRollup
+from fome_zero.leaders import build_leaders
+from fome_zero.maps import build_fast_map, build_marker_map, build_tiled_map
+from fome_zero.quality import check_quality
+from fome_zero.schema import compact_frame
+from fome_zero.sketches import build_sketches
+from fome_zero.streaming import stream_aggregates
+from fome_zero.tiles import WORLD_VIEW, build_pyramid
+
+#====================================================================================================
+# CONSTANTES
+#====================================================================================================
+
+# Rollups calculados por cada página (chaves e filtros de preço/nota), como nas páginas
+PAGE_ROLLUPS = {
+    'Home': [[], {}],
+    'Country': [['country', 'currency'], {}],
+    'City': [['country', 'city', 'currency'], {}],
+    'City < 2.5': [['country', 'city'], {'rating_buckets': ['< 2.5']}],
+    'City > 4': [['country', 'city'], {'rating_buckets': ['> 4']}],
+    'City caras': [['city'], {'price_types': ['Expensive', 'Gourmet'], 'rating_buckets': ['< 2.5', '2.5']}],
+    'City baratas': [['city'], {'price_types': ['Cheap', 'Normal'], 'rating_buckets': ['4', '> 4']}],
+    'Gastronomic': [['cuisines'], {}],
+    'Gastronomic caras': [['cuisines'], {'price_types': ['Expensive', 'Gourmet'], 'rating_buckets': ['< 2.5', '2.5']}],
+    'Gastronomic baratas': [['cuisines'], {'price_types': ['Normal', 'Cheap'], 'rating_buckets': ['4', '> 4']}],
+}
+
+PAGES = ['Home', 'Country', 'City', 'Gastronomic']
+
+# Consultas de fome_zero.queries chamadas por cada página (função e argumentos além dos países)
+PAGE_QUERIES = {
+    'Home': [(queries.overview, {}), (queries.top_restaurants, {'n': 10})],
+    'Country': [(queries.restaurants_per_country, {}), (queries.cities_per_country, {}), (queries.cuisines_per_country, {}),
+                (queries.top_countries_by_votes, {'n': 5}), (queries.rating_per_country, {}), (queries.cost_and_rating_per_country, {})],
+    'City': [(queries.top_city_per_country, {}), (queries.top_cities_by_rating, {'rating_buckets': ['< 2.5'], 'n': 7}),
+             (queries.top_cities_by_rating, {'rating_buckets': ['> 4'], 'n': 7}), (queries.top_cities_by_cuisines, {'n': 10}),
+             (queries.expensive_badly_rated_cities, {'n': 10}), (queries.cheap_well_rated_cities, {'n': 10})],
+    'Gastronomic': [(queries.top_cuisines, {'n': 10}), (queries.worst_rated_cuisines, {'n': 10}), (queries.best_rated_cuisines, {'n': 10}),
+                    (queries.expensive_badly_rated_cuisines, {'n': 20}), (queries.cheap_well_rated_cuisines, {'n': 20})],
+}
+
+# Repetições de cada etapa: até REPEAT execuções, enquanto o total ficar abaixo de REPEAT_SECONDS
+REPEAT = 5
+REPEAT_SECONDS = 1.0
+
+# Tolerância de --compare: tempo 20% maior que a referência (e pelo menos 5 ms a mais) é regressão
+TOLERANCE = 0.2
+MIN_DIFFERENCE_S = 0.005
+
+# O mapa original (um folium.Marker por restaurante) só é medido até esta escala
+MARKER_MAP_MAX_SCALE = 1
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Melhor tempo das repetições e pico de memória de uma execução à parte
+
+def measure(func, *args):
+    tempos = []
+    while len(tempos) < REPEAT and sum(tempos) < REPEAT_SECONDS:
+        gc.collect()
+        inicio = time.perf_counter()
+        result = func(*args)
+        tempos.append(time.perf_counter() - inicio)
+        del result
+
+    segundos = min(tempos)
+    gc.collect()
+    tracemalloc.start()
+    result = func(*args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, segundos, pico / 1024 ** 2
+
+# Rollups de uma página na primeira carga (parciais por país + soma de todos os países)
+
+def page_rollups(cube, page):
+    paises = list(cube['country'].unique())
+    rollups = {}
+
+    for name, (by, filtros) in PAGE_ROLLUPS.items():
+        if name.split(' ')[0] == page:
+            rollups[name] = IncrementalRollup(CountryPartials(cube, by, **filtros))
+            rollups[name].update(paises)
+
+    return rollups
+
+# Troca do filtro de países: retira o primeiro país (ou o devolve, se já foi retirado), para que
+# cada repetição da medida faça uma atualização de verdade
+
+def change_filter(rollups, paises):
+    return {name: rollup.update(paises[1:] if paises[0] in rollup.selection else paises)
+            for name, rollup in rollups.items()}
+
+# Consultas de uma página fora do cache de resultados (cubo e parciais já construídos)
+
+def page_queries(page, paises, path):
+    queries.clear_caches()
+
+    return [func(paises, path = path, **kwargs) for func, kwargs in PAGE_QUERIES[page]]
+
+# Top 10 da Home como a página o obtém: pelos candidatos (fome_zero.leaders), fora do cache de resultados
+
+def top_10(paises, path):
+    queries.top_restaurants.cache_clear()
+
+    return queries.top_restaurants(paises, n = 10, path = path)
+
+# Gráficos de uma página, com as mesmas entradas das páginas
+
+def page_figures(page, resultados):
+    figs = []
+
+    if page == 'Country':
+        por_pais = resultados['Country']
+        contagem = por_pais[['country', 'restaurants']].sort_values('restaurants', ascending = True)
+        figs.append(bar_graph(contagem, x = 'country', y = 'restaurants', color = 'country', text = 'restaurants'))
+        contagem = por_pais[['country', 'n_cuisines']].sort_values('n_cuisines', ascending = False)
+        figs.append(treemap_graph(contagem, path = 'country', value = 'n_cuisines', color = 'n_cuisines'))
+
+    elif page == 'City':
+        cidades = resultados['City'][['country', 'city', 'restaurants', 'n_cuisines']]
+        contagem = cidades.sort_values('restaurants', ascending = False).drop_duplicates('country')
+        figs.append(bar_graph_city(contagem, x = 'restaurants', y = 'city', color = 'country', text = 'restaurants'))
+        contagem = cidades.sort_values('n_cuisines', ascending = False).head(10)
+        figs.append(bar_graph_city(contagem, x = 'n_cuisines', y = 'city', color = 'country', text = 'n_cuisines'))
+
+    elif page == 'Gastronomic':
+        culinarias = resultados['Gastronomic'][['cuisines', 'aggregate_rating']]
+        contagem = culinarias.sort_values('aggregate_rating', ascending = False).head(10)
+        figs.append(bar_avaliacao(contagem, x = 'cuisines', y = 'aggregate_rating', color = 'aggregate_rating', text = 'aggregate_rating'))
+
+    return figs
+
+# Mapa construído e renderizado em HTML
+
+def render_map(build, *args):
+    mapa = build(*args)
+    mapa = mapa[0] if isinstance(mapa, tuple) else mapa
+
+    return mapa.get_root().render()
+
+# Todas as etapas numa escala
+
+def run_scale(escala):
+    path = write_synthetic(escala)
+    linhas = []
+
+    def etapa(nome, func, *args):
+        result, segundos, pico = measure(func, *args)
+        linhas.append({'escala': escala, 'etapa': nome, 'segundos': segundos, 'pico_mb': pico})
+        return result
+
+    df = etapa('read_csv', pd.read_csv, path)
+    etapa('clean_code', clean_code, df)
+    del df
+    df = etapa('read_csv (usecols)', read_raw, path)
+    etapa('qualidade dos dados', check_quality, df)
+    data = etapa('clean_code_vectorized', clean_code_vectorized, df)
+    del df
+    data = etapa('compact_frame', compact_frame, data)
+
+    bridge = etapa('ponte de culinárias', CuisineBridge, data['cuisine_list'])
+    cube = etapa('cubo', build_cube, data, bridge)
+    etapa('sketches (HyperLogLog e top-k)', build_sketches, data, bridge)
+    pyramid = etapa('pirâmide do mapa', build_pyramid, data)
+    etapa('candidatos do top 10', build_leaders, data)
+    etapa('agregados em streaming (uma passada pelo CSV)', stream_aggregates, path)
+
+    paises = list(cube['country'].unique())
+    for page in PAGES:
+        rollups = etapa(f'{page}: agregação', page_rollups, cube, page)
+        resultados = etapa(f'{page}: troca de filtro', change_filter, rollups, paises)
+        etapa(f'{page}: consultas', page_queries, page, paises, path)
+        if page == 'Home':
+            etapa('Home: top 10', top_10, paises, path)
+        else:
+            etapa(f'{page}: gráficos', page_figures, page, resultados)
+
+    if escala <= MARKER_MAP_MAX_SCALE:
+        etapa('Home: mapa (marker)', render_map, build_marker_map, data)
+    etapa('Home: mapa (fast)', render_map, build_fast_map, data)
+    etapa('Home: mapa (tiled)', render_map, build_tiled_map, pyramid, WORLD_VIEW)
+
+    return linhas
+
+# Compara com uma execução anterior (mesma escala e etapa)
+
+def compare(resultados, referencia, tolerancia = TOLERANCE):
+    atual = resultados.set_index(['escala', 'etapa'])
+    anterior = pd.DataFrame(referencia).set_index(['escala', 'etapa'])
+
+    comparacao = atual.join(anterior, rsuffix = '_ref', how = 'inner')
+    comparacao['razao'] = comparacao['segundos'] / comparacao['segundos_ref']
+    comparacao['regressao'] = ((comparacao['razao'] > 1 + tolerancia)
+                               & (comparacao['segundos'] - comparacao['segundos_ref'] > MIN_DIFFERENCE_S))
+
+    return comparacao[['segundos_ref', 'segundos', 'razao', 'pico_mb_ref', 'pico_mb', 'regressao']]
+
+def run(escalas = (1,)):
+    linhas = []
+    for escala in escalas:
+        linhas.extend(run_scale(escala))
+
+    return pd.DataFrame(linhas)
+
+#====================================================================================================
+# EXECUÇÃO
+#====================================================================================================
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('escalas', nargs = '*', type = int, default = [1, 10])
+    parser.add_argument('--save')
+    parser.add_argument('--compare')
+    args = parser.parse_args()
+
+    resultados = run(args.escalas)
+    print(resultados.round(4).to_string(index = False))
+
+    if args.save:
+        with open(args.save, 'w') as arquivo:
+            json.dump(resultados.to_dict('records'), arquivo, indent = 1, ensure_ascii = False)
+
+    if args.compare:
+        with open(args.compare) as arquivo:
+            comparacao = compare(resultados, json.load(arquivo))
+        print(comparacao.round(3).to_string())
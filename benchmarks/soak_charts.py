@@ -0,0 +1,99 @@
+#====================================================================================================
+# TESTE DE RESISTÊNCIA DOS GRÁFICOS: python -m benchmarks.soak_charts [reruns] [--every N]
+#====================================================================================================
+
+# Simula um servidor de longa duração: cada rerun monta um gráfico das páginas pela fábrica de
+# fome_zero.charts (sem o cache de gráficos, com as consultas já em cache) e o serializa em JSON,
+# como faz o cache do processo. Os gráficos e as seleções de países se alternam a cada rerun.
+# A cada N reruns são anotados a memória residente do processo (RSS), o número de objetos
+# rastreados pelo coletor e se o pyplot foi importado. Depois do aquecimento, a memória deve
+# ficar estável: um crescimento acima da tolerância é reportado como vazamento (código de saída 1).
+
+import argparse
+import gc
+import sys
+import time
+
+import pandas as pd
+
+from fome_zero import queries, views
+from fome_zero.data import DATA_PATH
+from fome_zero.instrument import rss_mb
+
+#====================================================================================================
+# CONSTANTES
+#====================================================================================================
+
+RERUNS = 10000
+
+# Intervalo entre as amostras (reruns)
+EVERY = 500
+
+# Amostras descartadas como aquecimento (caches, imports e alocações iniciais)
+WARMUP_SAMPLES = 2
+
+# Crescimento máximo aceito do RSS entre a primeira amostra após o aquecimento e a última
+TOLERANCE_MB = 20
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Seleções de países usadas nos reruns: todos, cada país sozinho e a metade dos países
+
+def selections(path = DATA_PATH):
+    paises = queries.country_list(path)
+
+    return [paises, paises[:len(paises) // 2]] + [[pais] for pais in paises]
+
+# Reruns com amostras de memória a cada `every`
+
+def soak(reruns = RERUNS, every = EVERY, path = DATA_PATH):
+    graficos = list(views.FIGURES.values())
+    selecoes = selections(path)
+    amostras = []
+
+    inicio = time.perf_counter()
+    for rerun in range(1, reruns + 1):
+        _, _, build = graficos[rerun % len(graficos)]
+        build(selecoes[rerun % len(selecoes)], path).to_json()
+
+        if rerun % every == 0 or rerun == reruns:
+            gc.collect()
+            amostras.append({'rerun': rerun,
+                             'segundos': time.perf_counter() - inicio,
+                             'rss_mb': rss_mb(),
+                             'objetos_gc': len(gc.get_objects()),
+                             'pyplot': 'matplotlib.pyplot' in sys.modules})
+
+    return pd.DataFrame(amostras)
+
+# Crescimento do RSS e dos objetos entre a primeira amostra após o aquecimento e a última
+
+def growth(amostras, warmup = WARMUP_SAMPLES):
+    estaveis = amostras.iloc[min(warmup, len(amostras) - 1):]
+
+    return (estaveis['rss_mb'].iloc[-1] - estaveis['rss_mb'].iloc[0],
+            estaveis['objetos_gc'].iloc[-1] - estaveis['objetos_gc'].iloc[0])
+
+#====================================================================================================
+# EXECUÇÃO
+#====================================================================================================
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('reruns', nargs = '?', type = int, default = RERUNS)
+    parser.add_argument('--every', type = int, default = EVERY)
+    parser.add_argument('--tolerance', type = float, default = TOLERANCE_MB)
+    args = parser.parse_args()
+
+    amostras = soak(args.reruns, args.every)
+    print(amostras.round(1).to_string(index = False))
+
+    rss, objetos = growth(amostras)
+    print(f'\nCrescimento após o aquecimento: {rss:+.1f} MB de RSS, {objetos:+d} objetos')
+
+    if rss > args.tolerance or amostras['pyplot'].any():
+        print('Memória não estabilizou (ou o pyplot foi importado)')
+        sys.exit(1)
@@ -0,0 +1,86 @@
+#====================================================================================================
+# DADOS SINTÉTICOS: python -m benchmarks.synthetic escala [escala ...]
+#====================================================================================================
+
+# Gera versões do zomato.csv com N vezes mais restaurantes. Cada cópia recebe ids novos (para
+# não ser descartada como duplicata na limpeza) e coordenadas deslocadas em até ~500 m; países,
+# cidades, culinárias, preços e notas seguem a distribuição do arquivo original. Os arquivos são
+# escritos cópia a cópia, sem montar o dataframe inteiro em memória, e reaproveitados enquanto
+# forem mais novos que o zomato.csv.
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from fome_zero.data import DATA_PATH
+
+#====================================================================================================
+# CONSTANTES
+#====================================================================================================
+
+# Pasta dos arquivos gerados (ignorada pelo git)
+SYNTHETIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# Deslocamento máximo das coordenadas de cada cópia (graus)
+JITTER_DEG = 0.005
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Caminho do arquivo sintético de uma escala (escala 1 é o próprio zomato.csv)
+
+def synthetic_path(escala):
+    if escala == 1:
+        return DATA_PATH
+
+    return os.path.join(SYNTHETIC_DIR, f'zomato_x{escala}.csv')
+
+# Uma cópia do dataframe original, com ids novos e coordenadas deslocadas
+
+def synthetic_copy(df, copia, rng):
+    if copia == 0:
+        return df
+
+    frame = df.copy()
+    frame['Restaurant ID'] = frame['Restaurant ID'] + copia * (int(df['Restaurant ID'].max()) + 1)
+    frame['Longitude'] = frame['Longitude'] + rng.uniform(-JITTER_DEG, JITTER_DEG, len(frame))
+    frame['Latitude'] = frame['Latitude'] + rng.uniform(-JITTER_DEG, JITTER_DEG, len(frame))
+
+    return frame
+
+# Gera (ou reaproveita) o arquivo de uma escala e devolve o caminho
+
+def write_synthetic(escala, seed = 0):
+    path = synthetic_path(escala)
+    if escala == 1:
+        return path
+
+    if os.path.exists(path) and os.stat(path).st_mtime_ns >= os.stat(DATA_PATH).st_mtime_ns:
+        return path
+
+    os.makedirs(SYNTHETIC_DIR, exist_ok = True)
+    df = pd.read_csv(DATA_PATH)
+    rng = np.random.default_rng(seed)
+
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        for copia in range(escala):
+            synthetic_copy(df, copia, rng).to_csv(tmp_path, mode = 'a', header = copia == 0, index = False)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return path
+
+#====================================================================================================
+# EXECUÇÃO
+#====================================================================================================
+
+if __name__ == '__main__':
+
+    for escala in map(int, sys.argv[1:] or ['10']):
+        print(write_synthetic(escala))
@@ -0,0 +1,3 @@
+#====================================================================================================
+# FOME ZERO - Pacote compartilhado pelas páginas do dashboard
+#====================================================================================================
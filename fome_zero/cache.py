@@ -0,0 +1,126 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+#====================================================================================================
+# CACHE DE RESULTADOS ENTRE SESSÕES
+#====================================================================================================
+
+# Um único cache por processo, compartilhado por todas as sessões do Streamlit, para resultados
+# de consultas (DataFrames) e gráficos serializados (JSON). As chaves levam a consulta, a seleção
+# de países e a versão do arquivo de dados; o tamanho de cada entrada é estimado na gravação e,
+# quando o total passa do orçamento, as entradas usadas há mais tempo são descartadas (LRU).
+
+# Orçamento padrão em MB (pode ser trocado pela variável de ambiente FOME_ZERO_CACHE_MB)
+DEFAULT_BUDGET_MB = 64
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Tamanho aproximado (bytes) de um valor guardado no cache
+
+def size_of(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep = True, index = True).sum())
+    if isinstance(value, (str, bytes)):
+        return len(value)
+
+    return sys.getsizeof(value)
+
+#====================================================================================================
+# CACHE
+#====================================================================================================
+
+class ResultCache:
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+
+    # Valor da chave (e a marca como usada agora); `default` se não estiver no cache
+
+    def get(self, key, default = None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    # Grava um valor e descarta os menos usados até caber no orçamento
+    #
+    # Um valor maior que o orçamento inteiro não é guardado.
+
+    def put(self, key, value):
+        tamanho = size_of(value)
+
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+
+            if tamanho > self.max_bytes:
+                return
+
+            self._entries[key] = (value, tamanho)
+            self.bytes += tamanho
+
+            while self.bytes > self.max_bytes:
+                _, (_, removido) = self._entries.popitem(last = False)
+                self.bytes -= removido
+                self.evictions += 1
+
+    # Valor da chave ou, se não estiver no cache, o resultado de compute() (que é gravado)
+    #
+    # O cálculo roda fora do lock: duas sessões pedindo a mesma chave ao mesmo tempo podem
+    # calcular o valor duas vezes, mas nenhuma espera pelo cálculo de outra chave.
+
+    def get_or_compute(self, key, compute):
+        faltando = object()
+        value = self.get(key, faltando)
+        if value is faltando:
+            value = compute()
+            self.put(key, value)
+
+        return value
+
+    # Remove todas as entradas ou só as que começam com `prefix` (primeiro elemento da chave)
+
+    def clear(self, prefix = None):
+        with self._lock:
+            for key in [key for key in self._entries if prefix is None or key[0] == prefix]:
+                self.bytes -= self._entries.pop(key)[1]
+
+    # Estatísticas de uso
+
+    def stats(self):
+        with self._lock:
+            consultas = self.hits + self.misses
+
+            return {'entries': len(self._entries),
+                    'bytes': self.bytes,
+                    'max_bytes': self.max_bytes,
+                    'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'hit_rate': self.hits / consultas if consultas else 0.0}
+
+# Cache do processo
+
+RESULT_CACHE = ResultCache(int(float(os.environ.get('FOME_ZERO_CACHE_MB', DEFAULT_BUDGET_MB)) * 1024 ** 2))
@@ -0,0 +1,110 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import plotly.io as pio
+
+from fome_zero.cache import RESULT_CACHE
+from fome_zero.data import DATA_PATH, data_version
+from fome_zero.instrument import span
+
+#====================================================================================================
+# GRÁFICOS DAS PÁGINAS
+#====================================================================================================
+
+# Funções de gráfico usadas pelas páginas, num módulo próprio para que possam ser importadas (e
+# medidas) sem o Streamlit. Todos os gráficos saem de uma única fábrica (make_figure), a partir
+# de modelos: a função do plotly.express, os argumentos fixos e os ajustes de traços e layout de
+# cada tipo de gráfico. Nenhum gráfico passa pelo pyplot, de modo que montar um gráfico não deixa
+# nada registrado fora do Figure devolvido. O plotly.express (~0,5 s de importação) só é
+# importado quando um gráfico é de fato montado: com o gráfico no cache, a página só precisa do
+# plotly.io.
+
+# Modelos por tipo de gráfico: função do plotly.express, argumentos fixos, update_traces e update_layout
+CHART_TEMPLATES = {
+    'bar': {'func': 'bar',
+            'kwargs': {'template': 'plotly_white', 'color_continuous_scale': 'YlGnBu'},
+            'traces': {'textangle': 0, 'textposition': 'outside'},
+            'layout': {'showlegend': False}},
+    'bar_city': {'func': 'bar',
+                 'kwargs': {'template': 'plotly_white', 'color_continuous_scale': 'YlGnBu'},
+                 'traces': {'textangle': 0, 'textposition': 'inside'},
+                 'layout': {}},
+    'bar_rating': {'func': 'bar',
+                   'kwargs': {'template': 'plotly_white', 'color_continuous_scale': 'YlGnBu'},
+                   'traces': {'textangle': 0, 'texttemplate': '%{text:.2f}'},
+                   'layout': {'coloraxis_showscale': False}},
+    'treemap': {'func': 'treemap',
+                'kwargs': {'template': 'plotly_white', 'color_continuous_scale': 'RdBu'},
+                'traces': {'texttemplate': '<b>%{label}</b><br>Qt. Culinárias: %{value}<br>'},
+                'layout': {}},
+    'funnel': {'func': 'funnel',
+               'kwargs': {'template': 'plotly_white'},
+               'traces': {},
+               'layout': {'showlegend': False}},
+}
+
+#====================================================================================================
+# FÁBRICA DE GRÁFICOS
+#====================================================================================================
+
+# Gráfico de um tipo de CHART_TEMPLATES com as colunas de `data` indicadas em `campos` (x, y, color...)
+
+def make_figure(kind, data, **campos):
+    import plotly.express as px
+
+    modelo = CHART_TEMPLATES[kind]
+
+    fig = getattr(px, modelo['func'])(data, **campos, **modelo['kwargs'])
+    fig.update_layout(**modelo['layout'])
+    fig.update_traces(**modelo['traces'])
+
+    # O plotly.express guarda os rótulos (text) como números, que a leitura do JSON (pio.from_json)
+    # converte em texto; convertidos aqui, o JSON do gráfico já sai igual ao do Figure que a página
+    # recebe do cache
+    for trace in fig.data:
+        if trace.text is not None:
+            trace.text = [str(texto) for texto in trace.text]
+
+    return fig
+
+# Gráfico de barras
+
+def bar_graph (data, x, y, color, text):
+    return make_figure('bar', data, x=x, y=y, color=color, text=text)
+
+# Gráfico treemap
+
+def treemap_graph(data, path, value, color):
+    return make_figure('treemap', data, path=[path], values=value, color=color)
+
+# Gráfico de barras cidade-país
+
+def bar_graph_city (data, x, y, color, text):
+    return make_figure('bar_city', data, x=x, y=y, color=color, text=text)
+
+# Gráfico de avaliação
+
+def bar_avaliacao(data, x, y, color, text):
+    return make_figure('bar_rating', data, x=x, y=y, color=color, text=text)
+
+# Gráfico guardado em JSON no cache do processo, com a chave (gráfico, versão do arquivo, países)
+#
+# build() só roda quando o gráfico não está no cache; devolve o JSON do cache, sem montar um
+# Figure (usado pela exportação estática, que grava o JSON direto).
+
+def cached_figure_json(name, countries, build, path = DATA_PATH):
+    key = (f'figure.{name}', data_version(path), tuple(sorted(countries)))
+
+    def compute():
+        with span('montagem'):
+            return build().to_json()
+
+    return RESULT_CACHE.get_or_compute(key, compute)
+
+# Gráfico do cache do processo (cached_figure_json); cada chamada recebe um Figure novo, lido do
+# JSON, que a página pode alterar sem afetar as outras sessões.
+
+def cached_figure(name, countries, build, path = DATA_PATH):
+    with span(f'gráfico {name}'):
+        return pio.from_json(cached_figure_json(name, countries, build, path = path))
@@ -0,0 +1,187 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import numpy as np
+import pandas as pd
+
+from fome_zero.cuisines import load_cuisine_bridge
+from fome_zero.data import CACHE_VERSIONS, DATA_PATH, data_version, load_clean_data, partition_paths, versioned_cache
+from fome_zero.ingest import reads_in_chunks
+from fome_zero.instrument import span
+from fome_zero.partitions import PARTITION_STRIDE, is_partitioned
+from fome_zero.ranking import rating_scores
+from fome_zero.schema import decategorize
+
+#====================================================================================================
+# CUBO DE MÉTRICAS PRÉ-AGREGADAS
+#====================================================================================================
+
+# Uma linha por combinação país x cidade x culinária x tipo de preço x faixa de nota, com somas e
+# contagens aditivas. A moeda entra na chave só para acompanhar o país (uma moeda por país).
+# Médias e contagens de qualquer seleção de países saem somando linhas do cubo, sem voltar aos
+# restaurantes; contagens distintas de países, cidades e culinárias são exatas, pois todas são chaves.
+#
+# O cubo é montado sobre a ponte restaurante <-> culinária: um restaurante entra uma vez em cada
+# culinária que oferece, e main_cuisine marca a linha da primeira culinária da lista. Rollups por
+# culinária usam todas as linhas; os demais somam as medidas só das linhas principais (cada
+# restaurante uma vez) e contam as culinárias distintas em todas.
+
+CUBE_KEYS = ['country', 'currency', 'city', 'cuisines', 'main_cuisine', 'price_type', 'rating_bucket']
+
+# Faixas de nota alinhadas aos cortes usados nas páginas (< 2.5, <= 2.5, >= 4 e > 4)
+RATING_BUCKETS = ['< 2.5', '2.5', '2.5 - 4', '4', '> 4']
+
+# Medidas aditivas (a nota é somada em décimos e o custo em dólar em centavos, inteiros, para que
+# as médias sejam exatas; cost_usd_restaurants conta só os restaurantes com moeda conhecida e
+# rating_votes_tenths soma nota x votos, base das notas ponderadas de fome_zero.ranking)
+MEASURES = ['restaurants', 'votes', 'rating_tenths', 'rating_votes_tenths', 'cost_sum', 'cost_usd_cents', 'cost_usd_restaurants',
+            'table_booking', 'online_delivery', 'delivering_now']
+
+# Chaves cuja contagem distinta acompanha os rollups
+DISTINCT_KEYS = {'country': 'n_countries', 'city': 'n_cities', 'cuisines': 'n_cuisines'}
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Faixa de nota de cada restaurante
+
+def rating_bucket(aggregate_rating):
+    rating = aggregate_rating.to_numpy()
+    bucket = np.select([rating < 2.5, rating == 2.5, rating < 4, rating == 4],
+                       RATING_BUCKETS[:4], default = RATING_BUCKETS[4])
+
+    return pd.Series(bucket, index = aggregate_rating.index, dtype = object)
+
+# Construção do cubo a partir do dataframe limpo e da ponte de culinárias
+#
+# As linhas ficam na ordem de primeira aparição no dataframe (first_row), a mesma usada pelas
+# páginas para listar países e escolher a primeira cidade/moeda. Só as colunas das chaves e
+# medidas são indexadas pela ponte, e apenas durante a construção.
+
+def build_cube(data, bridge):
+    linhas = bridge.restaurant
+    usd = data['average_cost_for_two_usd'].to_numpy(dtype = 'float64')
+    rating_tenths = np.rint(data['aggregate_rating'].to_numpy() * 10).astype('int64')
+    votes = data['votes'].to_numpy(dtype = 'int64')
+
+    frame = decategorize(data[['country', 'currency', 'city']]).iloc[linhas].reset_index(drop = True)
+    frame = frame.assign(cuisines = np.asarray(bridge.cuisine_names(), dtype = object),
+                         main_cuisine = bridge.main,
+                         price_type = data['price_type'].astype(str).to_numpy()[linhas],
+                         rating_bucket = rating_bucket(data['aggregate_rating']).to_numpy()[linhas],
+                         restaurants = 1,
+                         votes = votes[linhas],
+                         rating_tenths = rating_tenths[linhas],
+                         rating_votes_tenths = (rating_tenths * votes)[linhas],
+                         cost_sum = data['average_cost_for_two'].to_numpy(dtype = 'int64')[linhas],
+                         cost_usd_cents = np.rint(np.nan_to_num(usd) * 100).astype('int64')[linhas],
+                         cost_usd_restaurants = (~np.isnan(usd)).astype('int64')[linhas],
+                         table_booking = data['has_table_booking'].to_numpy(dtype = 'int64')[linhas],
+                         online_delivery = data['has_online_delivery'].to_numpy(dtype = 'int64')[linhas],
+                         delivering_now = data['is_delivering_now'].to_numpy(dtype = 'int64')[linhas],
+                         first_row = linhas.astype('int64'))
+
+    grouped = frame.groupby(CUBE_KEYS, sort = False)
+    cube = grouped[MEASURES].sum()
+    cube['first_row'] = grouped['first_row'].min()
+
+    return cube.reset_index()
+
+# Soma de cubos parciais (ex.: de blocos do arquivo), na ordem de primeira aparição das chaves
+
+def merge_cubes(cubes):
+    grouped = pd.concat(cubes, ignore_index = True).groupby(CUBE_KEYS, sort = False)
+    cube = grouped[MEASURES].sum()
+    cube['first_row'] = grouped['first_row'].min()
+
+    return cube.reset_index()
+
+# Cubo do arquivo de dados, construído uma única vez por versão (caminho + mtime)
+#
+# Um CSV grande sem snapshot em dia é lido em blocos (fome_zero.streaming), sem carregar o dataframe:
+# as páginas de país, cidade e culinária só dependem do cubo. Num diretório de partições, o cubo
+# é a soma dos cubos das partições dos países em `countries` (todas, se None).
+
+def load_cube(path = DATA_PATH, countries = None):
+    if is_partitioned(path):
+        return partition_cube(path, countries)
+
+    return _load_cube(*data_version(path))
+
+@versioned_cache(maxsize = CACHE_VERSIONS)
+def _load_cube(path, mtime_ns):
+    if reads_in_chunks(path):
+        # Importado aqui: fome_zero.streaming importa este módulo
+        from fome_zero.streaming import load_streamed
+        return load_streamed(path).cube
+
+    data, bridge = load_clean_data(path, compact = True), load_cuisine_bridge(path)
+    with span('cubo'):
+        return build_cube(data, bridge)
+
+# Soma dos cubos (um por partição, cada um em cache como o de um arquivo) das partições selecionadas
+#
+# O first_row de cada partição é deslocado pela sua posição entre todas as partições, para que a
+# ordem de primeira aparição não dependa da seleção. Sem partição selecionada, o cubo vem vazio.
+
+def partition_cube(path = DATA_PATH, countries = None):
+    todas = partition_paths(path)
+    cubos = []
+
+    for arquivo in partition_paths(path, countries):
+        cubo = load_cube(arquivo)
+        cubos.append(cubo.assign(first_row = cubo['first_row'] + todas.index(arquivo) * PARTITION_STRIDE))
+
+    if not cubos:
+        return load_cube(todas[0]).iloc[:0]
+
+    return merge_cubes(cubos)
+
+# Linhas do cubo que atendem aos filtros de país, tipo de preço e faixa de nota
+
+def select(cube, countries = None, price_types = None, rating_buckets = None):
+    linhas = np.ones(len(cube), dtype = bool)
+
+    if countries is not None:
+        linhas &= cube['country'].isin(countries).to_numpy()
+    if price_types is not None:
+        linhas &= cube['price_type'].isin(price_types).to_numpy()
+    if rating_buckets is not None:
+        linhas &= cube['rating_bucket'].isin(rating_buckets).to_numpy()
+
+    return cube.loc[linhas, :]
+
+# Linhas do cubo cujas medidas entram num rollup pelas chaves `by`
+#
+# Por culinária, todas (o restaurante conta em cada culinária que oferece); nos demais, só as
+# linhas da culinária principal, para que cada restaurante conte uma vez.
+
+def measure_rows(part, by):
+    if 'cuisines' in by:
+        return np.ones(len(part), dtype = bool)
+
+    return part['main_cuisine'].to_numpy(dtype = bool)
+
+# Rollup do cubo para as chaves `by`, com médias, notas ponderadas e contagens distintas
+#
+# O resultado vem ordenado pelas chaves, como um groupby sobre os restaurantes.
+
+def rollup(cube, by, countries = None, price_types = None, rating_buckets = None):
+    by = [by] if isinstance(by, str) else list(by)
+    part = select(cube, countries, price_types, rating_buckets)
+
+    grouped = part.loc[measure_rows(part, by), :].groupby(by)
+    result = grouped[MEASURES].sum()
+    result['first_row'] = grouped['first_row'].min()
+
+    for key, name in DISTINCT_KEYS.items():
+        if key not in by:
+            result[name] = part.groupby(by)[key].nunique()
+
+    result['aggregate_rating'] = result['rating_tenths'] / (10 * result['restaurants'])
+    result['average_cost_for_two'] = result['cost_sum'] / result['restaurants']
+    result['average_cost_for_two_usd'] = result['cost_usd_cents'] / (100 * result['cost_usd_restaurants'])
+
+    return result.assign(**rating_scores(result['votes'], result['rating_votes_tenths'] / 10)).reset_index()
@@ -0,0 +1,72 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import numpy as np
+import pandas as pd
+
+from fome_zero.data import CACHE_VERSIONS, DATA_PATH, data_version, load_clean_data, versioned_cache
+
+#====================================================================================================
+# TABELA PONTE RESTAURANTE <-> CULINÁRIA
+#====================================================================================================
+
+# A coluna cuisine_list guarda a lista completa do CSV ("Italian, Pizza, Cafe"). A ponte tem uma
+# linha por par (restaurante, culinária), só com inteiros: a posição do restaurante no dataframe
+# limpo e o código da culinária em `names`. Nenhuma coluna do restaurante é duplicada; quem
+# precisa de um atributo do restaurante o indexa pela posição.
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Culinárias de uma lista do CSV, sem espaços e sem repetição, na ordem original
+
+def split_cuisines(cuisine_list):
+    nomes = [nome.strip() for nome in str(cuisine_list).split(',')]
+
+    return list(dict.fromkeys(nome for nome in nomes if nome)) or [str(cuisine_list).split(',')[0]]
+
+#====================================================================================================
+# PONTE
+#====================================================================================================
+
+class CuisineBridge:
+
+    def __init__(self, cuisine_list):
+
+        # O split roda só nas listas distintas; cada restaurante herda a lista do seu código
+        codes, uniques = pd.factorize(cuisine_list.astype(str))
+        listas = [split_cuisines(lista) for lista in uniques]
+
+        tamanhos = np.array([len(lista) for lista in listas], dtype = 'int64')
+        inicios = np.concatenate([[0], np.cumsum(tamanhos)[:-1]])
+        cuisine_codes, names = pd.factorize(pd.Series([nome for lista in listas for nome in lista], dtype = object))
+
+        # Pares (restaurante, culinária), na ordem dos restaurantes e da lista de cada um
+        por_restaurante = tamanhos[codes]
+        self.restaurant = np.repeat(np.arange(len(codes), dtype = 'int32'), por_restaurante)
+
+        ordem = np.arange(len(self.restaurant)) - np.repeat(np.cumsum(por_restaurante) - por_restaurante, por_restaurante)
+        self.cuisine = cuisine_codes[np.repeat(inicios[codes], por_restaurante) + ordem].astype('int32')
+
+        # A primeira culinária da lista é a mesma da coluna `cuisines` do dataframe limpo
+        self.main = ordem == 0
+        self.names = pd.Index(names)
+
+    def __len__(self):
+        return len(self.restaurant)
+
+    # Nome da culinária de cada par
+
+    def cuisine_names(self):
+        return self.names[self.cuisine]
+
+# Ponte do arquivo de dados, construída uma única vez por versão (caminho + mtime)
+
+def load_cuisine_bridge(path = DATA_PATH):
+    return _load_cuisine_bridge(*data_version(path))
+
+@versioned_cache(maxsize = CACHE_VERSIONS)
+def _load_cuisine_bridge(path, mtime_ns):
+    return CuisineBridge(load_clean_data(path, compact = True)['cuisine_list'])
@@ -0,0 +1,97 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import numpy as np
+import pandas as pd
+
+#====================================================================================================
+# NORMALIZAÇÃO DOS CUSTOS
+#====================================================================================================
+
+# O average_cost_for_two vem na moeda de cada país, o que torna os custos incomparáveis entre
+# países. Na limpeza, cada restaurante recebe também o custo em dólar (average_cost_for_two_usd),
+# por uma tabela local de taxas: o texto da coluna currency vira o código ISO da moeda, e o código
+# vira a taxa. As consultas de custo das páginas têm uma versão normalizada que usa essa coluna.
+#
+# O texto da moeda não basta em dois casos do arquivo: 'Dollar($)' aparece para Austrália,
+# Canadá, Singapura e Estados Unidos, e as Filipinas vêm como 'Botswana Pula(P)' (os valores são
+# de pesos filipinos). Para esses países a moeda sai de COUNTRY_CURRENCY.
+
+# Moeda de referência
+BASE_CURRENCY = 'USD'
+
+# Código ISO de cada texto da coluna currency
+CURRENCY_CODES = {
+'Botswana Pula(P)': 'BWP',
+'Brazilian Real(R$)': 'BRL',
+'Dollar($)': 'USD',
+'Emirati Diram(AED)': 'AED',
+'Indian Rupees(Rs.)': 'INR',
+'Indonesian Rupiah(IDR)': 'IDR',
+'NewZealand($)': 'NZD',
+'Pounds(£)': 'GBP',
+'Qatari Rial(QR)': 'QAR',
+'Rand(R)': 'ZAR',
+'Sri Lankan Rupee(LKR)': 'LKR',
+'Turkish Lira(TL)': 'TRY',
+}
+
+# Moeda dos países cujo texto de moeda é ambíguo ou errado no arquivo
+COUNTRY_CURRENCY = {
+'Australia': 'AUD',
+'Canada': 'CAD',
+'Philippines': 'PHP',
+'Singapure': 'SGD',
+}
+
+# Dólares por unidade de cada moeda (taxas de referência aproximadas de janeiro de 2023)
+USD_RATES = {
+'AED': 0.2723,
+'AUD': 0.68,
+'BRL': 0.19,
+'BWP': 0.078,
+'CAD': 0.74,
+'GBP': 1.21,
+'IDR': 0.000064,
+'INR': 0.0121,
+'LKR': 0.0027,
+'NZD': 0.63,
+'PHP': 0.018,
+'QAR': 0.2747,
+'SGD': 0.75,
+'TRY': 0.053,
+'USD': 1.0,
+'ZAR': 0.059,
+}
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Código ISO da moeda de cada linha (NaN quando o texto da moeda não está na tabela)
+
+def currency_codes(country, currency):
+    return country.map(COUNTRY_CURRENCY).fillna(currency.map(CURRENCY_CODES))
+
+# Taxa de cada linha, numa única junção com a tabela de taxas
+#
+# A tabela (moeda do país ou do texto -> taxa) é montada só sobre os pares distintos de país e
+# moeda, poucos, e as linhas recebem a taxa do seu par pelo código do factorize.
+
+def usd_rates(country, currency):
+    pares = pd.MultiIndex.from_arrays([country.astype(str), currency.astype(str)])
+    codes, uniques = pares.factorize()
+
+    moedas = currency_codes(pd.Series(uniques.get_level_values(0)), pd.Series(uniques.get_level_values(1)))
+    taxas = moedas.map(USD_RATES).to_numpy(dtype = 'float64')
+
+    return taxas[codes]
+
+# Custo para dois em dólar, com duas casas (NaN para moeda desconhecida)
+
+def normalize_costs(data):
+    taxas = usd_rates(data['country'], data['currency'])
+    custos = data['average_cost_for_two'].to_numpy(dtype = 'float64') * taxas
+
+    return pd.Series(np.round(custos, 2), index = data.index)
@@ -0,0 +1,372 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+import inflection
+
+from fome_zero.currency import normalize_costs
+from fome_zero.instrument import span
+from fome_zero.partitions import dataset_mtime, is_partitioned, list_partitions
+from fome_zero.schema import compact_frame, concat_frames
+from fome_zero.snapshot import snapshot_path, is_fresh, read_snapshot, write_snapshot
+
+#====================================================================================================
+# CONSTANTES
+#====================================================================================================
+
+# Caminho padrão dos dados: o zomato.csv da raiz do projeto ou, pela variável de ambiente
+# FOME_ZERO_DATA, outro CSV ou um diretório de partições por país (fome_zero.partitions)
+DATA_PATH = os.environ.get('FOME_ZERO_DATA', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'zomato.csv'))
+
+# Arquivos guardados nos caches por versão (num diretório de partições, cada partição é um arquivo
+# com a sua entrada); de cada arquivo fica só a versão mais recente (versioned_cache)
+CACHE_VERSIONS = 32
+
+# Seleções de partições concatenadas guardadas em cache (cada uma é uma cópia dos dados)
+CONCAT_VERSIONS = 4
+
+# Nomear os países por meio do código
+
+COUNTRIES = {
+1: "India",
+14: "Australia",
+30: "Brazil",
+37: "Canada",
+94: "Indonesia",
+148: "New Zeland",
+162: "Philippines",
+166: "Qatar",
+184: "Singapure",
+189: "South Africa",
+191: "Sri Lanka",
+208: "Turkey",
+214: "United Arab Emirates",
+215: "England",
+216: "United States of America",
+}
+
+# Colunas do CSV usadas pela limpeza (Locality Verbose e Switch to order menu nem são lidas)
+RAW_COLUMNS = ['Restaurant ID', 'Restaurant Name', 'Country Code', 'City', 'Address', 'Locality', 'Longitude', 'Latitude',
+               'Cuisines', 'Average Cost for two', 'Currency', 'Has Table booking', 'Has Online delivery', 'Is delivering now',
+               'Price range', 'Aggregate rating', 'Rating color', 'Rating text', 'Votes']
+
+# Nomear as colunas por meio de código
+
+COLORS = {
+"3F7E00": "darkgreen",
+"5BA829": "green",
+"9ACD32": "lightgreen",
+"CDD614": "orange",
+"FFBA00": "red",
+"CBCBC8": "darkred",
+"FF7800": "darkred",
+}
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Renomear e padronizar as colunas
+#
+# Com copy=False devolve um novo dataframe com os mesmos arrays (o original não é alterado).
+
+def rename_columns(dataframe, copy = True):
+    title = lambda x: inflection.titleize(x)
+    snakecase = lambda x: inflection.underscore(x)
+    spaces = lambda x: x.replace(" ", "")
+    cols_old = list(dataframe.columns)
+    cols_old = list(map(title, cols_old))
+    cols_old = list(map(spaces, cols_old))
+    cols_new = list(map(snakecase, cols_old))
+
+    return dataframe.set_axis(cols_new, axis = 1, copy = copy)
+
+def country_name(country_id):
+    return COUNTRIES[country_id]
+
+# Categorizar os intervalos de preço
+
+def create_price_tye(price_range):
+    if price_range == 1:
+        return "Cheap"
+    elif price_range == 2:
+        return "Normal"
+    elif price_range == 3:
+        return "Expensive"
+    else:
+        return "Gourmet"
+
+def color_name(color_code):
+    return COLORS[color_code]
+
+# Limpeza e organização
+
+def clean_code(df):
+    
+    data = df.copy()
+
+    # Renomeando os arquivos
+    data = rename_columns(data)
+
+    # Criação de colunas
+    data['country'] = data.loc[:,'country_code'].apply(lambda x: country_name(x))
+    data['price_type'] = data.loc[:, 'price_range'].apply(lambda x: create_price_tye(x))
+    data['color'] = data.loc[:, 'rating_color'].apply(lambda x: color_name(x))
+
+    # Pegando apenas o primeiro elemento do tipo de cozinha (a lista completa fica em cuisine_list)
+    data = data.loc[data['cuisines'].notnull(), :]
+    data['cuisine_list'] = data.loc[:, 'cuisines'].astype(str)
+    data['cuisines'] = data.loc[:, 'cuisines'].astype(str).apply(lambda x: x.split(',')[0])
+
+    # Removendo colunas desnecessárias
+    data = data.drop(columns = ['country_code','locality_verbose', 'switch_to_order_menu','rating_color'])
+
+    # Removendo dados duplicados
+    data = data.drop_duplicates(subset='restaurant_id', keep='first')
+    data = data.loc[data['average_cost_for_two'] != 0, :]
+
+    # Custo em dólar (fome_zero.currency)
+    data['average_cost_for_two_usd'] = normalize_costs(data)
+
+    # Resetando o index
+    data = data.reset_index(drop = True)
+    
+    return data
+
+# Códigos de país e de cor conhecidos (linhas com código fora de COUNTRIES/COLORS são descartadas
+# na limpeza vetorizada e contadas no relatório de fome_zero.quality)
+
+def valid_codes(data):
+    return data['country_code'].isin(list(COUNTRIES)).to_numpy() & data['rating_color'].isin(list(COLORS)).to_numpy()
+
+# Primeiro elemento do tipo de cozinha, calculado só sobre os valores distintos
+#
+# O str.split do pandas cria uma lista por linha; como há poucas combinações distintas de
+# culinárias, fatoramos a coluna e aplicamos o split apenas nos valores únicos.
+
+def _first_cuisine(cuisines):
+    codes, uniques = pd.factorize(cuisines.astype(str))
+    first = pd.Index(uniques).str.split(',', n = 1).str[0]
+
+    return pd.Series(np.asarray(first, dtype = object)[codes], index = cuisines.index)
+
+# Leitura do CSV só com as colunas usadas pela limpeza
+
+def read_raw(path = DATA_PATH, **kwargs):
+    return pd.read_csv(path, usecols = RAW_COLUMNS, **kwargs)
+
+# Limpeza vetorizada: mesma saída de clean_code, sem lambdas linha a linha e com uma única cópia
+#
+# As colunas são renomeadas sem cópia e as linhas mantidas saem de uma única máscara (códigos de
+# país e cor válidos, culinária preenchida, primeira ocorrência do restaurante e custo diferente
+# de zero); só essas linhas são copiadas, e as colunas novas são calculadas apenas sobre elas. Ao
+# contrário de clean_code, um código desconhecido descarta a linha em vez de levantar KeyError. O
+# dataframe de entrada não é alterado e pode vir de read_raw ou de pd.read_csv com todas as colunas.
+#
+# Na leitura em blocos (fome_zero.ingest), `seen` guarda os restaurant_id dos blocos anteriores:
+# as linhas já vistas saem junto com as duplicatas do próprio bloco, e os ids novos são
+# registrados antes do filtro de custo zero, como na limpeza do arquivo inteiro.
+
+def clean_code_vectorized(df, seen = None):
+
+    # Renomeando os arquivos (sem copiar os dados)
+    data = rename_columns(df, copy = False)
+
+    # Removendo dados com código inválido, sem culinária, duplicados e com custo zero, numa única
+    # máscara; a duplicata é avaliada só entre as linhas válidas com culinária, e antes do filtro
+    # de custo
+    preenchida = valid_codes(data) & data['cuisines'].notnull().to_numpy()
+    ids = data['restaurant_id']
+
+    primeira = preenchida.copy()
+    primeira[preenchida] = ~ids[preenchida].duplicated().to_numpy()
+    if seen is not None:
+        primeira &= ~seen.contains(ids)
+        seen.add(ids[primeira])
+
+    linhas = np.flatnonzero(primeira & (data['average_cost_for_two'].to_numpy() != 0))
+
+    # Única cópia: as linhas mantidas, com o index resetado
+    data = data.take(linhas)
+    data.index = pd.RangeIndex(len(data))
+
+    # Criação de colunas (os códigos traduzidos saem do dataframe; todos são conhecidos, pois as
+    # linhas com código inválido já saíram na máscara)
+    data['country'] = data.pop('country_code').map(COUNTRIES)
+
+    price_range = data['price_range'].to_numpy()
+    data['price_type'] = np.select([price_range == 1, price_range == 2, price_range == 3],
+                                   ['Cheap', 'Normal', 'Expensive'], default = 'Gourmet').astype(object)
+
+    data['color'] = data.pop('rating_color').map(COLORS)
+
+    # Pegando apenas o primeiro elemento do tipo de cozinha (a lista completa fica em cuisine_list)
+    data['cuisine_list'] = data['cuisines'].astype(str)
+    data['cuisines'] = _first_cuisine(data['cuisines'])
+
+    # Removendo colunas desnecessárias (quando o CSV foi lido com todas as colunas)
+    for col in ['locality_verbose', 'switch_to_order_menu']:
+        if col in data.columns:
+            del data[col]
+
+    # Custo em dólar, numa única junção com a tabela de taxas (fome_zero.currency)
+    data['average_cost_for_two_usd'] = normalize_costs(data)
+
+    return data
+
+#====================================================================================================
+# CARREGAMENTO COM CACHE
+#====================================================================================================
+
+# Versão do arquivo de dados (caminho absoluto + mtime), usada como chave dos caches; num
+# diretório de partições, o mtime mais recente do conjunto
+
+def data_version(path = DATA_PATH):
+    path = os.path.abspath(path)
+
+    if is_partitioned(path):
+        return path, dataset_mtime(path)
+
+    return path, os.stat(path).st_mtime_ns
+
+# Cache por versão de arquivo, para funções cujos dois primeiros argumentos são o caminho e o
+# mtime (data_version): como o lru_cache, guarda até `maxsize` entradas e descarta as usadas há
+# mais tempo, mas uma versão nova de um caminho descarta na hora as versões anteriores dele, que
+# nenhuma chamada volta a pedir. O cálculo roda fora do lock, como em fome_zero.cache.
+
+def versioned_cache(maxsize):
+
+    def decorator(func):
+        entradas = OrderedDict()
+        lock = threading.Lock()
+        faltando = object()
+
+        @wraps(func)
+        def wrapper(path, mtime_ns, *args):
+            key = (path, mtime_ns) + args
+            with lock:
+                value = entradas.get(key, faltando)
+                if value is not faltando:
+                    entradas.move_to_end(key)
+                    return value
+
+            value = func(path, mtime_ns, *args)
+
+            with lock:
+                for antiga in [antiga for antiga in entradas if antiga[0] == path and antiga[1] != mtime_ns]:
+                    del entradas[antiga]
+
+                entradas[key] = value
+                while len(entradas) > maxsize:
+                    entradas.popitem(last = False)
+
+            return value
+
+        wrapper.cache_clear = entradas.clear
+        wrapper.cache_len = lambda: len(entradas)
+
+        return wrapper
+
+    return decorator
+
+# Países de um diretório de partições, na ordem das partições (sem ler os dados)
+
+def partition_countries(path = DATA_PATH):
+    return [COUNTRIES[codigo] for codigo in list_partitions(path) if codigo in COUNTRIES]
+
+# CSVs das partições dos países selecionados (todas, se countries for None): a poda de partições
+
+def partition_paths(path = DATA_PATH, countries = None):
+    particoes = list_partitions(path)
+    if countries is None:
+        return list(particoes.values())
+
+    codigos = {codigo for codigo, nome in COUNTRIES.items() if nome in set(countries)}
+
+    return [arquivo for codigo, arquivo in particoes.items() if codigo in codigos]
+
+# Dataframe limpo, no esquema compacto, a partir do snapshot colunar quando ele estiver em dia com o CSV
+#
+# O snapshot guarda o dataframe já compacto (categorias como dicionários do Arrow) e é devolvido
+# como lido, sem conversão de tipos depois do memory map. Se ele não existir ou for mais antigo
+# que o CSV, lê o CSV, faz a limpeza, compacta e regrava o snapshot, devolvendo a leitura do
+# snapshot gravado; se o diretório não aceitar escrita, segue com o dataframe em memória.
+
+def read_clean_data(path = DATA_PATH):
+    snapshot = snapshot_path(path)
+    if is_fresh(path, snapshot):
+        with span('leitura do snapshot'):
+            return read_snapshot(snapshot)
+
+    with span('leitura do CSV'):
+        df = read_raw(path)
+    with span('limpeza'):
+        data = compact_frame(clean_code_vectorized(df))
+
+    try:
+        with span('gravação do snapshot'):
+            write_snapshot(data, snapshot)
+    except OSError:
+        return data
+
+    with span('leitura do snapshot'):
+        return read_snapshot(snapshot)
+
+# Leitura e limpeza, executadas uma única vez por versão (caminho + mtime) do arquivo
+#
+# Com compact=False (só para comparar o uso de memória com o esquema original), a limpeza sai
+# direto do CSV, sem snapshot.
+
+@versioned_cache(maxsize = CACHE_VERSIONS)
+def _load_clean_data(path, mtime_ns, compact):
+    if compact:
+        data = read_clean_data(path)
+    else:
+        data = clean_code_vectorized(read_raw(path))
+
+    return data
+
+# Dataframe limpo compartilhado por todas as sessões do processo
+#
+# A chave do cache é o caminho absoluto e o mtime do arquivo: se o CSV for substituído,
+# a próxima chamada relê o arquivo. O retorno é uma visão rasa (sem cópia dos dados) do dataframe
+# em cache: filtros, colunas novas e renomeações na página não afetam o cache, mas nenhuma página
+# deve alterar os valores no lugar (df.loc[...] = ...) sem antes fazer uma cópia.
+# Com compact=True o dataframe vem no esquema compacto de fome_zero.schema.
+#
+# Num diretório de partições, cada partição passa pelo cache como um arquivo, e só as partições
+# dos países em `countries` (todas, se None) são lidas; com mais de uma, o resultado é a
+# concatenação delas, em cache pela versão das partições selecionadas, e sem nenhuma, o
+# dataframe vazio com as colunas da primeira partição. Num CSV único, countries é ignorado e o
+# filtro fica com quem chama.
+
+def load_clean_data(path = DATA_PATH, compact = False, countries = None):
+    if not is_partitioned(path):
+        return _load_clean_data(*data_version(path), compact).copy(deep = False)
+
+    arquivos = partition_paths(path, countries)
+    if not arquivos:
+        return load_clean_data(partition_paths(path)[0], compact).iloc[:0]
+    if len(arquivos) == 1:
+        return load_clean_data(arquivos[0], compact)
+
+    versoes = tuple(data_version(arquivo) for arquivo in arquivos)
+
+    return _concat_partitions(*data_version(path), versoes, compact).copy(deep = False)
+
+# Concatenação das partições selecionadas (cada uma lida pelo cache por arquivo), uma única vez
+# por versão do conjunto e seleção; as categorias são unidas por concat_frames, sem recompactar
+
+@versioned_cache(maxsize = CONCAT_VERSIONS)
+def _concat_partitions(path, mtime_ns, versoes, compact):
+    partes = [_load_clean_data(*versao, compact) for versao in versoes]
+
+    with span('concatenação das partições'):
+        return concat_frames(partes)
@@ -0,0 +1,258 @@
+#====================================================================================================
+# EXPORTAÇÃO ESTÁTICA: python -m fome_zero.export [destino] [--workers N] [--serve PORTA]
+#====================================================================================================
+
+# Gera uma versão pré-montada do dashboard: para o filtro padrão (todos os países) e para cada país
+# sozinho, uma pasta com os indicadores, os gráficos e as tabelas das páginas Home, Country, City e
+# Gastronomic em HTML (index.html), os gráficos em JSON (figures.json) e o mapa da Home (mapa.html).
+# O arquivo é lido uma única vez, no processo principal, antes de abrir o pool de processos que
+# monta as variantes em paralelo: com fork, os processos herdam os dados, o cubo, os candidatos do
+# top, os sketches e as parciais já calculados, e gravam o JSON dos gráficos como sai do cache, sem
+# remontar um Figure. O plotly.js vai uma única vez para assets/, com o hash do conteúdo no nome.
+#
+# Com --serve, a pasta é servida por HTTP com cabeçalhos de cache: os assets com hash ficam em
+# cache por um ano (imutáveis); as páginas e os JSON são revalidados pela data de modificação.
+
+import argparse
+import hashlib
+import html
+import json
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+from fome_zero import queries, views
+from fome_zero.data import DATA_PATH, data_version, load_clean_data
+from fome_zero.cube import load_cube
+from fome_zero.incremental import shared_rollup
+from fome_zero.leaders import load_leaders
+from fome_zero.maps import build_fast_map
+from fome_zero.sketches import load_sketches
+
+#====================================================================================================
+# CONSTANTES
+#====================================================================================================
+
+# Pasta padrão da exportação (ignorada pelo git)
+EXPORT_DIR = 'static_export'
+
+# Variante do filtro padrão
+ALL_COUNTRIES = 'todos'
+
+# Páginas exportadas, na ordem do menu
+PAGES = ['Home', 'Country', 'City', 'Gastronomic']
+
+# Indicadores da Home e seus rótulos
+KPI_LABELS = {'restaurants': 'Restaurantes Cadastrados',
+              'table_booking': 'Restaurantes que aceitam reserva',
+              'online_delivery': 'Restaurantes com pedido online',
+              'delivering_now': 'Restaurantes que fazem entrega',
+              'n_countries': 'Países Cadastrados',
+              'n_cities': 'Cidades Cadastradas',
+              'n_cuisines': 'Culinárias Ofertadas',
+              'votes': 'Avaliações feitas na plataforma'}
+
+# Cache-Control do --serve
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="pt-br">
+<head>
+<meta charset="utf-8">
+<title>Fome Zero - {titulo}</title>
+<script src="../{plotly}"></script>
+<style>body {{font-family: sans-serif; margin: 2em;}} section {{margin-bottom: 3em;}} table {{border-collapse: collapse;}} td, th {{padding: 2px 8px;}}</style>
+</head>
+<body>
+<p><a href="../index.html">Todas as variantes</a></p>
+<h1>Fome Zero - {titulo}</h1>
+{corpo}
+</body>
+</html>
+"""
+
+INDEX_TEMPLATE = """<!DOCTYPE html>
+<html lang="pt-br">
+<head>
+<meta charset="utf-8">
+<title>Fome Zero</title>
+</head>
+<body>
+<h1>Fome Zero</h1>
+<ul>
+{itens}
+</ul>
+</body>
+</html>
+"""
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Nome da pasta de uma variante (ex.: 'United States of America' -> 'united-states-of-america')
+
+def slug(name):
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+# Grava um arquivo e devolve o sha256 do conteúdo
+
+def write_file(path, conteudo):
+    conteudo = conteudo.encode('utf-8') if isinstance(conteudo, str) else conteudo
+    with open(path, 'wb') as arquivo:
+        arquivo.write(conteudo)
+
+    return hashlib.sha256(conteudo).hexdigest()
+
+# plotly.js em assets/, com o hash no nome (caminho relativo à pasta da exportação)
+
+def write_plotly_asset(destino):
+    conteudo = get_plotlyjs().encode('utf-8')
+    nome = f'assets/plotly-{hashlib.sha256(conteudo).hexdigest()[:12]}.min.js'
+
+    os.makedirs(os.path.join(destino, 'assets'), exist_ok = True)
+    if not os.path.exists(os.path.join(destino, nome)):
+        write_file(os.path.join(destino, nome), conteudo)
+
+    return nome
+
+# Seção de indicadores da Home
+
+def kpis_html(countries, path):
+    kpis = queries.overview(countries, path = path).iloc[0]
+    linhas = ''.join(f'<tr><th>{html.escape(rotulo)}</th><td>{kpis[coluna]}</td></tr>' for coluna, rotulo in KPI_LABELS.items())
+
+    return f'<table>{linhas}</table>'
+
+# Uma variante: as páginas para a seleção `countries`, gravadas em destino/nome
+#
+# Roda nos processos do pool; devolve os arquivos gravados (com o sha256) e o tempo gasto.
+
+def export_variant(destino, plotly, nome, countries, path = DATA_PATH):
+    inicio = time.perf_counter()
+    pasta = os.path.join(destino, nome)
+    os.makedirs(pasta, exist_ok = True)
+
+    secoes = []
+    graficos = {}
+    for page in PAGES:
+        secoes.append(f'<h2>{page}</h2>')
+        if page == 'Home':
+            secoes.append(f'<section>{kpis_html(countries, path)}</section>')
+            secoes.append('<section><iframe src="mapa.html" width="1024" height="600" style="border: 0"></iframe></section>')
+
+        figuras, tabelas = views.page_views(page)
+        for name in figuras:
+            graficos[name] = views.figure_json(name, countries, path = path)
+            div = pio.to_html(json.loads(graficos[name]), validate = False, full_html = False, include_plotlyjs = False, div_id = name)
+            secoes.append(f'<section><h3>{html.escape(views.FIGURES[name][1])}</h3>{div}</section>')
+
+        for name in tabelas:
+            tabela = views.table(name, countries, path = path).hide(axis = 'index').to_html()
+            secoes.append(f'<section><h3>{html.escape(views.TABLES[name][1])}</h3>{tabela}</section>')
+
+    data = load_clean_data(path, compact = True, countries = countries)
+    mapa = build_fast_map(data.loc[data['country'].isin(countries), :])
+
+    titulo = 'Todos os países' if nome == ALL_COUNTRIES else ', '.join(countries)
+    arquivos = {
+        'index.html': write_file(os.path.join(pasta, 'index.html'), PAGE_TEMPLATE.format(titulo = html.escape(titulo), plotly = plotly, corpo = '\n'.join(secoes))),
+        'figures.json': write_file(os.path.join(pasta, 'figures.json'), '{' + ', '.join(f'{json.dumps(name)}: {fig}' for name, fig in graficos.items()) + '}'),
+        'mapa.html': write_file(os.path.join(pasta, 'mapa.html'), mapa.get_root().render()),
+    }
+
+    return nome, {f'{nome}/{arquivo}': sha for arquivo, sha in arquivos.items()}, time.perf_counter() - inicio
+
+# Exportação completa: lê os dados, monta as variantes em paralelo e grava index.html e manifest.json
+#
+# Devolve o manifesto (variantes, arquivos com sha256 e tempo de cada variante).
+
+def export(destino = EXPORT_DIR, workers = None, path = DATA_PATH):
+    inicio = time.perf_counter()
+
+    # Leitura única: dados, cubo, candidatos do top, sketches e parciais de todos os rollups das
+    # páginas, herdados pelo pool; as variantes só filtram esses agregados e montam os gráficos
+    paises = queries.country_list(path)
+    load_clean_data(path, compact = True)
+    load_cube(path)
+    load_leaders(path)
+    load_sketches(path)
+    for page in PAGES:
+        figuras, tabelas = views.page_views(page)
+        for name in figuras:
+            views.figure_json(name, paises, path = path)
+        for name in tabelas:
+            views.table(name, paises, path = path)
+    shared_rollup([], paises, path = path)
+
+    os.makedirs(destino, exist_ok = True)
+    plotly = write_plotly_asset(destino)
+
+    variantes = {ALL_COUNTRIES: paises}
+    variantes.update({slug(pais): [pais] for pais in paises})
+
+    contexto = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+    montar = partial(export_variant, destino, plotly, path = path)
+
+    with ProcessPoolExecutor(max_workers = workers, mp_context = contexto) as pool:
+        resultados = list(pool.map(montar, variantes.keys(), variantes.values()))
+
+    itens = [f'<li><a href="{nome}/index.html">{html.escape("Todos os países" if nome == ALL_COUNTRIES else variantes[nome][0])}</a></li>'
+             for nome in variantes]
+    write_file(os.path.join(destino, 'index.html'), INDEX_TEMPLATE.format(itens = '\n'.join(itens)))
+
+    manifesto = {'data_version': data_version(path)[1],
+                 'assets': [plotly],
+                 'variants': {nome: {'countries': variantes[nome], 'files': arquivos, 'seconds': round(segundos, 3)}
+                              for nome, arquivos, segundos in resultados},
+                 'seconds': round(time.perf_counter() - inicio, 3)}
+
+    with open(os.path.join(destino, 'manifest.json'), 'w') as arquivo:
+        json.dump(manifesto, arquivo, indent = 1, ensure_ascii = False)
+
+    return manifesto
+
+#====================================================================================================
+# SERVIDOR
+#====================================================================================================
+
+# Arquivos da exportação com Cache-Control: assets imutáveis, o resto revalidado
+
+class CachedStaticHandler(SimpleHTTPRequestHandler):
+
+    def end_headers(self):
+        self.send_header('Cache-Control', IMMUTABLE if self.path.startswith('/assets/') else REVALIDATE)
+        super().end_headers()
+
+def serve(destino = EXPORT_DIR, porta = 8000):
+    handler = partial(CachedStaticHandler, directory = destino)
+
+    with ThreadingHTTPServer(('', porta), handler) as servidor:
+        print(f'Servindo {destino} em http://localhost:{porta}/')
+        servidor.serve_forever()
+
+#====================================================================================================
+# EXECUÇÃO
+#====================================================================================================
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('destino', nargs = '?', default = EXPORT_DIR)
+    parser.add_argument('--workers', type = int)
+    parser.add_argument('--serve', type = int, metavar = 'PORTA')
+    args = parser.parse_args()
+
+    manifesto = export(args.destino, args.workers)
+    print(f"{len(manifesto['variants'])} variantes em {args.destino} ({manifesto['seconds']:.1f} s)")
+
+    if args.serve:
+        serve(args.destino, args.serve)
@@ -0,0 +1,199 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import numpy as np
+from haversine import Unit, haversine_vector
+
+from fome_zero.cuisines import CuisineBridge
+from fome_zero.data import DATA_PATH, data_version, load_clean_data, partition_paths, versioned_cache
+from fome_zero.ingest import reads_in_chunks
+from fome_zero.partitions import is_partitioned
+from fome_zero.schema import concat_frames
+
+#====================================================================================================
+# ÍNDICE ESPACIAL EM GRADE
+#====================================================================================================
+
+# Os restaurantes são ordenados pela célula (latitude x longitude) de uma grade de CELL_DEG graus.
+# Como a chave da célula é linha * N_COLUNAS + coluna, cada linha da grade dentro de um raio é um
+# intervalo contínuo do array ordenado, achado com searchsorted. A distância haversine só é
+# calculada para os restaurantes das células candidatas, não para o dataset inteiro.
+#
+# O filtro de culinária usa a lista completa de cada restaurante (cuisine_list, pela ponte de
+# fome_zero.cuisines), como a página de culinárias: um restaurante entra se oferecer qualquer uma
+# das culinárias escolhidas.
+
+CELL_DEG = 0.5
+N_COLUMNS = int(360 / CELL_DEG)
+
+# Colunas guardadas no índice: as da busca, as da tabela da página Nearby e as do mapa da Home
+GEO_COLUMNS = ['restaurant_id', 'restaurant_name', 'country', 'city', 'latitude', 'longitude', 'cuisines', 'cuisine_list',
+               'price_type', 'average_cost_for_two', 'currency', 'aggregate_rating', 'color']
+
+# Quilômetros por grau de latitude e meia volta da Terra (maior distância possível)
+KM_PER_DEGREE = 111.195
+MAX_RADIUS_KM = 20016.0
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Linha e coluna da grade de cada coordenada
+
+def _cells(latitude, longitude):
+    linha = np.floor((np.clip(latitude, -90.0, 89.999999) + 90.0) / CELL_DEG).astype('int64')
+    coluna = np.floor(((longitude + 180.0) % 360.0) / CELL_DEG).astype('int64')
+
+    return linha, coluna
+
+#====================================================================================================
+# ÍNDICE
+#====================================================================================================
+
+class GeoIndex:
+
+    def __init__(self, data):
+        latitude = data['latitude'].to_numpy(dtype = 'float64')
+        longitude = data['longitude'].to_numpy(dtype = 'float64')
+        validas = np.flatnonzero(np.isfinite(latitude) & np.isfinite(longitude))
+
+        linha, coluna = _cells(latitude[validas], longitude[validas])
+        chaves = linha * N_COLUMNS + coluna
+        ordem = np.argsort(chaves, kind = 'stable')
+
+        self.data = data.iloc[validas[ordem]].reset_index(drop = True)
+        self.keys = chaves[ordem]
+        self.coords = np.column_stack([latitude[validas][ordem], longitude[validas][ordem]])
+
+        self.bridge = CuisineBridge(self.data['cuisine_list'])
+        self.price_type = self.data['price_type'].astype(str).to_numpy()
+        self.rating = self.data['aggregate_rating'].to_numpy(dtype = 'float64')
+
+    # Posições (no array ordenado) dos restaurantes das células que cobrem o raio
+
+    def _candidates(self, lat, lon, km):
+        delta_lat = km / KM_PER_DEGREE
+        sul, norte = max(lat - delta_lat, -90.0), min(lat + delta_lat, 90.0)
+
+        # Perto dos polos o raio cobre todas as longitudes
+        cos_lat = np.cos(np.radians(max(abs(sul), abs(norte))))
+        delta_lon = 360.0 if cos_lat < 1e-6 else km / (KM_PER_DEGREE * cos_lat)
+
+        linhas = np.arange(_cells(sul, 0.0)[0], _cells(norte, 0.0)[0] + 1)
+
+        if delta_lon >= 180.0:
+            intervalos = [(0, N_COLUMNS - 1)]
+        else:
+            oeste, leste = _cells(0.0, lon - delta_lon)[1], _cells(0.0, lon + delta_lon)[1]
+            intervalos = [(oeste, leste)] if oeste <= leste else [(oeste, N_COLUMNS - 1), (0, leste)]
+
+        posicoes = []
+        for primeira, ultima in intervalos:
+            inicios = np.searchsorted(self.keys, linhas * N_COLUMNS + primeira, side = 'left')
+            fins = np.searchsorted(self.keys, linhas * N_COLUMNS + ultima, side = 'right')
+            posicoes.extend(np.arange(inicio, fim) for inicio, fim in zip(inicios, fins) if fim > inicio)
+
+        return np.concatenate(posicoes) if posicoes else np.empty(0, dtype = 'int64')
+
+    # Máscara dos restaurantes que oferecem alguma das culinárias (em qualquer posição da lista)
+
+    def _offers(self, cuisines):
+        codigos = np.flatnonzero(self.bridge.names.isin(list(cuisines)))
+        oferece = np.zeros(len(self.data), dtype = bool)
+        oferece[self.bridge.restaurant[np.isin(self.bridge.cuisine, codigos)]] = True
+
+        return oferece
+
+    # Culinárias oferecidas pelos restaurantes do índice, em ordem alfabética
+
+    def cuisine_names(self):
+        return sorted(self.bridge.names)
+
+    # Filtros de culinária, tipo de preço e nota mínima sobre as posições candidatas
+
+    def _filter(self, posicoes, cuisines = None, price_types = None, min_rating = None):
+        linhas = np.ones(len(posicoes), dtype = bool)
+
+        if cuisines:
+            linhas &= self._offers(cuisines)[posicoes]
+        if price_types:
+            linhas &= np.isin(self.price_type[posicoes], list(price_types))
+        if min_rating is not None:
+            linhas &= self.rating[posicoes] >= min_rating
+
+        return posicoes[linhas]
+
+    # Distância (km) do ponto até cada posição
+
+    def _distances(self, lat, lon, posicoes):
+        if len(posicoes) == 0:
+            return np.empty(0, dtype = 'float64')
+
+        return haversine_vector(np.array([[lat, lon]]), self.coords[posicoes], Unit.KILOMETERS, comb = True)[:, 0]
+
+    # Restaurantes das posições, com a distância, do mais perto para o mais longe
+
+    def _result(self, posicoes, distancias):
+        ordem = np.argsort(distancias, kind = 'stable')
+
+        result = self.data.iloc[posicoes[ordem]].reset_index(drop = True)
+        result['distance_km'] = distancias[ordem]
+
+        return result
+
+    # Restaurantes a até `km` quilômetros do ponto
+
+    def radius(self, lat, lon, km, cuisines = None, price_types = None, min_rating = None):
+        posicoes = self._filter(self._candidates(lat, lon, km), cuisines, price_types, min_rating)
+        distancias = self._distances(lat, lon, posicoes)
+
+        dentro = distancias <= km
+
+        return self._result(posicoes[dentro], distancias[dentro])
+
+    # Os k restaurantes mais próximos do ponto
+    #
+    # O raio de busca começa numa célula e dobra até conter k restaurantes: como todas as células
+    # que cobrem o raio foram examinadas, os k mais próximos dentro dele são os k mais próximos.
+
+    def nearest(self, lat, lon, k, cuisines = None, price_types = None, min_rating = None):
+        km = CELL_DEG * KM_PER_DEGREE
+
+        while True:
+            posicoes = self._filter(self._candidates(lat, lon, km), cuisines, price_types, min_rating)
+            distancias = self._distances(lat, lon, posicoes)
+
+            dentro = distancias <= km
+            if dentro.sum() >= k or km >= MAX_RADIUS_KM:
+                break
+            km *= 2
+
+        posicoes, distancias = posicoes[dentro], distancias[dentro]
+        mais_perto = np.argsort(distancias, kind = 'stable')[:k]
+
+        return self._result(posicoes[mais_perto], distancias[mais_perto])
+
+# Colunas do índice de um arquivo: do dataframe limpo ou, num CSV grande sem snapshot em dia,
+# das colunas de cada bloco lido em streaming (o dataframe inteiro nunca fica em memória). Num
+# diretório de partições, a concatenação das colunas de todas as partições.
+
+def geo_frame(path = DATA_PATH):
+    if is_partitioned(path):
+        return concat_frames([geo_frame(arquivo) for arquivo in partition_paths(path)])
+
+    if reads_in_chunks(path):
+        # Importado aqui: fome_zero.streaming importa este módulo
+        from fome_zero.streaming import load_streamed
+        return load_streamed(path).geo
+
+    return load_clean_data(path, compact = True)[GEO_COLUMNS]
+
+# Índice do arquivo de dados, construído uma única vez por versão (caminho + mtime)
+
+def load_geo_index(path = DATA_PATH):
+    return _load_geo_index(*data_version(path))
+
+@versioned_cache(maxsize = 4)
+def _load_geo_index(path, mtime_ns):
+    return GeoIndex(geo_frame(path))
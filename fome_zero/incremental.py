@@ -0,0 +1,255 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from fome_zero.cube import DISTINCT_KEYS, MEASURES, load_cube, measure_rows, rollup, select
+from fome_zero.data import DATA_PATH, data_version, versioned_cache
+from fome_zero.partitions import is_partitioned
+from fome_zero.ranking import rating_scores
+
+#====================================================================================================
+# AVALIAÇÃO INCREMENTAL DO FILTRO DE PAÍSES
+#====================================================================================================
+
+# Cada rollup do cubo é decomposto em parciais por país, em posições de um índice fixo de grupos.
+# Quando o multiselect muda, o total da sessão soma as parciais dos países adicionados e subtrai
+# as dos removidos, em vez de refazer o rollup inteiro. Contagens distintas são mantidas por
+# contadores de pares (grupo, valor): um valor deixa de contar quando nenhum país selecionado o
+# contém.
+
+# Chave usada quando o rollup não tem agrupamento (totais da Home)
+TOTAL = '_total'
+
+# Valor inicial da primeira aparição (maior que qualquer linha)
+SEM_LINHA = np.iinfo('int64').max
+
+#====================================================================================================
+# PARCIAIS POR PAÍS (compartilhadas entre as sessões)
+#====================================================================================================
+
+class CountryPartials:
+
+    def __init__(self, cube, by, price_types = None, rating_buckets = None):
+        self.by = list(by)
+        self.keys = self.by or [TOTAL]
+
+        part = select(cube, price_types = price_types, rating_buckets = rating_buckets)
+        part = part.assign(**{TOTAL: 'total'})
+
+        # Índice fixo de grupos, ordenado pelas chaves como em cube.rollup
+        grouped = part.groupby(self.keys)
+        self.groups = grouped.size().index.to_frame(index = False)
+        codes = grouped.ngroup().to_numpy()
+
+        # Medidas aditivas e primeira aparição de cada grupo, por país (as contagens distintas,
+        # abaixo, usam todas as linhas do cubo)
+        self.measures = {}
+        linhas = measure_rows(part, self.by)
+        por_pais = part.loc[linhas, :].assign(_grupo = codes[linhas]).groupby(['country', '_grupo'])
+        medidas = por_pais[MEASURES].sum()
+        medidas['first_row'] = por_pais['first_row'].min()
+
+        for pais, frame in medidas.groupby(level = 'country'):
+            self.measures[pais] = (frame.index.get_level_values('_grupo').to_numpy(),
+                                   frame[MEASURES].to_numpy(dtype = 'int64'),
+                                   frame['first_row'].to_numpy(dtype = 'int64'))
+
+        # Pares (grupo, valor) presentes em cada país, para as contagens distintas
+        self.pair_groups = {}
+        self.pairs = {}
+        for key in DISTINCT_KEYS:
+            if key in self.keys:
+                continue
+            pares = part.assign(_grupo = codes).groupby(['_grupo', key])
+            pair_codes = pares.ngroup().to_numpy()
+            self.pair_groups[key] = pares.size().index.get_level_values('_grupo').to_numpy()
+            self.pairs[key] = {pais: np.unique(pair_codes[linhas])
+                               for pais, linhas in part.groupby('country').indices.items()}
+
+        self.countries = list(self.measures)
+
+# Parciais do arquivo de dados, construídas uma única vez por versão e por rollup
+
+def load_partials(by, price_types = None, rating_buckets = None, path = DATA_PATH):
+    price_types = tuple(price_types) if price_types is not None else None
+    rating_buckets = tuple(rating_buckets) if rating_buckets is not None else None
+
+    return _load_partials(*data_version(path), tuple(by), price_types, rating_buckets)
+
+@versioned_cache(maxsize = 32)
+def _load_partials(path, mtime_ns, by, price_types, rating_buckets):
+    return CountryPartials(load_cube(path), by, price_types, rating_buckets)
+
+#====================================================================================================
+# ROLLUP INCREMENTAL (um por sessão)
+#====================================================================================================
+
+class IncrementalRollup:
+
+    def __init__(self, partials):
+        self.partials = partials
+        self._reset()
+
+    def _reset(self):
+        n_grupos = len(self.partials.groups)
+
+        self.selection = set()
+        self.totals = np.zeros((n_grupos, len(MEASURES)), dtype = 'int64')
+        self.first_row = np.full(n_grupos, SEM_LINHA, dtype = 'int64')
+        self.pair_counts = {key: np.zeros(len(grupos), dtype = 'int64') for key, grupos in self.partials.pair_groups.items()}
+        self.distinct = {key: np.zeros(n_grupos, dtype = 'int64') for key in self.partials.pair_groups}
+
+    # Soma a contribuição de um país
+
+    def _add(self, pais):
+        posicoes, valores, first_row = self.partials.measures[pais]
+
+        self.totals[posicoes] += valores
+        self.first_row[posicoes] = np.minimum(self.first_row[posicoes], first_row)
+
+        for key, pares in self.partials.pairs.items():
+            novos = pares[pais][self.pair_counts[key][pares[pais]] == 0]
+            self.pair_counts[key][pares[pais]] += 1
+            np.add.at(self.distinct[key], self.partials.pair_groups[key][novos], 1)
+
+    # Subtrai a contribuição de um país (já retirado de self.selection)
+
+    def _remove(self, pais):
+        posicoes, valores, _ = self.partials.measures[pais]
+
+        self.totals[posicoes] -= valores
+
+        for key, pares in self.partials.pairs.items():
+            self.pair_counts[key][pares[pais]] -= 1
+            zerados = pares[pais][self.pair_counts[key][pares[pais]] == 0]
+            np.subtract.at(self.distinct[key], self.partials.pair_groups[key][zerados], 1)
+
+        # A primeira aparição não é subtraível: refaz o mínimo só nos grupos do país removido
+        afetados = np.zeros(len(self.first_row), dtype = bool)
+        afetados[posicoes] = True
+        self.first_row[posicoes] = SEM_LINHA
+
+        for outro in self.selection:
+            outras, _, first_row = self.partials.measures[outro]
+            linhas = afetados[outras]
+            np.minimum.at(self.first_row, outras[linhas], first_row[linhas])
+
+    # Atualiza o total para a nova seleção de países
+    #
+    # Se a mudança envolve mais países do que a própria seleção nova (ex.: limpar o multiselect
+    # e escolher um país), é mais barato recomeçar do zero.
+
+    def update(self, countries):
+        nova = set(countries) & set(self.partials.countries)
+        adicionados = nova - self.selection
+        removidos = self.selection - nova
+
+        if len(adicionados) + len(removidos) > len(nova):
+            self._reset()
+            adicionados, removidos = nova, set()
+
+        for pais in removidos:
+            self.selection.discard(pais)
+            self._remove(pais)
+
+        for pais in adicionados:
+            self.selection.add(pais)
+            self._add(pais)
+
+        return self.result()
+
+    # Rollup da seleção atual, no mesmo formato de cube.rollup
+
+    def result(self):
+        ativos = np.flatnonzero(self.totals[:, MEASURES.index('restaurants')] > 0)
+
+        result = pd.concat([self.partials.groups.iloc[ativos].reset_index(drop = True),
+                            pd.DataFrame(self.totals[ativos], columns = MEASURES)], axis = 1)
+        result['first_row'] = self.first_row[ativos]
+
+        for key, name in DISTINCT_KEYS.items():
+            if key in self.distinct:
+                result[name] = self.distinct[key][ativos]
+
+        result['aggregate_rating'] = result['rating_tenths'] / (10 * result['restaurants'])
+        result['average_cost_for_two'] = result['cost_sum'] / result['restaurants']
+        result['average_cost_for_two_usd'] = result['cost_usd_cents'] / (100 * result['cost_usd_restaurants'])
+        result = result.assign(**rating_scores(result['votes'], result['rating_votes_tenths'] / 10))
+
+        return result.drop(columns = TOTAL) if TOTAL in result.columns else result
+
+# Rollup incremental guardado no estado da sessão (st.session_state ou um dict)
+#
+# Cada sessão tem o seu total; as parciais por país são as mesmas para todo o processo. Se o
+# arquivo de dados mudar, as parciais mudam e o rollup da sessão é recriado.
+
+def session_rollup(state, name, by, countries, price_types = None, rating_buckets = None, path = DATA_PATH):
+    partials = load_partials(by, price_types, rating_buckets, path)
+
+    rollup = state.get(name)
+    if rollup is None or rollup.partials is not partials:
+        rollup = IncrementalRollup(partials)
+        state[name] = rollup
+
+    return rollup.update(countries)
+
+# Rollup de um diretório de partições: direto do cubo das partições selecionadas, no formato
+# de IncrementalRollup.result (a troca de seleção já é barata, pois o cubo de cada partição fica
+# em cache e só as selecionadas são somadas)
+
+def partition_rollup(by, countries, price_types = None, rating_buckets = None, path = DATA_PATH):
+    cube = load_cube(path, countries).assign(**{TOTAL: 'total'})
+    result = rollup(cube, list(by) or [TOTAL], countries, price_types, rating_buckets)
+
+    return result.drop(columns = TOTAL) if TOTAL in result.columns else result
+
+# Rollup incremental das consultas de fome_zero.queries, um por rollup (chaves, filtros de
+# preço/nota e arquivo)
+#
+# Numa página do Streamlit, cada sessão tem os seus rollups, guardados no estado da sessão
+# ligado à thread do rerun por bind_session: a atualização de uma sessão parte da última seleção
+# dela, e não da de outro usuário. Fora do Streamlit (exportação, benchmarks), os rollups são do
+# processo, com um lock por rollup. As parciais (e o cubo, numa primeira carga) são montadas antes
+# de qualquer lock, então uma carga a frio não bloqueia os rollups das outras sessões. Num
+# diretório de partições, usa partition_rollup.
+
+# Chave dos rollups no estado da sessão
+SESSION_KEY = 'fome_zero_rollups'
+
+_local = threading.local()
+
+_shared_state = {}
+_shared_locks = {}
+_shared_locks_lock = threading.Lock()
+
+# Liga o estado da sessão (st.session_state) às consultas desta thread; chamado no início de
+# cada rerun das páginas, como fome_zero.instrument.start_rerun
+
+def bind_session(state):
+    _local.state = state
+
+def _shared_lock(name):
+    with _shared_locks_lock:
+        return _shared_locks.setdefault(name, threading.Lock())
+
+def shared_rollup(by, countries, price_types = None, rating_buckets = None, path = DATA_PATH):
+    if is_partitioned(path):
+        return partition_rollup(by, countries, price_types, rating_buckets, path)
+
+    price_types = tuple(price_types) if price_types is not None else None
+    rating_buckets = tuple(rating_buckets) if rating_buckets is not None else None
+    name = (tuple(by), price_types, rating_buckets, path)
+
+    load_partials(by, price_types, rating_buckets, path)
+
+    state = getattr(_local, 'state', None)
+    if state is not None:
+        return session_rollup(state.setdefault(SESSION_KEY, {}), name, by, countries, price_types, rating_buckets, path)
+
+    with _shared_lock(name):
+        return session_rollup(_shared_state, name, by, countries, price_types, rating_buckets, path)
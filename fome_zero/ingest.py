@@ -0,0 +1,101 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import os
+
+import numpy as np
+
+from fome_zero.data import DATA_PATH, clean_code_vectorized, read_raw
+from fome_zero.snapshot import is_fresh, snapshot_path
+
+#====================================================================================================
+# LEITURA EM BLOCOS
+#====================================================================================================
+
+# Para arquivos maiores que a memória: o CSV é lido em blocos de CHUNK_ROWS linhas e cada bloco
+# passa pela mesma limpeza do arquivo inteiro (clean_code_vectorized). As duplicatas entre blocos
+# saem por um conjunto compacto dos restaurant_id já vistos (arrays int64 ordenados, 8 bytes
+# por restaurante). Os blocos são consumidos numa única passada por fome_zero.streaming, que
+# mantém só agregados ou tabelas limitadas (o cubo, os sketches, a pirâmide do mapa e os
+# candidatos do top de restaurantes): em memória ficam um bloco, o conjunto de ids e os agregados.
+# A exceção é o índice espacial da página Nearby, que precisa de cada restaurante e guarda só as
+# suas colunas (fome_zero.geo.GEO_COLUMNS).
+
+# Linhas por bloco
+CHUNK_ROWS = 50_000
+
+# A partir deste tamanho de CSV (sem snapshot em dia), o cubo das páginas é montado em streaming
+STREAM_MIN_BYTES = int(float(os.environ.get('FOME_ZERO_STREAM_MB', 512)) * 1024 ** 2)
+
+#====================================================================================================
+# IDS JÁ VISTOS
+#====================================================================================================
+
+class SeenIds:
+
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    # Máscara dos ids que já foram vistos (uma busca binária em cada array)
+    #
+    # Os ids procurados são ordenados antes da busca: em ordem, as buscas sucessivas caem em
+    # regiões vizinhas do array, em vez de saltar pela memória a cada id.
+
+    def contains(self, ids):
+        ids = np.asarray(ids, dtype = 'int64')
+        ordem = np.argsort(ids, kind = 'stable')
+        procurados = ids[ordem]
+
+        vistos = np.zeros(len(ids), dtype = bool)
+        for run in self.runs:
+            posicoes = np.searchsorted(run, procurados).clip(max = len(run) - 1)
+            vistos[ordem] |= run[posicoes] == procurados
+
+        return vistos
+
+    # Registra ids ainda não vistos (quem chama já os filtrou por contains)
+    #
+    # Os ids ficam em poucos arrays ordenados de tamanhos decrescentes: os do bloco entram como um
+    # array novo, que é fundido com o anterior enquanto este não for maior (como num contador
+    # binário). Cada id passa por O(log(blocos)) fusões, e nenhum bloco reordena o conjunto
+    # inteiro; a busca olha no máximo log2(blocos) + 1 arrays.
+
+    def add(self, ids):
+        novos = np.unique(np.asarray(ids, dtype = 'int64'))
+        if len(novos) == 0:
+            return
+
+        self.runs.append(novos)
+        while len(self.runs) > 1 and len(self.runs[-2]) <= len(self.runs[-1]):
+            ultimo = self.runs.pop()
+            self.runs[-1] = np.sort(np.concatenate([self.runs[-1], ultimo]), kind = 'mergesort')
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Blocos limpos do CSV, sem restaurantes repetidos entre blocos
+#
+# A concatenação dos blocos é igual a clean_code_vectorized(read_raw(path)).
+
+def clean_chunks(path = DATA_PATH, chunksize = CHUNK_ROWS):
+    seen = SeenIds()
+
+    for chunk in read_raw(path, chunksize = chunksize):
+        data = clean_code_vectorized(chunk, seen)
+        if len(data) > 0:
+            yield data
+
+# O arquivo é grande o bastante para ser lido em blocos?
+
+def should_stream(path = DATA_PATH):
+    return os.path.getsize(path) >= STREAM_MIN_BYTES
+
+# Os carregadores montam seus agregados em blocos: o CSV é grande e não há snapshot em dia
+
+def reads_in_chunks(path = DATA_PATH):
+    return should_stream(path) and not is_fresh(path, snapshot_path(path))
@@ -0,0 +1,189 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+#====================================================================================================
+# INSTRUMENTAÇÃO DOS RERUNS
+#====================================================================================================
+
+# Cada execução de uma página (rerun) é medida em trechos (spans): tempo e memória residente do
+# processo antes e depois. A página abre o rerun (start_rerun) e o fecha (finish_rerun); entre
+# um e outro, qualquer código com `with span('nome'):` registra um trecho, inclusive as funções
+# de fome_zero (leitura, limpeza, consultas, gráficos), sem receber nenhum objeto da página. O
+# rerun aberto fica na thread atual: o Streamlit roda o script de cada sessão numa thread
+# própria, e fora de um rerun (benchmarks, exportação) span não faz nada.
+#
+# Os reruns fechados vão para um histórico do processo (os últimos MAX_RERUNS, mostrados pelo
+# painel de fome_zero.panel) e, uma linha JSON por rerun, para o arquivo RERUN_LOG_PATH. Ao
+# passar de RERUN_LOG_MAX_MB, o arquivo vira RERUN_LOG_PATH.1 (substituindo o anterior) e um novo
+# é aberto: em disco ficam no máximo duas vezes esse tamanho.
+
+# Reruns guardados em memória
+MAX_RERUNS = 50
+
+# Arquivo JSON-lines dos reruns (variável de ambiente FOME_ZERO_RERUN_LOG; vazia desliga o arquivo)
+RERUN_LOG_PATH = os.environ.get('FOME_ZERO_RERUN_LOG', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs', 'reruns.jsonl'))
+
+# Tamanho máximo do arquivo antes da rotação (variável de ambiente FOME_ZERO_RERUN_LOG_MB)
+RERUN_LOG_MAX_MB = float(os.environ.get('FOME_ZERO_RERUN_LOG_MB', 10))
+
+_local = threading.local()
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Memória residente atual em MB (/proc no Linux; nos demais Unix, o pico pelo módulo resource,
+# importado só aqui por não existir no Windows, onde a memória fica sem medida: NaN)
+
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except OSError:
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 1024 ** 2 if sys.platform == 'darwin' else pico / 1024
+
+#====================================================================================================
+# RERUN
+#====================================================================================================
+
+class Rerun:
+
+    def __init__(self, page):
+        self.page = page
+        self.inicio = time.time()
+        self.rss_inicio = rss_mb()
+        self._relogio = time.perf_counter()
+        self._pilha = []
+        self.spans = []
+
+    # Trecho medido; trechos aninhados levam o caminho dos trechos externos no nome
+
+    @contextmanager
+    def span(self, name):
+        self._pilha.append(name)
+        rss = rss_mb()
+        inicio = time.perf_counter()
+
+        # O registro entra na lista ao abrir o trecho, para manter a ordem de início
+        registro = {'span': ' / '.join(self._pilha),
+                    'nivel': len(self._pilha) - 1,
+                    'inicio_s': round(inicio - self._relogio, 4)}
+        self.spans.append(registro)
+
+        try:
+            yield
+        finally:
+            rss_fim = rss_mb()
+            registro.update({'segundos': round(time.perf_counter() - inicio, 4),
+                             'rss_mb': round(rss_fim, 1),
+                             'delta_rss_mb': round(rss_fim - rss, 2)})
+            self._pilha.pop()
+
+    # Registro do rerun (os trechos ficam na ordem em que começaram)
+
+    def record(self):
+        rss = rss_mb()
+
+        return {'pagina': self.page,
+                'inicio': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.inicio)),
+                'segundos': round(time.perf_counter() - self._relogio, 4),
+                'rss_mb': round(rss, 1),
+                'delta_rss_mb': round(rss - self.rss_inicio, 2),
+                'spans': list(self.spans)}
+
+#====================================================================================================
+# HISTÓRICO
+#====================================================================================================
+
+class RerunLog:
+
+    def __init__(self, max_reruns = MAX_RERUNS, path = RERUN_LOG_PATH, max_mb = RERUN_LOG_MAX_MB):
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 ** 2)
+        self._reruns = deque(maxlen = max_reruns)
+        self._lock = threading.Lock()
+
+    # Troca o arquivo cheio pelo backup .1 (chamado com o lock)
+
+    def _rotate(self):
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+            os.replace(self.path, f'{self.path}.1')
+
+    # Guarda um rerun e o acrescenta ao arquivo (erros de escrita não derrubam a página)
+
+    def add(self, registro):
+        with self._lock:
+            self._reruns.append(registro)
+
+            if self.path:
+                try:
+                    os.makedirs(os.path.dirname(self.path), exist_ok = True)
+                    self._rotate()
+                    with open(self.path, 'a', encoding = 'utf-8') as arquivo:
+                        arquivo.write(json.dumps(registro, ensure_ascii = False) + '\n')
+                except OSError:
+                    pass
+
+    # Os últimos n reruns, do mais recente para o mais antigo
+
+    def last(self, n = MAX_RERUNS):
+        with self._lock:
+            return list(self._reruns)[::-1][:n]
+
+# Histórico do processo
+
+RERUN_LOG = RerunLog()
+
+#====================================================================================================
+# RERUN DA THREAD ATUAL
+#====================================================================================================
+
+# Abre o rerun de uma página (um rerun aberto e não fechado, ex.: interrompido por
+# st.experimental_rerun, é descartado)
+
+def start_rerun(page):
+    _local.rerun = Rerun(page)
+
+    return _local.rerun
+
+# Trecho do rerun aberto na thread (nada é medido se não houver rerun aberto)
+
+@contextmanager
+def span(name):
+    rerun = getattr(_local, 'rerun', None)
+    if rerun is None:
+        yield
+        return
+
+    with rerun.span(name):
+        yield
+
+# Fecha o rerun aberto e o grava no histórico; devolve o registro (None se não havia rerun)
+
+def finish_rerun(log = RERUN_LOG):
+    rerun = getattr(_local, 'rerun', None)
+    _local.rerun = None
+    if rerun is None:
+        return None
+
+    registro = rerun.record()
+    log.add(registro)
+
+    return registro
@@ -0,0 +1,131 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import numpy as np
+import pandas as pd
+
+from fome_zero.data import CACHE_VERSIONS, DATA_PATH, data_version, load_clean_data, partition_paths, versioned_cache
+from fome_zero.ingest import reads_in_chunks
+from fome_zero.instrument import span
+from fome_zero.partitions import is_partitioned
+from fome_zero.ranking import histogram_quantile, top_k
+from fome_zero.schema import decategorize
+
+#====================================================================================================
+# CANDIDATOS AO TOP DE RESTAURANTES
+#====================================================================================================
+
+# O top de restaurantes da Home sai de uma tabela limitada de candidatos, montada uma vez por
+# versão do arquivo (em blocos, num CSV grande), em vez do dataframe inteiro.
+#
+# Os candidatos são guardados por grupo (país x nota): em cada grupo, os TOP_CANDIDATES com mais
+# votos, os TOP_CANDIDATES com menos votos e os TOP_CANDIDATES de menor id (empates sempre pelo
+# menor id). Isso basta para qualquer top de até TOP_CANDIDATES restaurantes de qualquer seleção
+# de países, tanto pela nota quanto pela nota bayesiana de fome_zero.ranking: dentro de um grupo a
+# nota é a mesma, e a bayesiana, (nota x votos + m x C) / (votos + m), cresce com os votos quando a
+# nota passa de C, cai quando fica abaixo e é igual para todos quando a nota é C; nos três casos,
+# os primeiros do grupo estão entre os candidatos guardados.
+#
+# C e m da nota bayesiana dependem de todos os restaurantes da seleção, não só dos candidatos: por
+# país são guardados os votos e a soma de nota x votos (em décimos, inteira) e o histograma dos
+# votos, de onde sai o quantil de m.
+
+# Colunas do top de restaurantes
+TOP_COLUMNS = ['restaurant_id', 'restaurant_name', 'country', 'city', 'cuisines', 'currency', 'average_cost_for_two', 'aggregate_rating', 'votes']
+
+# Grupos dos candidatos
+GROUP_KEYS = ['country', 'aggregate_rating']
+
+# Candidatos por grupo em cada critério (o maior top atendido)
+TOP_CANDIDATES = 50
+
+#====================================================================================================
+# CANDIDATOS
+#====================================================================================================
+
+class Leaders:
+
+    def __init__(self, candidates, totals, votes):
+
+        # Restaurantes candidatos (colunas de TOP_COLUMNS)
+        self.candidates = candidates
+
+        # Por país: votos e soma de nota x votos em décimos
+        self.totals = totals
+
+        # Histograma dos votos (país, votos) -> restaurantes, só com votos > 0
+        self.votes = votes
+
+    # C e m da nota bayesiana dos restaurantes dos países selecionados
+
+    def prior(self, countries):
+        totais = self.totals.loc[self.totals.index.isin(countries), :]
+        votos = totais['votes'].sum()
+        media = totais['rating_votes_tenths'].sum() / (10 * votos) if votos > 0 else 0.0
+
+        histograma = self.votes.loc[self.votes.index.get_level_values(0).isin(countries)]
+        prior = histogram_quantile(histograma.index.get_level_values(1).to_numpy(), histograma.to_numpy())
+
+        return media, prior
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Candidatos de cada grupo: mais votos, menos votos e menor id
+
+def reduce_candidates(frame, k = TOP_CANDIDATES):
+    mais_votos = top_k(frame, 'votes', k, group = GROUP_KEYS, tie_break = 'restaurant_id')
+    menos_votos = top_k(frame, 'votes', k, group = GROUP_KEYS, ascending = True, tie_break = 'restaurant_id')
+    menor_id = top_k(frame, 'restaurant_id', k, group = GROUP_KEYS, ascending = True)
+
+    candidatos = pd.concat([mais_votos, menos_votos, menor_id], ignore_index = True)
+
+    return candidatos.drop_duplicates(subset = 'restaurant_id', keep = 'first').reset_index(drop = True)
+
+# Candidatos de uma parte dos dados (o arquivo inteiro, um bloco ou uma partição)
+
+def build_leaders(data, k = TOP_CANDIDATES):
+    frame = decategorize(data[TOP_COLUMNS])
+    country = frame['country'].to_numpy()
+    votes = frame['votes'].to_numpy(dtype = 'int64')
+    rating_tenths = np.rint(frame['aggregate_rating'].to_numpy() * 10).astype('int64')
+
+    totals = pd.DataFrame({'country': country, 'votes': votes, 'rating_votes_tenths': rating_tenths * votes}).groupby('country').sum()
+
+    com_votos = votes > 0
+    histograma = pd.Series(1, index = pd.MultiIndex.from_arrays([country[com_votos], votes[com_votos]]))
+
+    return Leaders(reduce_candidates(frame, k), totals, histograma.groupby(level = [0, 1]).sum())
+
+# Soma de candidatos de partes diferentes dos dados
+
+def merge_leaders(partes, k = TOP_CANDIDATES):
+    partes = list(partes)
+
+    return Leaders(reduce_candidates(pd.concat([parte.candidates for parte in partes], ignore_index = True), k),
+                   pd.concat([parte.totals for parte in partes]).groupby(level = 0).sum(),
+                   pd.concat([parte.votes for parte in partes]).groupby(level = [0, 1]).sum())
+
+# Candidatos do arquivo de dados, construídos uma única vez por versão (caminho + mtime), pelo
+# mesmo critério do cubo: um CSV grande sem snapshot em dia é lido em blocos. Num diretório de
+# partições, são a soma dos candidatos das partições dos países em `countries` (todas, se None;
+# sem nenhum país, os da primeira partição, que o filtro de países da consulta descarta).
+
+def load_leaders(path = DATA_PATH, countries = None):
+    if is_partitioned(path):
+        arquivos = partition_paths(path, countries) or partition_paths(path)[:1]
+        return merge_leaders([load_leaders(arquivo) for arquivo in arquivos])
+
+    return _load_leaders(*data_version(path))
+
+@versioned_cache(maxsize = CACHE_VERSIONS)
+def _load_leaders(path, mtime_ns):
+    if reads_in_chunks(path):
+        # Importado aqui: fome_zero.streaming importa este módulo
+        from fome_zero.streaming import load_streamed
+        return load_streamed(path).leaders
+
+    with span('candidatos'):
+        return build_leaders(load_clean_data(path, compact = True))
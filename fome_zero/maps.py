@@ -0,0 +1,169 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import numpy as np
+import folium
+from branca.element import MacroElement
+from folium.elements import JSCSSMixin
+from folium.plugins import FastMarkerCluster, MarkerCluster
+from jinja2 import Template
+
+from fome_zero.tiles import EXPAND_ZOOM, padded_bounds, viewport_clusters, viewport_points
+
+#====================================================================================================
+# MAPA DE RESTAURANTES
+#====================================================================================================
+
+# Colunas usadas pelo mapa
+MAP_COLUMNS = ['restaurant_name', 'longitude', 'latitude', 'cuisines', 'average_cost_for_two', 'currency', 'aggregate_rating', 'color']
+
+ICON = 'fa-cutlery'
+
+# Callback executado no navegador para cada linha [lat, lon, nome, cozinha, custo, moeda, nota, cor]
+#
+# Os ícones são criados uma vez por cor e o HTML do popup só é montado quando o popup é aberto.
+
+FAST_CALLBACK = """
+    (function () {
+        var icons = {};
+        return function (row) {
+            var color = row[7];
+            if (!(color in icons)) {
+                icons[color] = L.AwesomeMarkers.icon({icon: '%s', prefix: 'fa', markerColor: color,
+                                                      iconColor: 'white', extraClasses: 'fa-rotate-0'});
+            }
+            var marker = L.marker(new L.LatLng(row[0], row[1]), {icon: icons[color]});
+            marker.bindPopup(function () {
+                return '<div style="width: 100.0%%; height: 100.0%%;"><h6> <b> ' + row[2] + ' </b> </h6> <br>'
+                     + 'Cozinha: ' + row[3] + ' <br>'
+                     + 'Preço médio para dois: ' + row[4] + ' (' + row[5] + ') <br>'
+                     + 'Avaliação: ' + row[6] + ' / 5.0 <br> </div>';
+            }, {maxWidth: row[2].length * 20});
+            return marker;
+        };
+    })()
+""" % ICON
+
+# Camada de grupos pré-calculados no servidor: cada linha [lat, lon, quantidade] vira um círculo
+# com a quantidade no centro, no estilo do MarkerCluster; o clique aproxima dois níveis.
+
+class ClusterLayer(JSCSSMixin, MacroElement):
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = (function () {
+            var layer = L.layerGroup();
+            {{ this.data|tojson }}.forEach(function (row) {
+                var size = row[2] < 10 ? 'small' : (row[2] < 100 ? 'medium' : 'large');
+                var marker = L.marker(new L.LatLng(row[0], row[1]), {
+                    icon: L.divIcon({html: '<div><span>' + row[2] + '</span></div>',
+                                     className: 'marker-cluster marker-cluster-' + size,
+                                     iconSize: new L.Point(40, 40)})
+                });
+                marker.on('click', function () {
+                    {{ this._parent.get_name() }}.setView(marker.getLatLng(), {{ this._parent.get_name() }}.getZoom() + 2);
+                });
+                layer.addLayer(marker);
+            });
+            return layer;
+        })().addTo({{ this._parent.get_name() }});
+        {% endmacro %}
+    """)
+
+    default_css = [('markerclustercss', 'https://cdnjs.cloudflare.com/ajax/libs/leaflet.markercluster/1.1.0/MarkerCluster.css'),
+                   ('markerclusterdefaultcss', 'https://cdnjs.cloudflare.com/ajax/libs/leaflet.markercluster/1.1.0/MarkerCluster.Default.css')]
+
+    def __init__(self, data):
+        super().__init__()
+        self._name = 'ClusterLayer'
+        self.data = data
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Mapa com um folium.Marker por restaurante (modo original, mantido para comparação)
+
+def build_marker_map(data):
+
+    # Armazenamento dos dados
+    datamapa = data[MAP_COLUMNS].reset_index(drop = True)
+
+    # Criando o mapa
+    mapa = folium.Map(zoom_start = 15)
+
+    #Criando os clusters
+    cluster = MarkerCluster().add_to(mapa)
+
+    #Colocando os pinos
+    for index, location_info in datamapa.iterrows():
+        folium.Marker([location_info['latitude'],
+                       location_info['longitude']],
+                       icon = folium.Icon(color=location_info['color'], icon=ICON, prefix='fa'),
+                       popup = folium.Popup(f"""<h6> <b> {location_info['restaurant_name']} </b> </h6> <br>
+                                            Cozinha: {location_info['cuisines']} <br>
+                                            Preço médio para dois: {location_info['average_cost_for_two']} ({location_info['currency']}) <br>
+                                            Avaliação: {location_info['aggregate_rating']} / 5.0 <br> """,
+                                            max_width= len(f"{location_info['restaurant_name']}")*20)).add_to(cluster)
+
+    return mapa
+
+# Linhas do FastMarkerCluster, montadas coluna a coluna
+#
+# Coordenadas inválidas são descartadas aqui, de uma vez, no lugar da validação linha a linha do
+# folium; as coordenadas são arredondadas a 6 casas (~10 cm) para encurtar o JSON.
+
+def fast_marker_rows(data):
+    latitude = data['latitude'].to_numpy(dtype = 'float64')
+    longitude = data['longitude'].to_numpy(dtype = 'float64')
+    validas = np.isfinite(latitude) & np.isfinite(longitude)
+
+    frame = data.loc[validas, MAP_COLUMNS]
+    colunas = [np.round(latitude[validas], 6).tolist(),
+               np.round(longitude[validas], 6).tolist(),
+               frame['restaurant_name'].astype(str).tolist(),
+               frame['cuisines'].astype(str).tolist(),
+               frame['average_cost_for_two'].tolist(),
+               frame['currency'].astype(str).tolist(),
+               frame['aggregate_rating'].astype(str).tolist(),
+               frame['color'].astype(str).tolist()]
+
+    return [list(row) for row in zip(*colunas)]
+
+# Mapa em lote: um único FastMarkerCluster com os dados em JSON e os marcadores criados no navegador
+
+def build_fast_map(data, location = None, zoom_start = 15):
+    mapa = folium.Map(location = location, zoom_start = zoom_start)
+
+    cluster = FastMarkerCluster([], callback = FAST_CALLBACK)
+    cluster.data = fast_marker_rows(data)
+    cluster.add_to(mapa)
+
+    return mapa
+
+# Mapa por viewport: o servidor manda só o que cabe na área visível (com margem)
+#
+# Abaixo de EXPAND_ZOOM vão os grupos pré-calculados do zoom atual; a partir dele, os restaurantes
+# individuais da área. `points` devolve o dataframe dos restaurantes e só é chamado a partir de
+# EXPAND_ZOOM, para que os zooms menores não carreguem as linhas. Devolve o mapa e a área
+# enviada, usada para saber quando consultar de novo.
+
+def build_tiled_map(pyramid, vista, countries = None, points = None):
+    (sul, oeste), (norte, leste) = vista['bounds']
+    area = padded_bounds(vista['bounds'])
+
+    mapa = folium.Map(location = [(sul + norte) / 2, (oeste + leste) / 2], zoom_start = vista['zoom'])
+
+    if vista['zoom'] >= EXPAND_ZOOM and points is not None:
+        cluster = FastMarkerCluster([], callback = FAST_CALLBACK)
+        cluster.data = fast_marker_rows(viewport_points(points(), area, countries))
+        cluster.add_to(mapa)
+    else:
+        clusters = viewport_clusters(pyramid, vista['zoom'], area, countries)
+        linhas = zip(np.round(clusters['latitude'].to_numpy(), 6).tolist(),
+                     np.round(clusters['longitude'].to_numpy(), 6).tolist(),
+                     clusters['restaurants'].tolist())
+        ClusterLayer([list(row) for row in linhas]).add_to(mapa)
+
+    return mapa, area
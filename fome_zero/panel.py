@@ -0,0 +1,57 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import os
+
+import pandas as pd
+import streamlit as st
+
+from fome_zero.cache import RESULT_CACHE
+from fome_zero.instrument import RERUN_LOG
+
+#====================================================================================================
+# PAINEL DE DESEMPENHO
+#====================================================================================================
+
+# Painel de administração, escondido: a opção só aparece na barra lateral quando a página é
+# aberta com ?admin=1 na URL (ou com FOME_ZERO_ADMIN=1 no ambiente do servidor). Mostra os
+# últimos reruns do processo (fome_zero.instrument), os trechos do mais recente e o uso do cache
+# de resultados.
+
+# Reruns listados no painel
+PANEL_RERUNS = 10
+
+# Colunas do resumo de cada rerun
+SUMMARY_COLUMNS = ['inicio', 'pagina', 'segundos', 'rss_mb', 'delta_rss_mb']
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Painel liberado só com admin=1 na URL (?admin=0 ou ?admin= não liberam) ou FOME_ZERO_ADMIN=1
+
+def admin_enabled():
+    return st.experimental_get_query_params().get('admin') == ['1'] or os.environ.get('FOME_ZERO_ADMIN') == '1'
+
+# Painel no fim da página (chamado depois de finish_rerun, para incluir o rerun atual)
+
+def performance_panel(n = PANEL_RERUNS):
+    if not admin_enabled():
+        return
+    if not st.sidebar.checkbox('Painel de desempenho', key = 'painel_desempenho'):
+        return
+
+    reruns = RERUN_LOG.last(n)
+
+    with st.expander(f'Desempenho dos últimos {len(reruns)} reruns', expanded = True):
+
+        resumo = pd.DataFrame([{col: rerun[col] for col in SUMMARY_COLUMNS} for rerun in reruns], columns = SUMMARY_COLUMNS)
+        st.dataframe(resumo)
+
+        if reruns:
+            st.markdown(f"###### Trechos do último rerun ({reruns[0]['pagina']})")
+            st.dataframe(pd.DataFrame(reruns[0]['spans']))
+
+        st.markdown('###### Cache de resultados')
+        st.json(RESULT_CACHE.stats())
@@ -0,0 +1,104 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import os
+import re
+
+import pandas as pd
+
+#====================================================================================================
+# CONJUNTO PARTICIONADO POR PAÍS
+#====================================================================================================
+
+# Além de um único CSV, os dados podem vir de um diretório com uma partição por país, cada uma
+# com um CSV no formato do zomato.csv:
+#
+#     dados/
+#         country_code=1/zomato.csv
+#         country_code=30/zomato.csv
+#         ...
+#
+# Cada partição é tratada como um arquivo comum (snapshot, leitura em blocos e caches por versão
+# do arquivo), e os carregadores de fome_zero leem só as partições dos países selecionados
+# (poda de partições): uma seleção só com o Brasil não lê a Índia. A atualização de um país é a
+# troca do CSV da sua partição; as demais continuam em cache. Como cada restaurante pertence a
+# um único país, as duplicatas de restaurant_id são removidas dentro de cada partição. A ordem
+# de primeira aparição (e, com ela, a dos empates nas tabelas) segue a ordem das partições.
+
+# Nome dos diretórios de partição
+PARTITION_KEY = 'country_code'
+PARTITION_PATTERN = re.compile(rf'^{PARTITION_KEY}=(\d+)$')
+
+# Distância entre as primeiras aparições (first_row) de partições vizinhas: mantém a ordem das
+# partições e, dentro de cada uma, a ordem do arquivo, qualquer que seja a seleção de países
+PARTITION_STRIDE = 2 ** 40
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# O caminho dos dados é um diretório de partições?
+
+def is_partitioned(path):
+    return os.path.isdir(path)
+
+# Partições do diretório: {código do país: CSV}, na ordem dos códigos
+#
+# Cada partição deve ter exatamente um CSV (a atualização de um país substitui o arquivo).
+
+def list_partitions(path):
+    particoes = {}
+
+    for entrada in os.scandir(path):
+        encontrado = PARTITION_PATTERN.match(entrada.name)
+        if not entrada.is_dir() or encontrado is None:
+            continue
+
+        arquivos = sorted(nome for nome in os.listdir(entrada.path) if nome.endswith('.csv'))
+        if len(arquivos) != 1:
+            raise ValueError(f'A partição {entrada.path} deve ter um único CSV (encontrados: {arquivos})')
+
+        particoes[int(encontrado.group(1))] = os.path.join(entrada.path, arquivos[0])
+
+    if not particoes:
+        raise FileNotFoundError(f'Nenhuma partição {PARTITION_KEY}=<código> em {path}')
+
+    return dict(sorted(particoes.items()))
+
+# Versão do conjunto: o maior mtime entre o diretório e os CSVs das partições (muda quando uma
+# partição é criada, removida ou substituída). O mtime dos diretórios de partição fica de fora,
+# pois muda a cada snapshot gravado ao lado do CSV.
+
+def dataset_mtime(path):
+    mtimes = [os.stat(path).st_mtime_ns]
+    mtimes.extend(os.stat(arquivo).st_mtime_ns for arquivo in list_partitions(path).values())
+
+    return max(mtimes)
+
+# Divide um CSV único em partições por país (copia o cabeçalho e as linhas, sem limpeza)
+
+def split_csv(csv_path, destino):
+    df = pd.read_csv(csv_path)
+
+    for codigo, linhas in df.groupby('Country Code', sort = True):
+        pasta = os.path.join(destino, f'{PARTITION_KEY}={codigo}')
+        os.makedirs(pasta, exist_ok = True)
+        linhas.to_csv(os.path.join(pasta, os.path.basename(csv_path)), index = False)
+
+    return list_partitions(destino)
+
+#====================================================================================================
+# EXECUÇÃO DIRETA: python -m fome_zero.partitions [csv] [destino]
+#====================================================================================================
+
+if __name__ == '__main__':
+
+    import sys
+    from fome_zero.data import DATA_PATH
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else DATA_PATH
+    destino = sys.argv[2] if len(sys.argv) > 2 else f'{os.path.splitext(csv_path)[0]}_particoes'
+
+    particoes = split_csv(csv_path, destino)
+    print(f'{len(particoes)} partições em {destino} (use FOME_ZERO_DATA={destino})')
@@ -0,0 +1,123 @@
+#====================================================================================================
+# QUALIDADE DOS DADOS: python -m fome_zero.quality [caminho do csv]
+#====================================================================================================
+
+# Verifica o CSV bruto antes da limpeza, numa única passada vetorizada: cada linha recebe um hash
+# de todas as colunas (duplicatas exatas) e um hash da chave de identidade do restaurante (nome
+# normalizado, cidade e coordenadas arredondadas) para achar quase duplicatas, o mesmo restaurante
+# cadastrado com ids diferentes. As demais regras (códigos de país e cor fora de COUNTRIES/COLORS,
+# culinária vazia, custo zero) são máscaras sobre as colunas. O resultado é uma marcação por
+# linha e um relatório com a contagem de cada problema; nada é descartado aqui (quem descarta é a
+# limpeza em fome_zero.data).
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+from fome_zero.data import COLORS, COUNTRIES, DATA_PATH, rename_columns, read_raw
+
+#====================================================================================================
+# CONSTANTES
+#====================================================================================================
+
+# Casas decimais das coordenadas na chave de quase duplicata (4 casas ~ 11 m)
+COORD_DECIMALS = 4
+
+# Verificações do relatório, na ordem em que aparecem
+CHECKS = {'duplicata_exata': 'Linha idêntica a uma anterior',
+          'id_repetido': 'restaurant_id de uma linha anterior, com outro conteúdo',
+          'quase_duplicata': 'Mesmo nome, cidade e coordenadas de um restaurante com outro id',
+          'country_code_invalido': 'country_code fora de COUNTRIES',
+          'rating_color_invalido': 'rating_color fora de COLORS',
+          'sem_culinaria': 'Culinária vazia',
+          'custo_zero': 'average_cost_for_two igual a zero'}
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Hash (uint64) de cada linha de um dataframe
+
+def row_hashes(frame):
+    return pd.util.hash_pandas_object(frame, index = False).to_numpy()
+
+# Nome normalizado (minúsculas, sem espaços nas pontas), calculado só sobre os nomes distintos
+
+def _normalized_names(names):
+    codes, uniques = pd.factorize(names.astype(str))
+
+    return pd.Series(np.asarray(pd.Index(uniques).str.strip().str.lower(), dtype = object)[codes], index = names.index)
+
+# Chave de identidade de cada restaurante (hash de nome, cidade e coordenadas)
+
+def identity_hashes(data):
+    chave = pd.DataFrame({'nome': _normalized_names(data['restaurant_name']),
+                          'cidade': data['city'],
+                          'latitude': data['latitude'].round(COORD_DECIMALS),
+                          'longitude': data['longitude'].round(COORD_DECIMALS)})
+
+    return row_hashes(chave)
+
+# Marcação por linha: uma coluna booleana para cada verificação de CHECKS
+#
+# As duplicatas são marcadas a partir da segunda ocorrência; o restaurant_id e a chave de
+# identidade da linha acompanham a marcação para localizar os grupos.
+
+def check_quality(df):
+    data = rename_columns(df, copy = False)
+
+    linha = pd.Series(row_hashes(data))
+    ids = data['restaurant_id'].reset_index(drop = True)
+    identidade = pd.Series(identity_hashes(data))
+
+    exata = linha.duplicated().to_numpy()
+    id_repetido = ids.duplicated().to_numpy() & ~exata
+    mesmo_restaurante = pd.DataFrame({'identidade': identidade, 'id': ids}).duplicated().to_numpy()
+
+    return pd.DataFrame({'restaurant_id': ids,
+                         'identidade': identidade,
+                         'duplicata_exata': exata,
+                         'id_repetido': id_repetido,
+                         'quase_duplicata': identidade.duplicated().to_numpy() & ~mesmo_restaurante,
+                         'country_code_invalido': ~data['country_code'].isin(list(COUNTRIES)).to_numpy(),
+                         'rating_color_invalido': ~data['rating_color'].isin(list(COLORS)).to_numpy(),
+                         'sem_culinaria': data['cuisines'].isnull().to_numpy(),
+                         'custo_zero': (data['average_cost_for_two'] == 0).to_numpy()})
+
+# Relatório: quantidade e percentual de linhas em cada verificação
+
+def quality_report(flags):
+    contagem = flags[list(CHECKS)].sum()
+
+    return pd.DataFrame({'descricao': pd.Series(CHECKS),
+                         'linhas': contagem,
+                         'percentual': 100 * contagem / max(len(flags), 1)})
+
+# Grupos de quase duplicatas: todas as linhas (ids distintos) que compartilham a chave de identidade
+
+def near_duplicate_groups(df, flags):
+    chaves = flags.loc[flags['quase_duplicata'], 'identidade'].unique()
+    linhas = flags['identidade'].isin(chaves).to_numpy()
+
+    grupos = df.loc[linhas, :].assign(identidade = flags.loc[linhas, 'identidade'].to_numpy())
+
+    return grupos.drop_duplicates(subset = ['identidade', 'Restaurant ID']).sort_values('identidade', kind = 'mergesort')
+
+#====================================================================================================
+# EXECUÇÃO
+#====================================================================================================
+
+if __name__ == '__main__':
+
+    path = sys.argv[1] if len(sys.argv) > 1 else DATA_PATH
+    df = read_raw(path)
+    flags = check_quality(df)
+
+    print(f'{len(df)} linhas em {path}')
+    print(quality_report(flags).round(2).to_string())
+
+    grupos = near_duplicate_groups(df, flags)
+    if len(grupos) > 0:
+        print('\nQuase duplicatas:')
+        print(grupos[['Restaurant ID', 'Restaurant Name', 'City', 'Latitude', 'Longitude']].to_string(index = False))
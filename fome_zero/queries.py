@@ -0,0 +1,350 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import inspect
+from functools import wraps
+from typing import Optional, Sequence
+
+import pandas as pd
+
+from fome_zero.cache import RESULT_CACHE
+from fome_zero.cube import load_cube
+from fome_zero.data import DATA_PATH, data_version, partition_countries, versioned_cache
+from fome_zero.incremental import shared_rollup
+from fome_zero.instrument import span
+from fome_zero.leaders import TOP_CANDIDATES, load_leaders
+from fome_zero.partitions import is_partitioned
+from fome_zero.ranking import rating_scores, top_k
+from fome_zero.sketches import LEVELS, distinct_cuisines, hll_relative_error, load_sketches, merged_topk
+
+#====================================================================================================
+# CONSULTAS DAS PÁGINAS
+#====================================================================================================
+
+# Uma função por pergunta de negócio respondida pelas páginas, sem Streamlit. Todas recebem a
+# seleção de países e devolvem um DataFrame com colunas de dados (os nomes em português ficam nas
+# páginas). Os resultados ficam no cache do processo (fome_zero.cache.RESULT_CACHE), com a chave
+# (consulta, versão do arquivo, países, demais argumentos): a seleção entra ordenada, pois nenhum
+# resultado depende da ordem em que os países foram escolhidos. Quando a consulta não está em
+# cache, os rollups vêm do rollup incremental do processo (fome_zero.incremental.shared_rollup).
+
+# Filtros de preço e nota das perguntas "caros e mal avaliados" e "baratos e bem avaliados"
+EXPENSIVE = ['Expensive', 'Gourmet']
+CHEAP = ['Cheap', 'Normal']
+BAD_RATINGS = ['< 2.5', '2.5']
+GOOD_RATINGS = ['4', '> 4']
+
+# Consultas registradas pelo decorador query (usado por clear_caches)
+QUERIES = []
+
+# Colunas de custo dos resultados: na moeda do país e, na versão normalizada, também em dólar
+COST_COLUMNS = ['average_cost_for_two']
+USD_COST_COLUMNS = ['average_cost_for_two', 'average_cost_for_two_usd']
+
+# Indicadores da Home
+OVERVIEW_COLUMNS = ['restaurants', 'table_booking', 'online_delivery', 'delivering_now', 'n_countries', 'n_cities', 'n_cuisines', 'votes']
+
+#====================================================================================================
+# MEMORIZAÇÃO
+#====================================================================================================
+
+# Decorador das consultas: guarda o resultado no cache do processo por versão do arquivo e
+# seleção de países
+#
+# Os argumentos entram na chave pelo nome, com os valores padrão preenchidos (top_restaurants(c) e
+# top_restaurants(c, n = 10) são a mesma entrada), e listas (ex.: faixas de nota) viram tuplas.
+# O DataFrame em cache nunca é entregue diretamente: cada chamada recebe uma cópia, que a página
+# pode renomear e formatar à vontade.
+
+def _hashable(value):
+    return tuple(value) if isinstance(value, list) else value
+
+def query(func):
+    name = f'query.{func.__name__}'
+    signature = inspect.signature(func)
+
+    @wraps(func)
+    def wrapper(countries, *args, path = DATA_PATH, **kwargs):
+        version = data_version(path)
+        countries = tuple(sorted(countries))
+
+        bound = signature.bind(countries, *args, path = version[0], **kwargs)
+        bound.apply_defaults()
+        params = tuple((key, _hashable(value)) for key, value in bound.arguments.items() if key not in ('countries', 'path'))
+
+        compute = lambda: func(countries, path = version[0], **dict(params))
+
+        with span(f'consulta {func.__name__}'):
+            return RESULT_CACHE.get_or_compute((name, version, countries, params), compute).copy()
+
+    wrapper.cache_clear = lambda: RESULT_CACHE.clear(name)
+    QUERIES.append(wrapper)
+
+    return wrapper
+
+# Esvazia o cache de todas as consultas (ex.: para medir o custo de uma consulta nova)
+
+def clear_caches():
+    for func in QUERIES:
+        func.cache_clear()
+
+# Colunas `cols` de um resultado, ordenadas por `by`, com as n primeiras linhas (todas se n for None)
+
+def _ranking(frame, cols, by, ascending, n = None):
+    return top_k(frame[cols], by, n, ascending = ascending)
+
+# Culinárias distintas de cada país ou cidade (level) dos países selecionados, estimadas pelos
+# sketches de fome_zero.sketches, na ordem das chaves como nos rollups do cubo
+
+def _approximate_diversity(level, countries, path):
+    cols = LEVELS[level]
+    estimativas = distinct_cuisines(load_sketches(path, countries), level)
+
+    linhas = [(*(chave if isinstance(chave, tuple) else (chave,)), round(n)) for chave, n in estimativas.items()]
+    frame = pd.DataFrame(linhas, columns = cols + ['n_cuisines'])
+
+    return frame.loc[frame['country'].isin(countries), :].sort_values(cols, kind = 'mergesort')
+
+# Colunas de custo de uma consulta (normalized=True acrescenta o custo em dólar)
+
+def _cost_columns(normalized):
+    return USD_COST_COLUMNS if normalized else COST_COLUMNS
+
+#====================================================================================================
+# FILTRO
+#====================================================================================================
+
+# Países disponíveis, na ordem de primeira aparição no arquivo (num diretório de partições, na
+# ordem das partições, sem ler nenhuma)
+
+def country_list(path: str = DATA_PATH) -> list:
+    if is_partitioned(path):
+        return partition_countries(path)
+
+    return _country_list(*data_version(path))
+
+@versioned_cache(maxsize = 4)
+def _country_list(path, mtime_ns):
+    return list(load_cube(path)['country'].unique())
+
+#====================================================================================================
+# HOME
+#====================================================================================================
+
+# Indicadores gerais: restaurantes, reservas, pedidos online, entregas, países, cidades,
+# culinárias e avaliações (uma linha, zerada quando nenhum país está selecionado)
+
+@query
+def overview(countries: Sequence[str], path: str = DATA_PATH) -> pd.DataFrame:
+    kpis = shared_rollup([], countries, path = path)
+
+    return kpis[OVERVIEW_COLUMNS].sum().astype('int64').to_frame().T
+
+# Restaurantes mais bem avaliados (empates pelo menor id)
+#
+# `score` é uma das notas de fome_zero.ranking.SCORES; as notas ponderadas usam C e m de todos os
+# restaurantes dos países selecionados e entram como última coluna. Os restaurantes saem da
+# tabela limitada de candidatos de fome_zero.leaders (n até TOP_CANDIDATES), sem o dataframe limpo.
+
+@query
+def top_restaurants(countries: Sequence[str], n: int = 10, score: str = 'aggregate_rating', path: str = DATA_PATH) -> pd.DataFrame:
+    if n > TOP_CANDIDATES:
+        raise ValueError(f'O top de restaurantes vai até {TOP_CANDIDATES} (pedido: {n})')
+
+    leaders = load_leaders(path, countries)
+    data = leaders.candidates.loc[leaders.candidates['country'].isin(countries), :]
+
+    if score != 'aggregate_rating':
+        media, prior = leaders.prior(countries)
+        notas = rating_scores(data['votes'], data['aggregate_rating'].to_numpy() * data['votes'].to_numpy(), mean = media, prior = prior)
+        data = data.assign(**{score: notas[score]})
+
+    return top_k(data, score, n, tie_break = 'restaurant_id')
+
+#====================================================================================================
+# PAÍSES
+#====================================================================================================
+
+# Métricas por país (base das consultas de país)
+
+@query
+def country_metrics(countries: Sequence[str], path: str = DATA_PATH) -> pd.DataFrame:
+    return shared_rollup(['country', 'currency'], countries, path = path)
+
+# Quantidade de restaurantes por país
+
+@query
+def restaurants_per_country(countries: Sequence[str], path: str = DATA_PATH) -> pd.DataFrame:
+    return _ranking(country_metrics(countries, path = path), ['country', 'restaurants'], 'restaurants', True)
+
+# Quantidade de cidades por país
+
+@query
+def cities_per_country(countries: Sequence[str], path: str = DATA_PATH) -> pd.DataFrame:
+    return _ranking(country_metrics(countries, path = path), ['country', 'n_cities'], 'n_cities', True)
+
+# Diversidade gastronômica: culinárias distintas por país (com approximate=True, estimadas pelo
+# HyperLogLog de cada país)
+
+@query
+def cuisines_per_country(countries: Sequence[str], approximate: bool = False, path: str = DATA_PATH) -> pd.DataFrame:
+    paises = _approximate_diversity('country', countries, path) if approximate else country_metrics(countries, path = path)
+
+    return _ranking(paises, ['country', 'n_cuisines'], 'n_cuisines', False)
+
+# Países com mais avaliações
+
+@query
+def top_countries_by_votes(countries: Sequence[str], n: int = 5, path: str = DATA_PATH) -> pd.DataFrame:
+    return _ranking(country_metrics(countries, path = path), ['country', 'votes'], 'votes', False, n)
+
+# Avaliação média por país (ou outra nota de fome_zero.ranking.SCORES)
+
+@query
+def rating_per_country(countries: Sequence[str], score: str = 'aggregate_rating', path: str = DATA_PATH) -> pd.DataFrame:
+    return _ranking(country_metrics(countries, path = path), ['country', score], score, True)
+
+# Custo médio e avaliação média por país, do mais caro para o mais barato
+#
+# Na moeda do país; com normalized=True, ordenado pelo custo em dólar, que torna os países
+# comparáveis, e com as duas colunas de custo.
+
+@query
+def cost_and_rating_per_country(countries: Sequence[str], normalized: bool = False, path: str = DATA_PATH) -> pd.DataFrame:
+    custos = _cost_columns(normalized)
+    por_pais = top_k(country_metrics(countries, path = path), custos[-1], tie_break = 'first_row')
+
+    return por_pais[['country', 'currency'] + custos + ['aggregate_rating']]
+
+#====================================================================================================
+# CIDADES
+#====================================================================================================
+
+# Métricas por cidade (base das consultas de cidade)
+
+@query
+def city_metrics(countries: Sequence[str], path: str = DATA_PATH) -> pd.DataFrame:
+    return shared_rollup(['country', 'city', 'currency'], countries, path = path)
+
+# As n cidades com mais restaurantes em cada país, da menor para a maior contagem
+#
+# Empates vão para a cidade com mais avaliações e, persistindo, para a ordem alfabética.
+
+@query
+def top_city_per_country(countries: Sequence[str], n: int = 1, path: str = DATA_PATH) -> pd.DataFrame:
+    cidades = city_metrics(countries, path = path)
+    cidades = top_k(cidades, 'restaurants', n, group = 'country', tie_break = ['votes', 'city'], tie_ascending = [False, True])
+
+    return top_k(cidades[['country', 'city', 'restaurants']], 'restaurants', ascending = True)
+
+# Cidades com mais restaurantes numa faixa de nota (ex.: ['< 2.5'] ou ['> 4'])
+
+@query
+def top_cities_by_rating(countries: Sequence[str], rating_buckets: Sequence[str], n: int = 7, path: str = DATA_PATH) -> pd.DataFrame:
+    contagem = shared_rollup(['country', 'city'], countries, rating_buckets = rating_buckets, path = path)
+
+    return _ranking(contagem, ['country', 'city', 'restaurants'], 'restaurants', False, n)
+
+# Cidades com maior diversidade gastronômica (com approximate=True, estimada pelo HyperLogLog de
+# cada cidade)
+
+@query
+def top_cities_by_cuisines(countries: Sequence[str], n: int = 10, approximate: bool = False, path: str = DATA_PATH) -> pd.DataFrame:
+    cidades = _approximate_diversity('city', countries, path) if approximate else city_metrics(countries, path = path)
+
+    return _ranking(cidades, ['country', 'city', 'n_cuisines'], 'n_cuisines', False, n)
+
+# Cidades de um tipo de preço e faixa de nota, com país e moeda, ordenadas pela avaliação média
+
+def _cities_by_price_and_rating(countries, price_types, rating_buckets, ascending, n, normalized, path):
+    df1 = shared_rollup(['city'], countries, price_types = price_types, rating_buckets = rating_buckets, path = path)
+    df1 = _ranking(df1, ['city'] + _cost_columns(normalized) + ['aggregate_rating'], 'aggregate_rating', ascending, n)
+    df2 = top_k(city_metrics(countries, path = path), 'first_row', ascending = True)[['country', 'city', 'currency']].drop_duplicates(subset = 'city', keep = 'first')
+
+    df3 = pd.merge(df2, df1, how = 'inner')
+
+    return top_k(df3, 'aggregate_rating', ascending = ascending)
+
+# Cidades mais caras (Expensive/Gourmet) e pior avaliadas (nota <= 2.5); com normalized=True,
+# também com o custo em dólar
+
+@query
+def expensive_badly_rated_cities(countries: Sequence[str], n: int = 10, normalized: bool = False, path: str = DATA_PATH) -> pd.DataFrame:
+    return _cities_by_price_and_rating(countries, EXPENSIVE, BAD_RATINGS, True, n, normalized, path)
+
+# Cidades mais baratas (Cheap/Normal) e melhor avaliadas (nota >= 4)
+
+@query
+def cheap_well_rated_cities(countries: Sequence[str], n: int = 10, normalized: bool = False, path: str = DATA_PATH) -> pd.DataFrame:
+    return _cities_by_price_and_rating(countries, CHEAP, GOOD_RATINGS, False, n, normalized, path)
+
+#====================================================================================================
+# CULINÁRIAS
+#====================================================================================================
+
+# Métricas por culinária (base das consultas de culinária)
+
+@query
+def cuisine_metrics(countries: Sequence[str], price_types: Optional[Sequence[str]] = None, rating_buckets: Optional[Sequence[str]] = None,
+                    path: str = DATA_PATH) -> pd.DataFrame:
+    return shared_rollup(['cuisines'], countries, price_types = price_types, rating_buckets = rating_buckets, path = path)
+
+# Culinárias oferecidas por mais restaurantes
+#
+# Com approximate=True, saem da soma dos top-k dos países selecionados (fome_zero.sketches), com
+# contagens que podem estar subestimadas em até approximation_bounds()['topk'].
+
+@query
+def top_cuisines(countries: Sequence[str], n: int = 10, approximate: bool = False, path: str = DATA_PATH) -> pd.DataFrame:
+    if approximate:
+        contagem = merged_topk(load_sketches(path, countries), 'country', countries).top(n)
+        return pd.DataFrame({'cuisines': contagem.index, 'restaurants': contagem.to_numpy()}, columns = ['cuisines', 'restaurants'])
+
+    return _ranking(cuisine_metrics(countries, path = path), ['cuisines', 'restaurants'], 'restaurants', False, n)
+
+# Limites de erro do modo aproximado para a seleção: erro padrão relativo das contagens distintas
+# (HyperLogLog) e subestimação máxima das contagens do top-k de culinárias
+
+@query
+def approximation_bounds(countries: Sequence[str], path: str = DATA_PATH) -> pd.DataFrame:
+    return pd.DataFrame({'hll_relative_error': [hll_relative_error()],
+                         'topk': [merged_topk(load_sketches(path, countries), 'country', countries).error_bound()]})
+
+# Culinárias pior avaliadas, pela nota média ou por outra nota de fome_zero.ranking.SCORES
+# (culinárias sem votos não têm nota ponderada e ficam fora do ranking ponderado)
+
+@query
+def worst_rated_cuisines(countries: Sequence[str], n: int = 10, score: str = 'aggregate_rating', path: str = DATA_PATH) -> pd.DataFrame:
+    return _ranking(cuisine_metrics(countries, path = path).dropna(subset = [score]), ['cuisines', score], score, True, n)
+
+# Culinárias mais bem avaliadas
+
+@query
+def best_rated_cuisines(countries: Sequence[str], n: int = 10, score: str = 'aggregate_rating', path: str = DATA_PATH) -> pd.DataFrame:
+    return _ranking(cuisine_metrics(countries, path = path).dropna(subset = [score]), ['cuisines', score], score, False, n)
+
+# Culinárias mais caras (Expensive/Gourmet) e pior avaliadas (nota <= 2.5); com normalized=True,
+# também com o custo médio em dólar (na moeda de cada país ele não seria somável entre países)
+#
+# Com outra nota de fome_zero.ranking.SCORES em `score`, o ranking é por ela, que entra depois da
+# avaliação média (culinárias sem votos ficam fora do ranking ponderado).
+
+def _cuisines_by_price_and_rating(countries, price_types, rating_buckets, ascending, n, normalized, score, path):
+    culinarias = cuisine_metrics(countries, price_types, rating_buckets, path = path).dropna(subset = [score])
+    notas = ['aggregate_rating'] if score == 'aggregate_rating' else ['aggregate_rating', score]
+    custos = ['average_cost_for_two_usd'] if normalized else []
+
+    return _ranking(culinarias, ['cuisines'] + notas + custos, score, ascending, n)
+
+@query
+def expensive_badly_rated_cuisines(countries: Sequence[str], n: int = 20, normalized: bool = False, score: str = 'aggregate_rating',
+                                   path: str = DATA_PATH) -> pd.DataFrame:
+    return _cuisines_by_price_and_rating(countries, EXPENSIVE, BAD_RATINGS, True, n, normalized, score, path)
+
+# Culinárias mais baratas (Cheap/Normal) e melhor avaliadas (nota >= 4)
+
+@query
+def cheap_well_rated_cuisines(countries: Sequence[str], n: int = 20, normalized: bool = False, score: str = 'aggregate_rating',
+                              path: str = DATA_PATH) -> pd.DataFrame:
+    return _cuisines_by_price_and_rating(countries, CHEAP, GOOD_RATINGS, False, n, normalized, score, path)
@@ -0,0 +1,103 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import numpy as np
+
+#====================================================================================================
+# TOP-K POR GRUPO
+#====================================================================================================
+
+# Os k primeiros de cada grupo saem de uma única ordenação estável seguida de groupby().head(k):
+# o custo é o de uma ordenação, qualquer que seja o número de grupos, sem laço por grupo nem
+# concatenações sucessivas. Sem grupo, é o top-k do dataframe inteiro.
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Linhas ordenadas por `by` e, nos empates, pelas colunas de `tie_break`
+#
+# `tie_ascending` é um valor para todas as colunas de desempate ou uma lista, uma por coluna. A
+# ordenação é estável: empates que as colunas de desempate não resolvem ficam na ordem em que as
+# linhas chegaram (nos rollups do cubo, a ordem das chaves).
+
+def rank(frame, by, ascending = False, tie_break = None, tie_ascending = True):
+    by = [by] if isinstance(by, str) else list(by)
+    tie_break = [tie_break] if isinstance(tie_break, str) else list(tie_break or [])
+    tie_ascending = list(tie_ascending) if isinstance(tie_ascending, (list, tuple)) else [tie_ascending] * len(tie_break)
+
+    return frame.sort_values(by + tie_break, ascending = [ascending] * len(by) + tie_ascending, kind = 'mergesort')
+
+# Os k primeiros por `by` em cada grupo de `group` (ou no dataframe inteiro, se group for None)
+#
+# O resultado vem na ordem do ranking (não agrupado), com o índice refeito; k None devolve todas
+# as linhas ordenadas.
+
+def top_k(frame, by, k = None, group = None, ascending = False, tie_break = None, tie_ascending = True):
+    ordenado = rank(frame, by, ascending, tie_break, tie_ascending)
+
+    if group is not None and k is not None:
+        ordenado = ordenado.groupby(group, sort = False, observed = True).head(k)
+    elif k is not None:
+        ordenado = ordenado.head(k)
+
+    return ordenado.reset_index(drop = True)
+
+#====================================================================================================
+# NOTAS PONDERADAS PELOS VOTOS
+#====================================================================================================
+
+# A média simples das notas põe uma culinária com um único restaurante nota 4.9 acima de outras
+# com milhares de votos. Duas notas alternativas, calculadas sobre as somas dos rollups (votos e
+# nota x votos, medidas do cubo) ou sobre os próprios restaurantes:
+#
+#   weighted_rating = soma(nota x votos) / soma(votos)
+#   bayesian_rating = (soma(nota x votos) + m x C) / (soma(votos) + m)
+#
+# A nota bayesiana puxa os itens com poucos votos para C, a média ponderada de todos os itens
+# ranqueados, com o peso de m votos: m é o quantil PRIOR_QUANTILE dos votos desses itens. Itens
+# sem votos ficam sem nota ponderada (NaN) e, na bayesiana, com a própria média C.
+
+# Quantil dos votos dos itens ranqueados usado como peso da média geral
+PRIOR_QUANTILE = 0.5
+
+# Colunas de nota aceitas pelos rankings
+SCORES = ['aggregate_rating', 'weighted_rating', 'bayesian_rating']
+
+# Nota ponderada e bayesiana de cada item, a partir dos votos e da soma de nota x votos
+#
+# `mean` e `prior` (C e m) substituem os calculados sobre os próprios itens quando os itens são só
+# parte dos ranqueados (ex.: os candidatos de fome_zero.leaders, com C e m de todos os restaurantes).
+
+def rating_scores(votes, rating_votes, quantile = PRIOR_QUANTILE, mean = None, prior = None):
+    votes = np.asarray(votes, dtype = 'float64')
+    rating_votes = np.asarray(rating_votes, dtype = 'float64')
+
+    total = votes.sum()
+    media = mean if mean is not None else (rating_votes.sum() / total if total > 0 else 0.0)
+    com_votos = votes[votes > 0]
+    if prior is None:
+        prior = np.quantile(com_votos, quantile) if len(com_votos) > 0 else 0.0
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        ponderada = np.where(votes > 0, rating_votes / votes, np.nan)
+        bayesiana = (rating_votes + prior * media) / (votes + prior)
+
+    return {'weighted_rating': ponderada, 'bayesian_rating': bayesiana}
+
+# Quantil (interpolação linear, como np.quantile) de valores dados por um histograma
+# (valor -> ocorrências), sem expandir as ocorrências
+
+def histogram_quantile(values, counts, quantile = PRIOR_QUANTILE):
+    ordem = np.argsort(values, kind = 'stable')
+    values = np.asarray(values, dtype = 'float64')[ordem]
+    acumulado = np.cumsum(np.asarray(counts, dtype = 'int64')[ordem])
+    if len(acumulado) == 0 or acumulado[-1] == 0:
+        return 0.0
+
+    posicao = (acumulado[-1] - 1) * quantile
+    abaixo = int(np.floor(posicao))
+    x0, x1 = values[np.searchsorted(acumulado, [abaixo, min(abaixo + 1, acumulado[-1] - 1)], side = 'right')]
+
+    return x0 + (posicao - abaixo) * (x1 - x0)
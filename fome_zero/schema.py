@@ -0,0 +1,100 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+#====================================================================================================
+# ESQUEMA COMPACTO
+#====================================================================================================
+
+# Colunas de texto com poucos valores distintos: viram categorias
+CATEGORY_COLUMNS = ['country', 'city', 'locality', 'cuisines', 'cuisine_list', 'currency', 'price_type', 'color', 'rating_text']
+
+# Indicadores 0/1
+FLAG_COLUMNS = ['has_table_booking', 'has_online_delivery', 'is_delivering_now']
+
+# Coordenadas (a nota média continua float64: em float32 as médias por grupo mudam na última
+# casa e trocam a ordem dos empates nos rankings das páginas)
+FLOAT32_COLUMNS = ['longitude', 'latitude']
+
+# Inteiros que cabem em 32 bits (ids, custos e votos) e em 8 bits (faixa de preço)
+INT32_COLUMNS = ['restaurant_id', 'average_cost_for_two', 'votes']
+UINT8_COLUMNS = ['price_range']
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Converte o dataframe limpo para o esquema compacto
+#
+# Colunas categóricas exigem observed=True nos groupby, senão o pandas devolve também os
+# grupos de categorias ausentes após o filtro de países.
+
+def compact_frame(data):
+    dtypes = {}
+
+    for col in CATEGORY_COLUMNS:
+        dtypes[col] = 'category'
+    for col in FLAG_COLUMNS:
+        dtypes[col] = 'bool'
+    for col in FLOAT32_COLUMNS:
+        dtypes[col] = 'float32'
+    for col in INT32_COLUMNS:
+        dtypes[col] = 'int32'
+    for col in UINT8_COLUMNS:
+        dtypes[col] = 'uint8'
+
+    dtypes = {col: dtype for col, dtype in dtypes.items() if col in data.columns}
+
+    return data.astype(dtypes)
+
+# Concatenação de dataframes compactos (blocos do arquivo, partições), mantendo o esquema
+#
+# O pd.concat de colunas categóricas com categorias diferentes devolve texto; aqui elas são
+# unidas por union_categoricals, com as categorias ordenadas como em compact_frame.
+
+def concat_frames(frames):
+    frames = list(frames)
+    colunas = {}
+
+    for col in frames[0].columns:
+        partes = [frame[col] for frame in frames]
+        if isinstance(partes[0].dtype, pd.CategoricalDtype):
+            colunas[col] = union_categoricals(partes, sort_categories = True)
+        else:
+            colunas[col] = pd.concat(partes, ignore_index = True)
+
+    return pd.DataFrame(colunas)
+
+# Devolve as colunas categóricas de um resultado agregado (pequeno) para texto
+#
+# O plotly.express (5.11) falha com categorias sem ocorrência no resultado e reordena as
+# barras pela ordem das categorias; os gráficos recebem sempre colunas de texto.
+
+def decategorize(frame):
+    cols = frame.select_dtypes('category').columns
+
+    return frame.astype({col: object for col in cols}) if len(cols) > 0 else frame
+
+# Uso de memória por coluna (MB), antes e depois da compactação
+
+def memory_report(before, after):
+    report = pd.DataFrame({'antes_mb': before.memory_usage(deep = True, index = False),
+                           'depois_mb': after.memory_usage(deep = True, index = False)}) / 1024 ** 2
+    report.loc['total', :] = report.sum()
+    report['reducao'] = report['antes_mb'] / report['depois_mb']
+
+    return report
+
+#====================================================================================================
+# EXECUÇÃO DIRETA: python -m fome_zero.schema
+#====================================================================================================
+
+if __name__ == '__main__':
+
+    from fome_zero.data import load_clean_data
+
+    data = load_clean_data()
+    print(memory_report(data, compact_frame(data)).round(3).to_string())
@@ -0,0 +1,239 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import numpy as np
+import pandas as pd
+
+from fome_zero.cuisines import load_cuisine_bridge
+from fome_zero.data import CACHE_VERSIONS, DATA_PATH, data_version, load_clean_data, partition_paths, versioned_cache
+from fome_zero.ingest import reads_in_chunks
+from fome_zero.instrument import span
+from fome_zero.partitions import is_partitioned
+from fome_zero.schema import decategorize
+
+#====================================================================================================
+# SKETCHES DE DIVERSIDADE GASTRONÔMICA (MODO APROXIMADO)
+#====================================================================================================
+
+# Alternativa aproximada às contagens exatas do cubo, para dados em streaming ou vindos de várias
+# fontes: cada país e cada cidade têm um sketch de tamanho fixo das suas culinárias, que pode ser
+# montado por partes (blocos do CSV, arquivos) e somado depois, sem guardar as linhas.
+#
+#   - HyperLogLog: quantidade de culinárias distintas, com erro padrão relativo de 1.04 / sqrt(m)
+#     (m = 2 ** HLL_PRECISION registradores); a soma de dois sketches é o máximo dos registradores.
+#   - Top-k de Misra-Gries (a forma mergeável do space-saving): até TOPK_CAPACITY culinárias com
+#     contagens que subestimam a real em no máximo (N - soma das contagens) / (TOPK_CAPACITY + 1),
+#     sendo N o total de ocorrências; o limite continua valendo após a soma de sketches.
+#
+# Como no cubo, um restaurante conta em cada culinária que oferece.
+
+# Bits do índice do registrador no hash (2 ** 12 registradores de 1 byte: erro padrão de 1.6%)
+HLL_PRECISION = 12
+
+# Contadores do top-k de cada sketch
+TOPK_CAPACITY = 64
+
+# Níveis dos sketches e as colunas da chave de cada um
+LEVELS = {'country': ['country'], 'city': ['country', 'city']}
+
+#====================================================================================================
+# HYPERLOGLOG
+#====================================================================================================
+
+# Quantidade de bits de cada valor (0 para zero); exata, pois cada metade de 32 bits cabe num float64
+
+def _bit_length(values):
+    alto = (values >> np.uint64(32)).astype('float64')
+    baixo = (values & np.uint64(0xFFFFFFFF)).astype('float64')
+
+    return np.where(alto > 0, np.frexp(alto)[1] + 32, np.frexp(baixo)[1])
+
+# Registrador e posição do primeiro bit 1 de cada hash de 64 bits
+
+def hll_positions(hashes, precision = HLL_PRECISION):
+    hashes = np.asarray(hashes, dtype = 'uint64')
+    resto_bits = 64 - precision
+
+    registrador = (hashes >> np.uint64(resto_bits)).astype('int64')
+    resto = hashes & np.uint64((1 << resto_bits) - 1)
+
+    return registrador, (resto_bits - _bit_length(resto) + 1).astype('uint8')
+
+class HyperLogLog:
+
+    def __init__(self, precision = HLL_PRECISION, registers = None):
+        self.precision = precision
+        self.registers = np.zeros(2 ** precision, dtype = 'uint8') if registers is None else registers
+
+    # Acrescenta hashes (uint64) ao sketch
+
+    def add(self, hashes):
+        registrador, posicao = hll_positions(hashes, self.precision)
+        np.maximum.at(self.registers, registrador, posicao)
+
+        return self
+
+    # Soma de dois sketches de mesma precisão (união dos conjuntos)
+
+    def merge(self, other):
+        return HyperLogLog(self.precision, np.maximum(self.registers, other.registers))
+
+    # Estimativa da quantidade de distintos (contagem linear quando há registradores vazios e a
+    # estimativa é pequena)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimativa = alpha * m * m / np.sum(np.exp2(-self.registers.astype('float64')))
+
+        vazios = np.count_nonzero(self.registers == 0)
+        if estimativa <= 2.5 * m and vazios > 0:
+            estimativa = m * np.log(m / vazios)
+
+        return float(estimativa)
+
+    # Erro padrão relativo da estimativa
+
+    def relative_error(self):
+        return hll_relative_error(self.precision)
+
+# Erro padrão relativo de um HyperLogLog com 2 ** precision registradores
+
+def hll_relative_error(precision = HLL_PRECISION):
+    return 1.04 / np.sqrt(2 ** precision)
+
+#====================================================================================================
+# TOP-K (MISRA-GRIES)
+#====================================================================================================
+
+class TopK:
+
+    def __init__(self, capacity = TOPK_CAPACITY, counts = None, total = 0):
+        self.capacity = capacity
+        self.counts = {} if counts is None else counts
+        self.total = total
+
+    # Reduz a capacity contadores: subtrai de todos a contagem do (capacity + 1)-ésimo maior e
+    # descarta os que zeram (com no máximo TOPK_CAPACITY valores, um dict é mais leve que uma Series)
+
+    def _reduce(self, counts):
+        if len(counts) <= self.capacity:
+            return counts
+
+        corte = sorted(counts.values(), reverse = True)[self.capacity]
+
+        return {valor: n - corte for valor, n in counts.items() if n > corte}
+
+    # Acrescenta contagens exatas (dict valor -> ocorrências), ex.: as de um bloco do arquivo
+
+    def add_counts(self, counts):
+        return self.merge(TopK(self.capacity, counts, sum(counts.values())))
+
+    # Soma de dois sketches
+
+    def merge(self, other):
+        counts = dict(self.counts)
+        for valor, n in other.counts.items():
+            counts[valor] = counts.get(valor, 0) + n
+
+        return TopK(self.capacity, self._reduce(counts), self.total + other.total)
+
+    # Subestimação máxima de qualquer contagem
+
+    def error_bound(self):
+        return (self.total - sum(self.counts.values())) / (self.capacity + 1)
+
+    # Os n valores mais frequentes, com a contagem estimada (ordenados pela contagem e, nos
+    # empates, pelo valor)
+
+    def top(self, n = None):
+        ordem = sorted(self.counts.items(), key = lambda item: (-item[1], item[0]))[:n]
+
+        return pd.Series(dict(ordem), dtype = 'int64')
+
+#====================================================================================================
+# SKETCHES POR PAÍS E CIDADE
+#====================================================================================================
+
+# Sketches de uma parte dos dados: {nível: {chave: (HyperLogLog, TopK)}}
+#
+# O HyperLogLog de todas as chaves de um nível sai de um único np.maximum.at sobre a matriz
+# (chave x registrador); os hashes são calculados só sobre os nomes distintos das culinárias.
+
+def build_sketches(data, bridge, precision = HLL_PRECISION, capacity = TOPK_CAPACITY):
+    culinarias = np.asarray(bridge.names, dtype = object)
+    hashes = pd.util.hash_array(culinarias)[bridge.cuisine]
+    registrador, posicao = hll_positions(hashes, precision)
+
+    sketches = {}
+    for level, cols in LEVELS.items():
+        chaves = decategorize(data[cols]).iloc[bridge.restaurant].reset_index(drop = True)
+        codes, uniques = pd.MultiIndex.from_frame(chaves).factorize()
+
+        registros = np.zeros((len(uniques), 2 ** precision), dtype = 'uint8')
+        np.maximum.at(registros, (codes, registrador), posicao)
+
+        # Contagens (chave, culinária) de uma vez, distribuídas depois em um dict por chave
+        contagens = pd.Series(1, index = pd.MultiIndex.from_arrays([codes, culinarias[bridge.cuisine]])).groupby(level = [0, 1]).sum()
+        por_chave = [{} for _ in range(len(uniques))]
+        for (posicao_chave, culinaria), n in contagens.items():
+            por_chave[posicao_chave][culinaria] = int(n)
+
+        sketches[level] = {}
+        for posicao_chave, chave in enumerate(uniques):
+            chave = chave[0] if len(cols) == 1 else chave
+            sketches[level][chave] = (HyperLogLog(precision, registros[posicao_chave]), TopK(capacity).add_counts(por_chave[posicao_chave]))
+
+    return sketches
+
+# Soma de sketches de partes diferentes dos dados (blocos, arquivos), chave a chave
+
+def merge_sketches(partes):
+    sketches = {level: {} for level in LEVELS}
+
+    for parte in partes:
+        for level, por_chave in parte.items():
+            for chave, (hll, topk) in por_chave.items():
+                if chave in sketches[level]:
+                    atual_hll, atual_topk = sketches[level][chave]
+                    hll, topk = atual_hll.merge(hll), atual_topk.merge(topk)
+                sketches[level][chave] = (hll, topk)
+
+    return sketches
+
+# Sketches do arquivo de dados, construídos uma única vez por versão (caminho + mtime), pelo
+# mesmo critério do cubo: um CSV grande sem snapshot em dia é lido em blocos. Num diretório de
+# partições, são a soma dos sketches das partições dos países em `countries` (todas, se None).
+
+def load_sketches(path = DATA_PATH, countries = None):
+    if is_partitioned(path):
+        return merge_sketches([load_sketches(arquivo) for arquivo in partition_paths(path, countries)])
+
+    return _load_sketches(*data_version(path))
+
+@versioned_cache(maxsize = CACHE_VERSIONS)
+def _load_sketches(path, mtime_ns):
+    if reads_in_chunks(path):
+        # Importado aqui: fome_zero.streaming importa este módulo
+        from fome_zero.streaming import load_streamed
+        return load_streamed(path).sketches
+
+    data, bridge = load_clean_data(path, compact = True), load_cuisine_bridge(path)
+    with span('sketches'):
+        return build_sketches(data, bridge)
+
+# Culinárias distintas estimadas de cada chave de um nível (country ou city)
+
+def distinct_cuisines(sketches, level):
+    return {chave: hll.estimate() for chave, (hll, _) in sketches[level].items()}
+
+# Top-k das culinárias somando os sketches das chaves selecionadas
+
+def merged_topk(sketches, level, chaves, capacity = TOPK_CAPACITY):
+    topk = TopK(capacity)
+    for chave in chaves:
+        if chave in sketches[level]:
+            topk = topk.merge(sketches[level][chave][1])
+
+    return topk
@@ -0,0 +1,72 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import os
+
+import pyarrow as pa
+from pyarrow import feather
+
+#====================================================================================================
+# SNAPSHOT COLUNAR (FEATHER / ARROW IPC)
+#====================================================================================================
+
+# O snapshot guarda a saída de clean_code no esquema compacto de fome_zero.schema, em Arrow IPC
+# sem compressão, o que permite lê-lo por memory map: as colunas numéricas chegam ao pandas sem
+# cópia e sem parse de texto, e as categóricas vêm como dicionários, já no tipo category.
+
+SNAPSHOT_SUFFIX = '.feather'
+
+# Versão do formato do snapshot: muda sempre que clean_code passa a produzir outras colunas (ou
+# o esquema compacto muda), para que um snapshot antigo nunca seja lido como atual
+SNAPSHOT_VERSION = 4
+
+# Caminho do snapshot ao lado do CSV de origem (zomato.csv -> zomato.v4.feather)
+
+def snapshot_path(csv_path):
+    return f'{os.path.splitext(csv_path)[0]}.v{SNAPSHOT_VERSION}{SNAPSHOT_SUFFIX}'
+
+# O snapshot vale enquanto for mais novo que o CSV
+
+def is_fresh(csv_path, path):
+    if not os.path.exists(path):
+        return False
+
+    return os.stat(path).st_mtime_ns >= os.stat(csv_path).st_mtime_ns
+
+# Gravação atômica: escreve num arquivo temporário e troca de nome, para que outro worker
+# nunca leia um snapshot pela metade
+
+def write_snapshot(data, path):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    table = pa.Table.from_pandas(data, preserve_index = False)
+
+    try:
+        feather.write_feather(table, tmp_path, compression = 'uncompressed')
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+# Leitura por memory map
+
+def read_snapshot(path):
+    table = feather.read_table(path, memory_map = True)
+
+    return table.to_pandas(split_blocks = True)
+
+#====================================================================================================
+# EXECUÇÃO DIRETA: python -m fome_zero.snapshot [caminho do csv]
+#====================================================================================================
+
+if __name__ == '__main__':
+
+    import sys
+    from fome_zero.data import DATA_PATH, clean_code_vectorized, read_raw
+    from fome_zero.schema import compact_frame
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else DATA_PATH
+    path = snapshot_path(csv_path)
+
+    write_snapshot(compact_frame(clean_code_vectorized(read_raw(csv_path))), path)
+    print(f'Snapshot gravado em {path}')
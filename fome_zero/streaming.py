@@ -0,0 +1,91 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+from fome_zero.cube import build_cube, merge_cubes
+from fome_zero.cuisines import CuisineBridge
+from fome_zero.data import CACHE_VERSIONS, DATA_PATH, data_version, versioned_cache
+from fome_zero.geo import GEO_COLUMNS
+from fome_zero.ingest import CHUNK_ROWS, clean_chunks
+from fome_zero.instrument import span
+from fome_zero.leaders import build_leaders, merge_leaders
+from fome_zero.schema import compact_frame, concat_frames
+from fome_zero.sketches import LEVELS, build_sketches, merge_sketches
+from fome_zero.tiles import build_pyramid, merge_pyramids
+
+#====================================================================================================
+# AGREGADOS EM STREAMING
+#====================================================================================================
+
+# Num CSV grande sem snapshot em dia (fome_zero.ingest.reads_in_chunks), todos os agregados das
+# páginas saem de uma única leitura em blocos: cada bloco limpo, sem os restaurantes já vistos,
+# alimenta o cubo, os sketches, a pirâmide do mapa, os candidatos do top de restaurantes e as
+# colunas do índice espacial. Assim, uma primeira carga faz uma passada pelo CSV e uma única
+# remoção de duplicatas, qualquer que seja o carregador chamado primeiro.
+
+class StreamedAggregates:
+
+    def __init__(self, cube, sketches, pyramid, leaders, geo):
+
+        # Cubo de métricas (fome_zero.cube)
+        self.cube = cube
+
+        # HyperLogLog e top-k de culinárias por país e cidade (fome_zero.sketches)
+        self.sketches = sketches
+
+        # Pirâmide de células do mapa da Home (fome_zero.tiles)
+        self.pyramid = pyramid
+
+        # Candidatos do top de restaurantes (fome_zero.leaders)
+        self.leaders = leaders
+
+        # Colunas do índice espacial da página Nearby (fome_zero.geo.GEO_COLUMNS)
+        self.geo = geo
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Agregados montados bloco a bloco: cada bloco vira um parcial de cada agregado, somado ao
+# acumulado (em memória ficam um bloco, os agregados e as colunas do índice espacial)
+#
+# first_row do cubo é deslocado pelas linhas dos blocos anteriores, e as coordenadas da pirâmide
+# passam pelo esquema compacto, como no dataframe em cache: os agregados são iguais aos montados
+# sobre o arquivo inteiro.
+
+def stream_aggregates(path = DATA_PATH, chunksize = CHUNK_ROWS):
+    cube = pyramid = leaders = None
+    sketches = {level: {} for level in LEVELS}
+    geo = []
+    linhas = 0
+
+    for data in clean_chunks(path, chunksize):
+        bridge = CuisineBridge(data['cuisine_list'])
+
+        parcial = build_cube(data, bridge)
+        parcial['first_row'] += linhas
+        linhas += len(data)
+        cube = parcial if cube is None else merge_cubes([cube, parcial])
+
+        sketches = merge_sketches([sketches, build_sketches(data, bridge)])
+
+        parcial = build_pyramid(compact_frame(data[['country', 'latitude', 'longitude']]))
+        pyramid = parcial if pyramid is None else merge_pyramids([pyramid, parcial])
+
+        parcial = build_leaders(data)
+        leaders = parcial if leaders is None else merge_leaders([leaders, parcial])
+
+        geo.append(compact_frame(data[GEO_COLUMNS]))
+
+    return StreamedAggregates(cube, sketches, pyramid, leaders, concat_frames(geo))
+
+# Agregados do arquivo de dados, montados uma única vez por versão (caminho + mtime); usados pelos
+# carregadores de cada agregado quando o arquivo é lido em blocos
+
+def load_streamed(path = DATA_PATH):
+    return _load_streamed(*data_version(path))
+
+@versioned_cache(maxsize = CACHE_VERSIONS)
+def _load_streamed(path, mtime_ns):
+    with span('agregados em streaming'):
+        return stream_aggregates(path)
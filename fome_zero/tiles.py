@@ -0,0 +1,185 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import numpy as np
+import pandas as pd
+
+from fome_zero.data import CACHE_VERSIONS, DATA_PATH, data_version, load_clean_data, partition_paths, versioned_cache
+from fome_zero.ingest import reads_in_chunks
+from fome_zero.partitions import is_partitioned
+
+#====================================================================================================
+# PRÉ-AGRUPAMENTO ESPACIAL POR NÍVEL DE ZOOM
+#====================================================================================================
+
+# Em cada nível de zoom os restaurantes são agrupados numa grade de latitude/longitude com
+# CELLS_PER_TILE células por bloco de 256 px do mapa. Cada célula guarda contagem e somas das
+# coordenadas por país (aditivas), de modo que qualquer seleção de países vira um groupby sobre
+# as células, sem voltar aos restaurantes. O navegador recebe só as células visíveis; a partir de
+# EXPAND_ZOOM, recebe os restaurantes individuais da área visível.
+
+ZOOM_LEVELS = range(0, 13)
+CELLS_PER_TILE = 4
+EXPAND_ZOOM = 13
+
+# Vista inicial do mapa (mundo inteiro)
+WORLD_VIEW = {'zoom': 2, 'bounds': [[-60.0, -180.0], [75.0, 180.0]]}
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Tamanho da célula (graus) num nível de zoom
+
+def cell_size(zoom):
+    return 360.0 / (2 ** zoom) / CELLS_PER_TILE
+
+# Chaves das linhas da pirâmide
+PYRAMID_KEYS = ['zoom', 'country', 'ix', 'iy']
+
+# Pirâmide de células: uma linha por zoom x país x célula
+
+def build_pyramid(data):
+    latitude = data['latitude'].to_numpy(dtype = 'float64')
+    longitude = data['longitude'].to_numpy(dtype = 'float64')
+    validas = np.isfinite(latitude) & np.isfinite(longitude)
+
+    latitude, longitude = latitude[validas], longitude[validas]
+    country = data.loc[validas, 'country'].astype(str).to_numpy()
+
+    niveis = []
+    for zoom in ZOOM_LEVELS:
+        tamanho = cell_size(zoom)
+        frame = pd.DataFrame({'country': country,
+                              'ix': np.floor((longitude + 180.0) / tamanho).astype('int64'),
+                              'iy': np.floor((latitude + 90.0) / tamanho).astype('int64'),
+                              'restaurants': 1,
+                              'lat_sum': latitude,
+                              'lon_sum': longitude})
+        nivel = frame.groupby(['country', 'ix', 'iy'], sort = False).sum().reset_index()
+        nivel.insert(0, 'zoom', zoom)
+        niveis.append(nivel)
+
+    return pd.concat(niveis, ignore_index = True)
+
+# Soma de pirâmides parciais (ex.: de blocos do arquivo), nível a nível e, em cada nível, na ordem
+# de primeira aparição das células, como em build_pyramid sobre o arquivo inteiro
+
+def merge_pyramids(piramides):
+    piramide = pd.concat(piramides, ignore_index = True).groupby(PYRAMID_KEYS, sort = False).sum().reset_index()
+
+    return piramide.sort_values('zoom', kind = 'stable', ignore_index = True)
+
+# Pirâmide do arquivo de dados, construída uma única vez por versão (caminho + mtime), pelo mesmo
+# critério do cubo: um CSV grande sem snapshot em dia é lido em blocos.
+#
+# Num diretório de partições, é a concatenação das pirâmides das partições dos países em
+# `countries` (todas, se None): os grupos já são separados por país.
+
+def load_pyramid(path = DATA_PATH, countries = None):
+    if not is_partitioned(path):
+        return _load_pyramid(*data_version(path))
+
+    todas = partition_paths(path)
+    piramides = [load_pyramid(arquivo) for arquivo in partition_paths(path, countries)] or [load_pyramid(todas[0]).iloc[:0]]
+
+    return pd.concat(piramides, ignore_index = True)
+
+@versioned_cache(maxsize = CACHE_VERSIONS)
+def _load_pyramid(path, mtime_ns):
+    if reads_in_chunks(path):
+        # Importado aqui: fome_zero.streaming importa este módulo
+        from fome_zero.streaming import load_streamed
+        return load_streamed(path).pyramid
+
+    return build_pyramid(load_clean_data(path, compact = True))
+
+# Área (sul, oeste, norte, leste) ampliada em `margem` vezes a altura/largura de cada lado
+#
+# Com a margem, pequenos arrastes do mapa não exigem nova consulta ao servidor.
+
+def padded_bounds(bounds, margem = 0.5):
+    (sul, oeste), (norte, leste) = bounds
+    altura, largura = norte - sul, leste - oeste
+
+    return [[max(sul - margem * altura, -90.0), oeste - margem * largura],
+            [min(norte + margem * altura, 90.0), leste + margem * largura]]
+
+# Máscara de longitudes dentro de [oeste, leste], tratando a volta no antimeridiano
+
+def _longitude_mask(longitude, oeste, leste):
+    if leste - oeste >= 360.0:
+        return np.ones(len(longitude), dtype = bool)
+
+    oeste = (oeste + 180.0) % 360.0 - 180.0
+    leste = (leste + 180.0) % 360.0 - 180.0
+    if oeste <= leste:
+        return (longitude >= oeste) & (longitude <= leste)
+
+    return (longitude >= oeste) | (longitude <= leste)
+
+# Grupos visíveis num zoom e numa área, para os países selecionados
+#
+# Devolve latitude/longitude do centróide e quantidade de restaurantes de cada célula.
+
+def viewport_clusters(pyramid, zoom, bounds, countries = None):
+    nivel = min(max(int(zoom), ZOOM_LEVELS[0]), ZOOM_LEVELS[-1])
+    part = pyramid.loc[pyramid['zoom'].to_numpy() == nivel, :]
+
+    if countries is not None:
+        part = part.loc[part['country'].isin(countries), :]
+
+    celulas = part.groupby(['ix', 'iy'], sort = False)[['restaurants', 'lat_sum', 'lon_sum']].sum()
+    clusters = pd.DataFrame({'latitude': celulas['lat_sum'] / celulas['restaurants'],
+                             'longitude': celulas['lon_sum'] / celulas['restaurants'],
+                             'restaurants': celulas['restaurants']}).reset_index(drop = True)
+
+    (sul, oeste), (norte, leste) = bounds
+    linhas = ((clusters['latitude'] >= sul) & (clusters['latitude'] <= norte)).to_numpy()
+    linhas &= _longitude_mask(clusters['longitude'].to_numpy(), oeste, leste)
+
+    return clusters.loc[linhas, :].reset_index(drop = True)
+
+# Restaurantes dentro de uma área (usado a partir de EXPAND_ZOOM), dos países selecionados
+#
+# Área e países saem de uma única máscara sobre as colunas; só as linhas visíveis são copiadas.
+
+def viewport_points(data, bounds, countries = None):
+    (sul, oeste), (norte, leste) = bounds
+    latitude = data['latitude'].to_numpy(dtype = 'float64')
+
+    linhas = (latitude >= sul) & (latitude <= norte)
+    linhas &= _longitude_mask(data['longitude'].to_numpy(dtype = 'float64'), oeste, leste)
+
+    if countries is not None:
+        linhas &= data['country'].isin(countries).to_numpy()
+
+    return data.take(np.flatnonzero(linhas))
+
+# Converte o retorno do st_folium ({'zoom': ..., 'bounds': {'_southWest': ..., '_northEast': ...}})
+# numa vista {'zoom', 'bounds'}; devolve None se o mapa ainda não informou a área
+
+def view_from_map(retorno):
+    if not retorno or not retorno.get('zoom') or not retorno.get('bounds'):
+        return None
+
+    sudoeste, nordeste = retorno['bounds'].get('_southWest'), retorno['bounds'].get('_northEast')
+    if not sudoeste or not nordeste or sudoeste.get('lat') is None or nordeste.get('lat') is None:
+        return None
+
+    return {'zoom': int(retorno['zoom']),
+            'bounds': [[sudoeste['lat'], sudoeste['lng']], [nordeste['lat'], nordeste['lng']]]}
+
+# A vista nova exige outra consulta se mudou o zoom ou se saiu da área já enviada
+
+def needs_refresh(vista, nova, area):
+    if nova is None:
+        return False
+    if nova['zoom'] != vista['zoom']:
+        return True
+
+    (sul, oeste), (norte, leste) = nova['bounds']
+    (area_sul, area_oeste), (area_norte, area_leste) = area
+
+    return sul < area_sul or norte > area_norte or oeste < area_oeste or leste > area_leste
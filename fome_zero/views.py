@@ -0,0 +1,258 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+from fome_zero import queries
+from fome_zero.charts import bar_avaliacao, bar_graph, bar_graph_city, cached_figure, cached_figure_json, make_figure, treemap_graph
+from fome_zero.data import DATA_PATH
+
+#====================================================================================================
+# GRÁFICOS E TABELAS DAS PÁGINAS
+#====================================================================================================
+
+# Cada gráfico e cada tabela das páginas Home, Country, City e Gastronomic tem um nome e uma
+# função que recebe a seleção de países: a consulta de fome_zero.queries, os nomes das colunas em
+# português e o gráfico (ou a formatação da tabela). As páginas e a exportação estática
+# (fome_zero.export) montam os gráficos pelas mesmas funções, e os gráficos passam pelo cache do
+# processo (fome_zero.charts.cached_figure).
+
+#====================================================================================================
+# GRÁFICOS
+#====================================================================================================
+
+# Country
+
+def _pais_restaurantes(countries, path):
+    contagem = queries.restaurants_per_country(countries, path = path)
+    contagem.columns = ['Países', 'Qt. Restaurantes']
+
+    return bar_graph(contagem, x='Países', y='Qt. Restaurantes', color='Países', text='Qt. Restaurantes')
+
+def _pais_cidades(countries, path):
+    contagem = queries.cities_per_country(countries, path = path)
+    contagem.columns = ['Países', 'Qt. Cidades']
+
+    return bar_graph(contagem, x='Países', y='Qt. Cidades', color='Países', text='Qt. Cidades')
+
+def _pais_culinarias(approximate = False):
+    def build(countries, path):
+        contagem = queries.cuisines_per_country(countries, approximate = approximate, path = path)
+        contagem.columns=['País','Culinárias']
+
+        return treemap_graph(contagem, path='País', value='Culinárias', color='Culinárias')
+
+    return build
+
+def _pais_avaliacoes(countries, path):
+    contagem = queries.top_countries_by_votes(countries, n = 5, path = path)
+    contagem.columns = ['Países', 'Qt. Avaliações (Milhões)']
+
+    fig = bar_graph(contagem, x='Qt. Avaliações (Milhões)', y='Países', color='Países', text='Qt. Avaliações (Milhões)')
+
+    return fig.update_traces(textposition=None)
+
+def _pais_notas(score = 'aggregate_rating', coluna = 'Média das Avaliações'):
+    def build(countries, path):
+        contagem = queries.rating_per_country(countries, score = score, path = path)
+        contagem.columns=['Países', coluna]
+
+        fig = bar_graph (contagem, x='Países', y=coluna, color ='Países', text=coluna)
+
+        return fig.update_traces(textangle=0, textposition='inside', texttemplate='%{text:.2f}')
+
+    return build
+
+# City
+
+def _cidade_top_por_pais(countries, path):
+    df_final = queries.top_city_per_country(countries, path = path)
+    df_final.columns=['País', 'Cidade', 'Qt. Restaurantes']
+
+    return bar_graph_city(df_final, x='Qt. Restaurantes', y='Cidade', color='País', text='Qt. Restaurantes')
+
+def _cidades_por_nota(rating_buckets):
+    def build(countries, path):
+        contagem = queries.top_cities_by_rating(countries, rating_buckets, n = 7, path = path)
+        contagem.columns = ['País', 'Cidade', 'Qt. Restaurantes']
+
+        return bar_graph_city(contagem, x='Cidade', y='Qt. Restaurantes', color='País', text='Qt. Restaurantes')
+
+    return build
+
+def _cidade_culinarias(approximate = False):
+    def build(countries, path):
+        contagem = queries.top_cities_by_cuisines(countries, n = 10, approximate = approximate, path = path)
+        contagem.columns = ['País', 'Cidade', 'Qt. Cozinhas']
+
+        return bar_graph_city(contagem, x='Qt. Cozinhas', y='Cidade', color = 'País', text='Qt. Cozinhas')
+
+    return build
+
+# Gastronomic
+
+def _gastronomia_top(approximate = False):
+    def build(countries, path):
+        contagem = queries.top_cuisines(countries, n = 10, approximate = approximate, path = path)
+        contagem.columns=['Gastronomia', 'Qt. Restaurantes']
+
+        return make_figure('funnel', contagem, x='Qt. Restaurantes', y='Gastronomia', color='Gastronomia')
+
+    return build
+
+def _culinarias_por_nota(consulta, score = 'aggregate_rating', coluna = 'Avaliação Média'):
+    def build(countries, path):
+        contagem = consulta(countries, n = 10, score = score, path = path)
+        contagem.columns=['Gastronomia', coluna]
+
+        return bar_avaliacao(contagem, x='Gastronomia', y=coluna, color=coluna, text=coluna)
+
+    return build
+
+# Gráficos por nome: (página, título, função)
+FIGURES = {
+    'pais_restaurantes': ('Country', 'Quantidade de restaurantes por país', _pais_restaurantes),
+    'pais_cidades': ('Country', 'Quantidade de cidades por país', _pais_cidades),
+    'pais_culinarias': ('Country', 'Quantidade de culinárias únicas por país', _pais_culinarias()),
+    'pais_avaliacoes': ('Country', 'Top 5 Países com maior quantitativo de avaliações', _pais_avaliacoes),
+    'pais_notas': ('Country', 'Avaliação média por país', _pais_notas()),
+    'cidade_top_por_pais': ('City', 'Cidades de cada país com mais restaurantes cadastrados', _cidade_top_por_pais),
+    'cidade_abaixo_2.5': ('City', 'Top 7 cidades com restaurantes de média avaliativa abaixo de 2.5', _cidades_por_nota(['< 2.5'])),
+    'cidade_acima_4': ('City', 'Top 7 cidades com restaurantes de média avaliativa acima de 4', _cidades_por_nota(['> 4'])),
+    'cidade_culinarias': ('City', 'Top 10 cidades com maior diversidade gastronômica', _cidade_culinarias()),
+    'gastronomia_top': ('Gastronomic', 'As 10 culinárias mais ofertadas', _gastronomia_top()),
+    'gastronomia_piores': ('Gastronomic', 'As 10 culinárias pior avaliadas', _culinarias_por_nota(queries.worst_rated_cuisines)),
+    'gastronomia_melhores': ('Gastronomic', 'As 10 culinárias mais bem avaliadas', _culinarias_por_nota(queries.best_rated_cuisines)),
+
+    # Notas bayesianas (ponderadas pelos votos)
+    'pais_notas_bayes': ('Country', 'Avaliação bayesiana por país', _pais_notas('bayesian_rating', 'Avaliação Bayesiana')),
+    'gastronomia_piores_bayes': ('Gastronomic', 'As 10 culinárias pior avaliadas (nota bayesiana)',
+                                 _culinarias_por_nota(queries.worst_rated_cuisines, 'bayesian_rating', 'Avaliação Bayesiana')),
+    'gastronomia_melhores_bayes': ('Gastronomic', 'As 10 culinárias mais bem avaliadas (nota bayesiana)',
+                                   _culinarias_por_nota(queries.best_rated_cuisines, 'bayesian_rating', 'Avaliação Bayesiana')),
+
+    # Modo aproximado (sketches)
+    'pais_culinarias_aprox': ('Country', 'Quantidade de culinárias únicas por país (aproximada)', _pais_culinarias(True)),
+    'cidade_culinarias_aprox': ('City', 'Top 10 cidades com maior diversidade gastronômica (aproximada)', _cidade_culinarias(True)),
+    'gastronomia_top_aprox': ('Gastronomic', 'As 10 culinárias mais ofertadas (aproximada)', _gastronomia_top(True)),
+}
+
+# Sufixo das versões dos gráficos e tabelas ordenados pela nota bayesiana (fome_zero.ranking)
+BAYES_SUFFIX = '_bayes'
+
+# Sufixo das versões dos gráficos calculadas pelos sketches do modo aproximado (fome_zero.sketches)
+APPROX_SUFFIX = '_aprox'
+
+#====================================================================================================
+# TABELAS
+#====================================================================================================
+
+COLUNAS_RESTAURANTES = ['ID','Nome','País','Cidade','Culinária', 'Moeda', 'Preço Médio - Prato p/2', 'Avaliação Média', 'Qt. Votos']
+COLUNAS_CIDADES = ['País', 'Cidade', 'Moeda', 'Preço Médio - Prato p/ 2', 'Avaliação Média']
+COLUNAS_CIDADES_USD = ['País', 'Cidade', 'Moeda', 'Preço Médio - Prato p/ 2', 'Preço Médio (US$) - Prato p/ 2', 'Avaliação Média']
+COLUNAS_CULINARIAS_USD = ['Culinárias', 'Avaliação Média', 'Preço Médio (US$) - Prato p/ 2']
+COLUNAS_CULINARIAS_BAYES = ['Culinárias', 'Avaliação Média', 'Avaliação Bayesiana']
+COLUNAS_CULINARIAS_USD_BAYES = ['Culinárias', 'Avaliação Média', 'Avaliação Bayesiana', 'Preço Médio (US$) - Prato p/ 2']
+
+# Sufixo das versões das tabelas com os custos normalizados em dólar (fome_zero.currency)
+USD_SUFFIX = '_usd'
+
+# Tabelas por nome: (página, título, consulta com argumentos, colunas, colunas com duas casas decimais)
+TABLES = {
+    'home_top10': ('Home', 'Top 10 restaurantes', (queries.top_restaurants, {'n': 10}), COLUNAS_RESTAURANTES,
+                   ['Preço Médio - Prato p/2', 'Avaliação Média']),
+    'home_top10_bayes': ('Home', 'Top 10 restaurantes (nota bayesiana)', (queries.top_restaurants, {'n': 10, 'score': 'bayesian_rating'}),
+                         COLUNAS_RESTAURANTES + ['Avaliação Bayesiana'], ['Preço Médio - Prato p/2', 'Avaliação Média', 'Avaliação Bayesiana']),
+    'pais_custos': ('Country', 'Média de custo e de avaliação dos países', (queries.cost_and_rating_per_country, {}),
+                    ['País', 'Moeda', 'Preço Médio - Prato p/2', 'Avaliação Média'], ['Preço Médio - Prato p/2', 'Avaliação Média']),
+    'cidade_caras': ('City', 'Top 10 cidades mais caras e pior avaliadas', (queries.expensive_badly_rated_cities, {'n': 10}),
+                     COLUNAS_CIDADES, ['Preço Médio - Prato p/ 2', 'Avaliação Média']),
+    'cidade_baratas': ('City', 'Top 10 cidades mais baratas e melhor avaliadas', (queries.cheap_well_rated_cities, {'n': 10}),
+                       COLUNAS_CIDADES, ['Preço Médio - Prato p/ 2', 'Avaliação Média']),
+    'gastronomia_caras': ('Gastronomic', '20 Culinárias mais caras e pior avaliadas', (queries.expensive_badly_rated_cuisines, {'n': 20}),
+                          ['Culinárias', 'Avaliação Média'], 'Avaliação Média'),
+    'gastronomia_baratas': ('Gastronomic', '20 Culinárias mais baratas e melhor avaliadas', (queries.cheap_well_rated_cuisines, {'n': 20}),
+                            ['Culinárias', 'Avaliação Média'], 'Avaliação Média'),
+
+    # Custos em dólar
+    'pais_custos_usd': ('Country', 'Média de custo (em dólar) e de avaliação dos países', (queries.cost_and_rating_per_country, {'normalized': True}),
+                        ['País', 'Moeda', 'Preço Médio - Prato p/2', 'Preço Médio (US$) - Prato p/2', 'Avaliação Média'],
+                        ['Preço Médio - Prato p/2', 'Preço Médio (US$) - Prato p/2', 'Avaliação Média']),
+    'cidade_caras_usd': ('City', 'Top 10 cidades mais caras e pior avaliadas (custos em dólar)', (queries.expensive_badly_rated_cities, {'n': 10, 'normalized': True}),
+                         COLUNAS_CIDADES_USD, COLUNAS_CIDADES_USD[3:]),
+    'cidade_baratas_usd': ('City', 'Top 10 cidades mais baratas e melhor avaliadas (custos em dólar)', (queries.cheap_well_rated_cities, {'n': 10, 'normalized': True}),
+                           COLUNAS_CIDADES_USD, COLUNAS_CIDADES_USD[3:]),
+    'gastronomia_caras_usd': ('Gastronomic', '20 Culinárias mais caras e pior avaliadas (custos em dólar)', (queries.expensive_badly_rated_cuisines, {'n': 20, 'normalized': True}),
+                              COLUNAS_CULINARIAS_USD, COLUNAS_CULINARIAS_USD[1:]),
+    'gastronomia_baratas_usd': ('Gastronomic', '20 Culinárias mais baratas e melhor avaliadas (custos em dólar)', (queries.cheap_well_rated_cuisines, {'n': 20, 'normalized': True}),
+                                COLUNAS_CULINARIAS_USD, COLUNAS_CULINARIAS_USD[1:]),
+
+    # Notas bayesianas (ponderadas pelos votos), com e sem os custos em dólar
+    'gastronomia_caras_bayes': ('Gastronomic', '20 Culinárias mais caras e pior avaliadas (nota bayesiana)',
+                                (queries.expensive_badly_rated_cuisines, {'n': 20, 'score': 'bayesian_rating'}), COLUNAS_CULINARIAS_BAYES, COLUNAS_CULINARIAS_BAYES[1:]),
+    'gastronomia_baratas_bayes': ('Gastronomic', '20 Culinárias mais baratas e melhor avaliadas (nota bayesiana)',
+                                  (queries.cheap_well_rated_cuisines, {'n': 20, 'score': 'bayesian_rating'}), COLUNAS_CULINARIAS_BAYES, COLUNAS_CULINARIAS_BAYES[1:]),
+    'gastronomia_caras_usd_bayes': ('Gastronomic', '20 Culinárias mais caras e pior avaliadas (custos em dólar, nota bayesiana)',
+                                    (queries.expensive_badly_rated_cuisines, {'n': 20, 'normalized': True, 'score': 'bayesian_rating'}),
+                                    COLUNAS_CULINARIAS_USD_BAYES, COLUNAS_CULINARIAS_USD_BAYES[1:]),
+    'gastronomia_baratas_usd_bayes': ('Gastronomic', '20 Culinárias mais baratas e melhor avaliadas (custos em dólar, nota bayesiana)',
+                                      (queries.cheap_well_rated_cuisines, {'n': 20, 'normalized': True, 'score': 'bayesian_rating'}),
+                                      COLUNAS_CULINARIAS_USD_BAYES, COLUNAS_CULINARIAS_USD_BAYES[1:]),
+}
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Versão de um gráfico ou tabela (nome + sufixo), quando ela existe no registro
+
+def _variant(name, registry, suffix, enabled):
+    return name + suffix if enabled and name + suffix in registry else name
+
+# Gráfico de uma página pelo nome, para a seleção de países (do cache do processo, se já montado)
+#
+# Com bayesian=True, usa a versão do gráfico ordenada pela nota bayesiana e, com approximate=True,
+# a versão calculada pelos sketches, quando existem.
+
+def figure(name, countries, path = DATA_PATH, bayesian = False, approximate = False):
+    name = _variant(name, FIGURES, BAYES_SUFFIX, bayesian)
+    name = _variant(name, FIGURES, APPROX_SUFFIX, approximate)
+    build = FIGURES[name][2]
+
+    return cached_figure(name, countries, lambda: build(countries, path), path = path)
+
+# O mesmo gráfico em JSON, como está no cache (sem montar um Figure); usado pela exportação estática
+
+def figure_json(name, countries, path = DATA_PATH):
+    build = FIGURES[name][2]
+
+    return cached_figure_json(name, countries, lambda: build(countries, path), path = path)
+
+# Tabela de uma página pelo nome, com as colunas em português e os números formatados (Styler)
+#
+# Com normalized=True, usa a versão da tabela com os custos em dólar e, com bayesian=True, a
+# versão ordenada pela nota bayesiana, quando existem.
+
+def table(name, countries, path = DATA_PATH, normalized = False, bayesian = False):
+    name = _variant(name, TABLES, USD_SUFFIX, normalized)
+    name = _variant(name, TABLES, BAYES_SUFFIX, bayesian)
+
+    _, _, (consulta, kwargs), colunas, decimais = TABLES[name]
+
+    df = consulta(countries, path = path, **kwargs)
+    df.columns = colunas
+
+    return df.style.format(subset=decimais, formatter="{:.2f}")
+
+# Nota do modo aproximado, com os limites de erro para a seleção de países
+
+def approximation_note(countries, path = DATA_PATH):
+    limites = queries.approximation_bounds(countries, path = path).iloc[0]
+
+    return (f"Modo aproximado: culinárias distintas estimadas por HyperLogLog (erro padrão de {limites['hll_relative_error']:.1%}); "
+            f"contagens de restaurantes por culinária subestimadas em no máximo {limites['topk']:.0f}.")
+
+# Nomes dos gráficos e das tabelas de uma página, na ordem em que aparecem
+
+def page_views(page):
+    return ([name for name, (pagina, _, _) in FIGURES.items() if pagina == page],
+            [name for name, (pagina, *_) in TABLES.items() if pagina == page])
@@ -0,0 +1,112 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+from PIL import Image
+import streamlit as st
+from streamlit_folium import folium_static
+
+from fome_zero.geo import load_geo_index
+from fome_zero.instrument import finish_rerun, span, start_rerun
+from fome_zero.maps import build_fast_map
+from fome_zero.panel import performance_panel
+
+#====================================================================================================
+# CARREGANDO ARQUIVO E ÍNDICE ESPACIAL
+#====================================================================================================
+
+start_rerun('Nearby')
+
+with span('carregamento'):
+    index = load_geo_index()
+    data = index.data
+
+#====================================================================================================
+# SIDEBAR - Topo
+#====================================================================================================
+
+st.set_page_config(layout="wide", page_icon=":round_pushpin:")
+
+st.header ('📍 Restaurantes perto de você')
+
+# Barra Lateral: Cabeçalho - Logo e nome da empresa
+image_path = 'fome_zero_logo_new.png'
+image = Image.open(image_path)
+st.sidebar.image(image)
+
+st.sidebar.markdown ("<h3 style='text-align: center; color: red;'> World Gastronomic Best Experiences</h3>", unsafe_allow_html=True)
+st.sidebar.markdown ('''___''')
+
+#====================================================================================================
+# FILTROS SIDEBAR
+#====================================================================================================
+
+st.sidebar.markdown ('# Filtros')
+
+# Ponto de referência: começa no centro da cidade escolhida e pode ser ajustado
+centros = data.groupby(data['city'].astype(str))[['latitude', 'longitude']].median()
+cidade = st.sidebar.selectbox('Cidade de referência: ', list(centros.index))
+
+latitude = st.sidebar.number_input('Latitude: ', min_value = -90.0, max_value = 90.0, value = float(centros.loc[cidade, 'latitude']), format = '%.6f')
+longitude = st.sidebar.number_input('Longitude: ', min_value = -180.0, max_value = 180.0, value = float(centros.loc[cidade, 'longitude']), format = '%.6f')
+
+# Tipo de busca
+modo = st.sidebar.radio('Buscar: ', ['Num raio', 'Os mais próximos'])
+if modo == 'Num raio':
+    raio = st.sidebar.slider('Raio (km): ', min_value = 0.5, max_value = 50.0, value = 5.0, step = 0.5)
+else:
+    quantidade = st.sidebar.slider('Quantidade de restaurantes: ', min_value = 1, max_value = 100, value = 10)
+
+# Culinária (qualquer uma da lista do restaurante), tipo de preço e nota mínima
+culinarias = index.cuisine_names()
+cuisine_options = st.sidebar.multiselect('Culinárias (vazio = todas): ', culinarias)
+
+price_options = st.sidebar.multiselect('Tipos de preço (vazio = todos): ', ['Cheap', 'Normal', 'Expensive', 'Gourmet'])
+
+min_rating = st.sidebar.slider('Avaliação mínima: ', min_value = 0.0, max_value = 5.0, value = 0.0, step = 0.1)
+
+#---------------------------------------------------------
+# Habilidatação dos filtros
+#---------------------------------------------------------
+
+# Consulta ao índice espacial: só as células da grade que cobrem a busca são examinadas
+
+with span('busca'):
+    if modo == 'Num raio':
+        resultado = index.radius(latitude, longitude, raio, cuisine_options, price_options, min_rating)
+    else:
+        resultado = index.nearest(latitude, longitude, quantidade, cuisine_options, price_options, min_rating)
+
+#====================================================================================================
+# SIDEBAR - Final
+#====================================================================================================
+st.sidebar.markdown ('''___''')
+st.sidebar.markdown ('###### Powered by Comunidade DS')
+st.sidebar.markdown ('###### Data Analyst: Geová Silvério')
+
+#====================================================================================================
+# Layout - Visão perto de mim
+#====================================================================================================
+
+with st.container(), span('mapa'):
+
+    st.markdown(f'#### {len(resultado)} restaurantes encontrados')
+
+    # Mapa centrado no ponto de referência, só com os restaurantes encontrados
+    with span('montagem'):
+        mapa = build_fast_map(resultado, location = [latitude, longitude], zoom_start = 13)
+    with span('folium_static'):
+        folium_static(mapa, width = 1024, height = 500)
+
+with st.container(), span('tabela'):
+
+    df1 = resultado[['restaurant_name', 'city', 'cuisine_list', 'price_type', 'average_cost_for_two', 'currency', 'aggregate_rating', 'distance_km']].reset_index(drop = True)
+    df1.columns = ['Nome', 'Cidade', 'Culinárias', 'Tipo de Preço', 'Preço Médio - Prato p/2', 'Moeda', 'Avaliação Média', 'Distância (km)']
+    st.dataframe(df1.style.format(subset = ['Avaliação Média', 'Distância (km)'], formatter = "{:.2f}"))
+
+#====================================================================================================
+# DESEMPENHO
+#====================================================================================================
+
+finish_rerun()
+performance_panel()
@@ -0,0 +1,81 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import gc
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+from fome_zero import queries, views
+
+#====================================================================================================
+# DADOS DE TESTE
+#====================================================================================================
+
+# O zomato.csv da raiz do projeto (independente de FOME_ZERO_DATA)
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'zomato.csv')
+
+# Versão curta de benchmarks.soak_charts: rodadas de reruns, cada uma com um gráfico de cada página
+# e tipo em duas seleções de países. A primeira rodada, fora do tracemalloc, é o aquecimento
+# (imports, consultas e cache de gráficos); a memória é comparada entre as rodadas seguintes.
+SOAK_FIGURES = ['pais_restaurantes', 'pais_culinarias', 'pais_notas', 'cidade_top_por_pais', 'gastronomia_top', 'gastronomia_melhores_bayes']
+ROUNDS = 2
+
+# Crescimento máximo da memória rastreada (tracemalloc) entre o fim do aquecimento e a última rodada
+MAX_GROWTH_MB = 1
+
+#====================================================================================================
+# FUNÇÕES
+#====================================================================================================
+
+# Uma rodada de reruns: cada gráfico montado pela fábrica (make_figure) e pelo cache (cached_figure)
+
+def soak_round(selecoes):
+    for countries in selecoes:
+        for name in SOAK_FIGURES:
+            views.FIGURES[name][2](countries, CSV_PATH).to_json()
+            views.figure(name, countries, path = CSV_PATH)
+
+# Memória rastreada após a coleta de lixo
+
+def traced_memory():
+    gc.collect()
+
+    return tracemalloc.get_traced_memory()[0]
+
+#====================================================================================================
+# RESISTÊNCIA DOS GRÁFICOS
+#====================================================================================================
+
+# Memória estável ao longo dos reruns, sem o pyplot nem figuras do matplotlib (os avisos de
+# depreciação vêm da importação do matplotlib no fim do teste)
+
+@pytest.mark.filterwarnings('ignore::DeprecationWarning')
+def test_charts_memory_is_flat_without_pyplot():
+    paises = queries.country_list(CSV_PATH)
+    selecoes = [paises, paises[:len(paises) // 2]]
+
+    soak_round(selecoes)
+
+    tracemalloc.start()
+    try:
+        soak_round(selecoes)
+        inicio = traced_memory()
+        for _ in range(ROUNDS - 1):
+            soak_round(selecoes)
+        crescimento = traced_memory() - inicio
+    finally:
+        tracemalloc.stop()
+
+    assert 'matplotlib.pyplot' not in sys.modules
+    assert crescimento < MAX_GROWTH_MB * 1024 ** 2
+
+    # Importado só depois dos reruns: nenhuma figura ficou registrada no pyplot
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    assert plt.get_fignums() == []
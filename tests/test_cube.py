@@ -0,0 +1,89 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from fome_zero.cube import build_cube, rating_bucket, rollup
+from fome_zero.cuisines import CuisineBridge
+from fome_zero.data import clean_code_vectorized, read_raw
+from fome_zero.schema import compact_frame, decategorize
+
+#====================================================================================================
+# DADOS DE TESTE
+#====================================================================================================
+
+# O zomato.csv da raiz do projeto (independente de FOME_ZERO_DATA)
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'zomato.csv')
+
+# Filtros das consultas: seleção de países e faixas de preço/nota
+FILTERS = [{},
+           {'countries': ['Brazil', 'India', 'Qatar']},
+           {'rating_buckets': ['4', '> 4']},
+           {'price_types': ['Expensive', 'Gourmet'], 'rating_buckets': ['< 2.5', '2.5']},
+           {'countries': ['United States of America', 'England'], 'price_types': ['Cheap', 'Normal']}]
+
+@pytest.fixture(scope = 'module')
+def data():
+    return compact_frame(clean_code_vectorized(read_raw(CSV_PATH)))
+
+@pytest.fixture(scope = 'module')
+def cube(data):
+    return build_cube(data, CuisineBridge(data['cuisine_list']))
+
+# Restaurantes que passam nos filtros, com a faixa de nota e a posição no dataframe
+
+def filtered(data, countries = None, price_types = None, rating_buckets = None):
+    frame = decategorize(data).assign(rating_bucket = rating_bucket(data['aggregate_rating']), first_row = np.arange(len(data)))
+
+    linhas = np.ones(len(frame), dtype = bool)
+    if countries is not None:
+        linhas &= frame['country'].isin(countries).to_numpy()
+    if price_types is not None:
+        linhas &= frame['price_type'].isin(price_types).to_numpy()
+    if rating_buckets is not None:
+        linhas &= frame['rating_bucket'].isin(rating_buckets).to_numpy()
+
+    return frame.loc[linhas, :]
+
+# Rollup pelo groupby direto sobre os restaurantes, como as páginas faziam antes do cubo
+
+def groupby_rollup(frame, by):
+    grouped = frame.groupby(by)
+    result = pd.DataFrame({'restaurants': grouped.size(),
+                           'votes': grouped['votes'].sum(),
+                           'table_booking': grouped['has_table_booking'].sum(),
+                           'online_delivery': grouped['has_online_delivery'].sum(),
+                           'delivering_now': grouped['is_delivering_now'].sum(),
+                           'first_row': grouped['first_row'].min(),
+                           'aggregate_rating': grouped['aggregate_rating'].mean(),
+                           'average_cost_for_two': grouped['average_cost_for_two'].mean(),
+                           'average_cost_for_two_usd': grouped['average_cost_for_two_usd'].mean()})
+
+    for key, name in {'country': 'n_countries', 'city': 'n_cities'}.items():
+        if key not in by:
+            result[name] = grouped[key].nunique()
+
+    return result.reset_index()
+
+def assert_same_rollup(cubo, esperado):
+    assert_frame_equal(cubo[esperado.columns], esperado, check_dtype = False)
+
+#====================================================================================================
+# ROLLUPS DO CUBO x GROUPBY
+#====================================================================================================
+
+@pytest.mark.parametrize('filtros', FILTERS)
+@pytest.mark.parametrize('by', [['country'], ['country', 'city'], ['city'], ['country', 'currency']])
+def test_rollup_matches_groupby(data, cube, by, filtros):
+    assert_same_rollup(rollup(cube, by, **filtros), groupby_rollup(filtered(data, **filtros), by))
+
+# Sem nenhum restaurante nos filtros, o rollup vem vazio
+
+def test_rollup_empty_selection(cube):
+    assert rollup(cube, ['country'], countries = []).empty
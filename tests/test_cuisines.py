@@ -0,0 +1,99 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from fome_zero.cube import build_cube, rating_bucket, rollup
+from fome_zero.cuisines import CuisineBridge, split_cuisines
+from fome_zero.data import clean_code_vectorized, read_raw
+from fome_zero.schema import compact_frame, decategorize
+
+#====================================================================================================
+# DADOS DE TESTE
+#====================================================================================================
+
+# O zomato.csv da raiz do projeto (independente de FOME_ZERO_DATA)
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'zomato.csv')
+
+# Filtros das consultas de culinárias: seleção de países e faixas de preço/nota
+FILTERS = [{},
+           {'countries': ['Brazil', 'India', 'Qatar']},
+           {'price_types': ['Expensive', 'Gourmet'], 'rating_buckets': ['< 2.5', '2.5']},
+           {'price_types': ['Cheap', 'Normal'], 'rating_buckets': ['4', '> 4']}]
+
+@pytest.fixture(scope = 'module')
+def data():
+    return compact_frame(clean_code_vectorized(read_raw(CSV_PATH)))
+
+@pytest.fixture(scope = 'module')
+def bridge(data):
+    return CuisineBridge(data['cuisine_list'])
+
+@pytest.fixture(scope = 'module')
+def cube(data, bridge):
+    return build_cube(data, bridge)
+
+# Um par (restaurante, culinária) por culinária da lista de cada restaurante, pelo explode do pandas
+
+@pytest.fixture(scope = 'module')
+def pairs(data):
+    frame = decategorize(data).assign(rating_bucket = rating_bucket(data['aggregate_rating']),
+                                      cuisine = decategorize(data)['cuisine_list'].map(split_cuisines))
+
+    return frame.explode('cuisine', ignore_index = True)
+
+def filtered(frame, countries = None, price_types = None, rating_buckets = None):
+    linhas = np.ones(len(frame), dtype = bool)
+    if countries is not None:
+        linhas &= frame['country'].isin(countries).to_numpy()
+    if price_types is not None:
+        linhas &= frame['price_type'].isin(price_types).to_numpy()
+    if rating_buckets is not None:
+        linhas &= frame['rating_bucket'].isin(rating_buckets).to_numpy()
+
+    return frame.loc[linhas, :]
+
+#====================================================================================================
+# PONTE
+#====================================================================================================
+
+# Os pares da ponte são os do explode, na mesma ordem, e a culinária principal é a coluna cuisines
+
+def test_bridge_matches_explode(data, bridge, pairs):
+    assert np.array_equal(bridge.restaurant, np.repeat(np.arange(len(data)), data['cuisine_list'].astype(str).map(split_cuisines).map(len)))
+    assert list(bridge.cuisine_names()) == list(pairs['cuisine'])
+    assert list(np.asarray(bridge.cuisine_names())[bridge.main]) == list(data['cuisines'].astype(str))
+
+#====================================================================================================
+# ROLLUPS POR CULINÁRIA E CONTAGENS DISTINTAS x GROUPBY
+#====================================================================================================
+
+# Rollup por culinária: cada restaurante conta em todas as culinárias que oferece
+
+@pytest.mark.parametrize('filtros', FILTERS)
+def test_cuisine_rollup_matches_groupby(cube, pairs, filtros):
+    grouped = filtered(pairs, **filtros).groupby('cuisine')
+    esperado = pd.DataFrame({'restaurants': grouped.size(),
+                             'votes': grouped['votes'].sum(),
+                             'aggregate_rating': grouped['aggregate_rating'].mean(),
+                             'average_cost_for_two_usd': grouped['average_cost_for_two_usd'].mean(),
+                             'n_countries': grouped['country'].nunique(),
+                             'n_cities': grouped['city'].nunique()})
+    esperado = esperado.rename_axis('cuisines').reset_index()
+
+    assert_frame_equal(rollup(cube, ['cuisines'], **filtros)[esperado.columns], esperado, check_dtype = False)
+
+# Culinárias distintas por país e por cidade (todas as da lista, não só a principal)
+
+@pytest.mark.parametrize('filtros', FILTERS)
+@pytest.mark.parametrize('by', [['country'], ['country', 'city']])
+def test_distinct_cuisines_match_groupby(cube, pairs, by, filtros):
+    esperado = filtered(pairs, **filtros).groupby(by)['cuisine'].nunique().rename('n_cuisines').reset_index()
+
+    assert_frame_equal(rollup(cube, by, **filtros)[by + ['n_cuisines']], esperado, check_dtype = False)
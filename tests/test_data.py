@@ -0,0 +1,156 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import gc
+import os
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from fome_zero.data import clean_code, clean_code_vectorized, rename_columns, valid_codes, versioned_cache
+
+#====================================================================================================
+# DADOS DE TESTE
+#====================================================================================================
+
+# O zomato.csv da raiz do projeto (independente de FOME_ZERO_DATA)
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'zomato.csv')
+
+@pytest.fixture(scope = 'module')
+def raw():
+    return pd.read_csv(CSV_PATH)
+
+# Linhas do início do arquivo alteradas para cobrir os casos de borda da limpeza
+
+def edge_rows(raw):
+    linhas = raw.iloc[:8].copy()
+    novo_id = raw['Restaurant ID'].max() + 1
+
+    # Culinária vazia, e a mesma linha repetida com culinária (só a segunda entra)
+    linhas.iloc[0, linhas.columns.get_loc('Cuisines')] = np.nan
+    linhas.iloc[1, linhas.columns.get_loc('Restaurant ID')] = linhas.iloc[0]['Restaurant ID']
+
+    # Restaurante repetido (fica a primeira ocorrência)
+    linhas.iloc[2, linhas.columns.get_loc('Restaurant ID')] = raw.iloc[100]['Restaurant ID']
+
+    # Custo zero, e uma duplicata dele com custo (a duplicata sai antes do filtro de custo)
+    linhas.iloc[3, linhas.columns.get_loc('Restaurant ID')] = novo_id
+    linhas.iloc[3, linhas.columns.get_loc('Average Cost for two')] = 0
+    linhas.iloc[4, linhas.columns.get_loc('Restaurant ID')] = novo_id
+
+    # Códigos de país e de cor desconhecidos
+    linhas.iloc[5, linhas.columns.get_loc('Restaurant ID')] = novo_id + 1
+    linhas.iloc[5, linhas.columns.get_loc('Country Code')] = 999
+    linhas.iloc[6, linhas.columns.get_loc('Restaurant ID')] = novo_id + 2
+    linhas.iloc[6, linhas.columns.get_loc('Rating color')] = '000000'
+
+    # Culinária vazia sem duplicata
+    linhas.iloc[7, linhas.columns.get_loc('Restaurant ID')] = novo_id + 3
+    linhas.iloc[7, linhas.columns.get_loc('Cuisines')] = np.nan
+
+    return pd.concat([raw, linhas], ignore_index = True)
+
+#====================================================================================================
+# LIMPEZA VETORIZADA
+#====================================================================================================
+
+# Mesma saída de clean_code no arquivo inteiro
+
+def test_vectorized_matches_clean_code(raw):
+    assert_frame_equal(clean_code_vectorized(raw), clean_code(raw))
+
+# Mesma saída com as linhas de borda (clean_code levanta KeyError com código desconhecido, então a
+# comparação é com clean_code sobre as linhas de código válido)
+
+def test_vectorized_matches_clean_code_on_edge_rows(raw):
+    df = edge_rows(raw)
+    validas = df.loc[valid_codes(rename_columns(df, copy = False)), :]
+
+    with pytest.raises(KeyError):
+        clean_code(df)
+
+    assert len(validas) == len(df) - 2
+    assert_frame_equal(clean_code_vectorized(df), clean_code(validas))
+
+# As linhas de borda saem da limpeza vetorizada
+
+def test_vectorized_drops_edge_rows(raw):
+    data = clean_code_vectorized(edge_rows(raw))
+    novo_id = raw['Restaurant ID'].max() + 1
+
+    assert data['restaurant_id'].is_unique
+    assert data['cuisines'].notnull().all()
+    assert (data['average_cost_for_two'] != 0).all()
+    assert not data['restaurant_id'].isin([novo_id, novo_id + 1, novo_id + 2, novo_id + 3]).any()
+
+# A entrada não é alterada
+
+def test_vectorized_keeps_input(raw):
+    df = edge_rows(raw)
+    antes = df.copy()
+    clean_code_vectorized(df)
+
+    assert_frame_equal(df, antes)
+
+#====================================================================================================
+# MEMÓRIA DA LIMPEZA
+#====================================================================================================
+
+# Pico de memória (tracemalloc) durante uma chamada, como em benchmarks.bench_pages
+
+def peak_memory(func, *args):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return pico
+
+# A limpeza vetorizada (uma única cópia das linhas mantidas) tem pico menor que clean_code, na
+# mesma entrada
+
+def test_vectorized_peak_below_clean_code(raw):
+    assert peak_memory(clean_code_vectorized, raw) < peak_memory(clean_code, raw)
+
+#====================================================================================================
+# CACHE POR VERSÃO
+#====================================================================================================
+
+# Uma versão nova de um caminho descarta as anteriores dele, sem mexer nos outros caminhos
+
+def test_versioned_cache_drops_superseded_versions():
+    chamadas = []
+
+    @versioned_cache(maxsize = 8)
+    def carregar(path, mtime_ns, compact):
+        chamadas.append((path, mtime_ns, compact))
+        return len(chamadas)
+
+    assert carregar('a', 1, True) == carregar('a', 1, True) == 1
+    carregar('a', 1, False)
+    carregar('b', 1, True)
+    assert carregar.cache_len() == 3
+
+    carregar('a', 2, True)
+    assert carregar.cache_len() == 2
+    assert carregar('b', 1, True) == 3
+    assert len(chamadas) == 4
+
+# O total de entradas fica limitado a maxsize, descartando as usadas há mais tempo
+
+def test_versioned_cache_keeps_maxsize():
+    @versioned_cache(maxsize = 2)
+    def carregar(path, mtime_ns):
+        return path
+
+    for path in ['a', 'b', 'a', 'c']:
+        carregar(path, 1)
+
+    assert carregar.cache_len() == 2
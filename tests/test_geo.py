@@ -0,0 +1,98 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import numpy as np
+import pandas as pd
+import pytest
+from haversine import Unit, haversine_vector
+
+from fome_zero.geo import GeoIndex
+
+#====================================================================================================
+# DADOS DE TESTE
+#====================================================================================================
+
+CUISINES = ['Italian', 'Pizza', 'Japanese', 'Sushi', 'Brazilian', 'Cafe']
+
+# Pontos aleatórios no globo, mais grupos perto do antimeridiano, dos polos e do equador
+
+@pytest.fixture(scope = 'module')
+def points():
+    rng = np.random.default_rng(7)
+
+    grupos = [(rng.uniform(-90, 90, 3000), rng.uniform(-180, 180, 3000)),
+              (rng.uniform(-60, 60, 800), rng.choice([-1, 1], 800) * rng.uniform(179.0, 180.0, 800)),
+              (rng.uniform(88.5, 90.0, 400), rng.uniform(-180, 180, 400)),
+              (rng.uniform(-90.0, -88.5, 400), rng.uniform(-180, 180, 400)),
+              (rng.uniform(-1, 1, 400), rng.uniform(-1, 1, 400))]
+    latitude = np.concatenate([lat for lat, _ in grupos])
+    longitude = np.concatenate([lon for _, lon in grupos])
+    n = len(latitude)
+
+    listas = [', '.join(rng.choice(CUISINES, rng.integers(1, 4), replace = False)) for _ in range(n)]
+
+    return pd.DataFrame({'restaurant_id': np.arange(n),
+                         'latitude': latitude,
+                         'longitude': longitude,
+                         'cuisines': [lista.split(',')[0] for lista in listas],
+                         'cuisine_list': listas,
+                         'price_type': rng.choice(['Cheap', 'Normal', 'Expensive', 'Gourmet'], n),
+                         'aggregate_rating': rng.integers(0, 50, n) / 10})
+
+@pytest.fixture(scope = 'module')
+def index(points):
+    return GeoIndex(points)
+
+# Consultas: pontos comuns, no antimeridiano, nos polos e no equador
+QUERIES = [(-22.9, -43.2), (40.7, -74.0), (0.0, 179.95), (10.0, -179.9), (-35.0, 180.0),
+           (89.9, 0.0), (-89.5, 120.0), (88.0, -179.5), (0.0, 0.0)]
+
+# Distâncias por força bruta (haversine para todos os pontos) e a máscara dos filtros
+
+def brute_force(points, lat, lon, cuisines = None):
+    distancias = haversine_vector(np.array([[lat, lon]]), points[['latitude', 'longitude']].to_numpy(), Unit.KILOMETERS, comb = True)[:, 0]
+
+    linhas = np.ones(len(points), dtype = bool)
+    if cuisines:
+        linhas = points['cuisine_list'].map(lambda lista: any(nome.strip() in cuisines for nome in lista.split(','))).to_numpy()
+
+    return distancias, linhas
+
+#====================================================================================================
+# BUSCAS DO ÍNDICE x FORÇA BRUTA
+#====================================================================================================
+
+@pytest.mark.parametrize('cuisines', [None, ['Sushi', 'Cafe']])
+@pytest.mark.parametrize('km', [5, 150, 1500])
+@pytest.mark.parametrize('lat, lon', QUERIES)
+def test_radius_matches_brute_force(points, index, lat, lon, km, cuisines):
+    distancias, linhas = brute_force(points, lat, lon, cuisines)
+    esperados = np.flatnonzero(linhas & (distancias <= km))
+
+    result = index.radius(lat, lon, km, cuisines = cuisines)
+
+    assert sorted(result['restaurant_id']) == sorted(points['restaurant_id'].iloc[esperados])
+    assert np.allclose(np.sort(result['distance_km'].to_numpy()), np.sort(distancias[esperados]))
+
+@pytest.mark.parametrize('cuisines', [None, ['Brazilian']])
+@pytest.mark.parametrize('k', [1, 10, 200])
+@pytest.mark.parametrize('lat, lon', QUERIES)
+def test_nearest_matches_brute_force(points, index, lat, lon, k, cuisines):
+    distancias, linhas = brute_force(points, lat, lon, cuisines)
+    esperadas = np.sort(distancias[linhas])[:k]
+
+    result = index.nearest(lat, lon, k, cuisines = cuisines)
+
+    assert len(result) == k
+    assert np.allclose(result['distance_km'].to_numpy(), esperadas)
+    assert result['distance_km'].is_monotonic_increasing
+
+# Mais vizinhos pedidos do que restaurantes que passam no filtro: todos voltam
+
+def test_nearest_returns_all_when_k_exceeds_matches(points, index):
+    _, linhas = brute_force(points, 0.0, 0.0, ['Japanese', 'Pizza'])
+
+    result = index.nearest(0.0, 0.0, len(points), cuisines = ['Japanese', 'Pizza'])
+
+    assert len(result) == linhas.sum()
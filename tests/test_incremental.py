@@ -0,0 +1,84 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import os
+
+import numpy as np
+import pytest
+from pandas.testing import assert_frame_equal
+
+from fome_zero.cube import load_cube, rollup
+from fome_zero.incremental import SESSION_KEY, TOTAL, CountryPartials, IncrementalRollup, bind_session, shared_rollup
+
+#====================================================================================================
+# DADOS DE TESTE
+#====================================================================================================
+
+# O zomato.csv da raiz do projeto (independente de FOME_ZERO_DATA)
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'zomato.csv')
+
+# Rollups das consultas: chaves e filtros de preço/nota
+ROLLUPS = [([], {}),
+           (['country', 'currency'], {}),
+           (['country', 'city'], {'rating_buckets': ['4', '> 4']}),
+           (['city'], {'price_types': ['Expensive', 'Gourmet'], 'rating_buckets': ['< 2.5', '2.5']}),
+           (['cuisines'], {'price_types': ['Cheap', 'Normal']})]
+
+@pytest.fixture(scope = 'module')
+def cube():
+    return load_cube(CSV_PATH)
+
+# Rollup do cubo inteiro para a seleção, no formato de IncrementalRollup.result
+
+def full_rollup(cube, by, countries, filtros):
+    result = rollup(cube.assign(**{TOTAL: 'total'}), by or [TOTAL], countries, **filtros)
+
+    return result.drop(columns = TOTAL) if TOTAL in result.columns else result
+
+def assert_same_rollup(incremental, completo):
+    incremental = incremental[completo.columns].reset_index(drop = True)
+
+    assert_frame_equal(incremental, completo, check_dtype = False)
+
+#====================================================================================================
+# ROLLUP INCREMENTAL
+#====================================================================================================
+
+# Sequências aleatórias de países adicionados e removidos: o rollup incremental é sempre igual ao
+# rollup do cubo para a seleção atual
+
+@pytest.mark.parametrize('by, filtros', ROLLUPS)
+def test_incremental_matches_rollup(cube, by, filtros):
+    paises = sorted(cube['country'].unique())
+    incremental = IncrementalRollup(CountryPartials(cube, by, **filtros))
+    rng = np.random.default_rng(42)
+
+    selecao = set()
+    for _ in range(40):
+        pais = paises[rng.integers(len(paises))]
+        selecao ^= {pais}
+
+        assert_same_rollup(incremental.update(selecao), full_rollup(cube, by, sorted(selecao), filtros))
+
+    # Trocas grandes (recomeça do zero) e seleção vazia
+    for tamanho in [len(paises), 1, 0, 3]:
+        selecao = set(rng.choice(paises, tamanho, replace = False))
+        assert_same_rollup(incremental.update(selecao), full_rollup(cube, by, sorted(selecao), filtros))
+
+# Cada sessão tem o seu rollup no estado da sessão; sem sessão, o rollup é o do processo
+
+def test_shared_rollup_uses_session_state(cube):
+    paises = sorted(cube['country'].unique())
+    sessoes = [{}, {}]
+
+    for estado, selecao in zip(sessoes, [paises[:3], paises[5:]]):
+        bind_session(estado)
+        assert_same_rollup(shared_rollup(['country'], selecao, path = CSV_PATH), full_rollup(cube, ['country'], selecao, {}))
+
+    bind_session(None)
+    assert_same_rollup(shared_rollup(['country'], paises[:2], path = CSV_PATH), full_rollup(cube, ['country'], paises[:2], {}))
+
+    rollups = [estado[SESSION_KEY] for estado in sessoes]
+    assert all(len(r) == 1 for r in rollups)
+    assert [next(iter(r.values())).selection for r in rollups] == [set(paises[:3]), set(paises[5:])]
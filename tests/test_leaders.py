@@ -0,0 +1,85 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import os
+
+import numpy as np
+import pytest
+
+from fome_zero import queries
+from fome_zero.cache import RESULT_CACHE
+from fome_zero.data import clean_code_vectorized, read_raw
+from fome_zero.leaders import GROUP_KEYS, TOP_CANDIDATES, TOP_COLUMNS, load_leaders
+from fome_zero.ranking import SCORES, rating_scores
+from fome_zero.schema import compact_frame, decategorize
+
+#====================================================================================================
+# DADOS DE TESTE
+#====================================================================================================
+
+# O zomato.csv da raiz do projeto (independente de FOME_ZERO_DATA)
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'zomato.csv')
+
+# Seleções de países: todos, o maior sozinho, países pequenos e uma mistura
+SELECTIONS = [None,
+              ['India'],
+              ['Qatar', 'Singapure', 'Sri Lanka'],
+              ['Brazil', 'India', 'United States of America', 'Turkey'],
+              ['England', 'New Zeland', 'South Africa', 'United Arab Emirates', 'Australia', 'Canada']]
+
+@pytest.fixture(scope = 'module')
+def data():
+    return decategorize(compact_frame(clean_code_vectorized(read_raw(CSV_PATH)))[TOP_COLUMNS])
+
+# Top pela ordenação completa dos restaurantes da seleção (nota decrescente, empates pelo menor id)
+
+def full_sort(data, countries, n, score):
+    frame = data.loc[data['country'].isin(countries), :]
+
+    if score != 'aggregate_rating':
+        notas = rating_scores(frame['votes'], frame['aggregate_rating'].to_numpy() * frame['votes'].to_numpy())
+        frame = frame.assign(**{score: notas[score]})
+
+    return frame.sort_values([score, 'restaurant_id'], ascending = [False, True], na_position = 'last').head(n)
+
+#====================================================================================================
+# TOP DE RESTAURANTES PELOS CANDIDATOS x ORDENAÇÃO COMPLETA
+#====================================================================================================
+
+@pytest.mark.parametrize('n', [10, TOP_CANDIDATES])
+@pytest.mark.parametrize('score', SCORES)
+@pytest.mark.parametrize('countries', SELECTIONS)
+def test_top_restaurants_match_full_sort(data, countries, score, n):
+    countries = countries or sorted(data['country'].unique())
+
+    top = queries.top_restaurants(countries, n = n, score = score, path = CSV_PATH)
+    esperado = full_sort(data, countries, n, score)
+
+    assert list(top['restaurant_id']) == list(esperado['restaurant_id'])
+    assert np.allclose(top[score].to_numpy(dtype = 'float64'), esperado[score].to_numpy(dtype = 'float64'), equal_nan = True)
+
+# Cada grupo (país x nota) guarda no máximo três vezes TOP_CANDIDATES restaurantes, e os grupos
+# maiores que isso são de fato podados
+
+def test_candidates_are_bounded_per_group(data):
+    candidatos = load_leaders(CSV_PATH).candidates.groupby(GROUP_KEYS).size()
+    restaurantes = data.groupby(GROUP_KEYS).size()
+
+    assert (candidatos <= 3 * TOP_CANDIDATES).all()
+    assert (candidatos[restaurantes > 3 * TOP_CANDIDATES] < restaurantes[restaurantes > 3 * TOP_CANDIDATES]).all()
+    assert (restaurantes > 3 * TOP_CANDIDATES).any()
+
+# Os argumentos padrão entram na chave do cache: omitidos, nomeados ou posicionais, a consulta é a
+# mesma entrada de RESULT_CACHE
+
+def test_default_arguments_share_one_cache_entry():
+    queries.top_restaurants.cache_clear()
+    entradas = RESULT_CACHE.stats()['entries']
+
+    queries.top_restaurants(['India'], path = CSV_PATH)
+    queries.top_restaurants(['India'], n = 10, path = CSV_PATH)
+    queries.top_restaurants(['India'], 10, 'aggregate_rating', path = CSV_PATH)
+    queries.top_restaurants(['India'], score = 'aggregate_rating', n = 10, path = CSV_PATH)
+
+    assert RESULT_CACHE.stats()['entries'] == entradas + 1
@@ -0,0 +1,105 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import os
+
+import pytest
+from pandas.testing import assert_frame_equal
+
+from fome_zero import data as fz_data
+from fome_zero import queries
+from fome_zero.data import load_clean_data
+from fome_zero.partitions import split_csv
+
+#====================================================================================================
+# DADOS DE TESTE
+#====================================================================================================
+
+# O zomato.csv da raiz do projeto (independente de FOME_ZERO_DATA)
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'zomato.csv')
+
+SELECTIONS = [['Brazil'], ['India', 'Qatar'], ['United States of America', 'England', 'Turkey', 'Singapure']]
+
+# Consultas das páginas com argumentos de cada modo (notas, custos em dólar, aproximado)
+QUERIES = [(queries.overview, {}),
+           (queries.top_restaurants, {'score': 'bayesian_rating'}),
+           (queries.restaurants_per_country, {}),
+           (queries.cities_per_country, {}),
+           (queries.cuisines_per_country, {}),
+           (queries.cuisines_per_country, {'approximate': True}),
+           (queries.rating_per_country, {'score': 'bayesian_rating'}),
+           (queries.cost_and_rating_per_country, {'normalized': True}),
+           (queries.top_city_per_country, {}),
+           (queries.top_cities_by_rating, {'rating_buckets': ['4', '> 4']}),
+           (queries.top_cities_by_cuisines, {}),
+           (queries.expensive_badly_rated_cities, {'normalized': True}),
+           (queries.top_cuisines, {}),
+           (queries.best_rated_cuisines, {'score': 'bayesian_rating'}),
+           (queries.cheap_well_rated_cuisines, {})]
+
+@pytest.fixture(scope = 'module')
+def partitioned(tmp_path_factory):
+    destino = str(tmp_path_factory.mktemp('particoes'))
+    split_csv(CSV_PATH, destino)
+
+    return destino
+
+# Arquivos lidos do disco (CSVs passados a read_raw) durante a chamada
+
+def files_read(monkeypatch, func, *args, **kwargs):
+    lidos = []
+    read_raw = fz_data.read_raw
+
+    def registrar(path, *a, **k):
+        lidos.append(os.path.basename(os.path.dirname(path)))
+        return read_raw(path, *a, **k)
+
+    monkeypatch.setattr(fz_data, 'read_raw', registrar)
+    func(*args, **kwargs)
+    monkeypatch.undo()
+
+    return lidos
+
+#====================================================================================================
+# DIRETÓRIO DE PARTIÇÕES x CSV ÚNICO
+#====================================================================================================
+
+# Mesmo resultado das consultas sobre o CSV único (linhas na mesma ordem)
+
+@pytest.mark.parametrize('countries', SELECTIONS)
+@pytest.mark.parametrize('query, kwargs', QUERIES)
+def test_queries_match_single_file(partitioned, query, kwargs, countries):
+    esperado = query(countries, path = CSV_PATH, **kwargs)
+    result = query(countries, path = partitioned, **kwargs)
+
+    assert_frame_equal(result, esperado)
+
+# Mesmos restaurantes limpos nas partições selecionadas (na ordem das partições, por isso a
+# comparação é por restaurant_id; as categorias são as de cada conjunto, então entram como texto)
+
+def by_id(frame):
+    frame = frame.astype({col: str for col in frame.select_dtypes('category')})
+
+    return frame.sort_values('restaurant_id', ignore_index = True)
+
+@pytest.mark.parametrize('countries', SELECTIONS)
+def test_clean_data_matches_single_file(partitioned, countries):
+    esperado = load_clean_data(CSV_PATH, compact = True)
+    result = load_clean_data(partitioned, compact = True, countries = countries)
+
+    assert_frame_equal(by_id(result), by_id(esperado.loc[esperado['country'].isin(countries), :]))
+
+#====================================================================================================
+# PODA DE PARTIÇÕES
+#====================================================================================================
+
+# Uma consulta lê só as partições dos países selecionados; uma nova seleção lê só as que faltam
+
+def test_only_selected_partitions_are_read(tmp_path, monkeypatch):
+    destino = str(tmp_path)
+    split_csv(CSV_PATH, destino)
+
+    assert files_read(monkeypatch, queries.restaurants_per_country, ['Brazil', 'Qatar'], path = destino) == ['country_code=30', 'country_code=166']
+    assert files_read(monkeypatch, queries.restaurants_per_country, ['Brazil', 'India'], path = destino) == ['country_code=1']
+    assert files_read(monkeypatch, load_clean_data, destino, compact = True, countries = ['Brazil', 'Qatar']) == []
@@ -0,0 +1,101 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from fome_zero.sketches import HyperLogLog, TopK, hll_relative_error
+
+#====================================================================================================
+# DADOS DE TESTE
+#====================================================================================================
+
+# Hashes de 64 bits distintos e aleatórios (embaralhados: np.unique devolve os valores ordenados)
+
+def random_hashes(n, seed = 0):
+    rng = np.random.default_rng(seed)
+
+    distintos = np.unique(rng.integers(0, 2 ** 64, size = int(n * 1.01) + 10, dtype = 'uint64'))
+
+    return rng.permutation(distintos)[:n]
+
+# Valores com frequências de cauda longa (Zipf), como as culinárias por país
+
+def zipf_values(n, seed = 0):
+    rng = np.random.default_rng(seed)
+
+    return [f'culinaria_{valor}' for valor in rng.zipf(1.3, size = n) % 500]
+
+#====================================================================================================
+# HYPERLOGLOG
+#====================================================================================================
+
+# Erro relativo dentro de três erros padrão, na precisão 12 (contagem linear e estimativa bruta)
+
+@pytest.mark.parametrize('n', [50, 1_000, 20_000, 200_000])
+def test_hll_relative_error_at_precision_12(n):
+    estimativa = HyperLogLog(12).add(random_hashes(n, seed = n)).estimate()
+
+    assert abs(estimativa - n) / n < 3 * hll_relative_error(12)
+
+# Repetir hashes não muda a estimativa
+
+def test_hll_ignores_duplicates():
+    hashes = random_hashes(5_000)
+
+    assert HyperLogLog().add(hashes).estimate() == HyperLogLog().add(np.concatenate([hashes, hashes[::3]])).estimate()
+
+# A soma de sketches de partes (com sobreposição) é igual ao sketch de tudo
+
+def test_hll_merge_matches_single_sketch():
+    hashes = random_hashes(30_000)
+    partes = [hashes[:12_000], hashes[8_000:20_000], hashes[20_000:]]
+
+    somado = HyperLogLog()
+    for parte in partes:
+        somado = somado.merge(HyperLogLog().add(parte))
+
+    unico = HyperLogLog().add(hashes)
+
+    assert np.array_equal(somado.registers, unico.registers)
+    assert somado.estimate() == unico.estimate()
+
+#====================================================================================================
+# TOP-K (MISRA-GRIES)
+#====================================================================================================
+
+# Todo valor com frequência acima de N / capacity fica no sketch, com contagem subestimada em no
+# máximo error_bound(), tanto num sketch só quanto na soma de sketches de partes
+
+@pytest.mark.parametrize('partes', [1, 7])
+def test_topk_keeps_frequent_items(partes):
+    valores = zipf_values(50_000)
+    capacity = 16
+
+    topk = TopK(capacity)
+    for bloco in np.array_split(np.arange(len(valores)), partes):
+        topk = topk.merge(TopK(capacity).add_counts(Counter(valores[i] for i in bloco)))
+
+    reais = Counter(valores)
+    frequentes = [valor for valor, n in reais.items() if n > len(valores) / capacity]
+
+    assert frequentes
+    assert len(topk.counts) <= capacity
+    assert topk.total == len(valores)
+    for valor in frequentes:
+        assert valor in topk.counts
+    for valor, n in topk.counts.items():
+        assert reais[valor] - topk.error_bound() <= n <= reais[valor]
+
+# Com menos valores distintos que a capacidade, as contagens são exatas
+
+def test_topk_exact_below_capacity():
+    contagens = {'Pizza': 5, 'Sushi': 3, 'Kebab': 3}
+    topk = TopK(8).add_counts(contagens).merge(TopK(8).add_counts({'Pizza': 1}))
+
+    assert topk.counts == {'Pizza': 6, 'Sushi': 3, 'Kebab': 3}
+    assert topk.error_bound() == 0
+    assert list(topk.top(2).index) == ['Pizza', 'Kebab']
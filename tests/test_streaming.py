@@ -0,0 +1,101 @@
+#====================================================================================================
+# BIBLIOTECAS
+#====================================================================================================
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from fome_zero import ingest, streaming
+from fome_zero.cube import build_cube, load_cube
+from fome_zero.cuisines import CuisineBridge
+from fome_zero.data import clean_code_vectorized, read_raw
+from fome_zero.geo import GEO_COLUMNS, load_geo_index
+from fome_zero.leaders import build_leaders, load_leaders
+from fome_zero.schema import compact_frame
+from fome_zero.sketches import LEVELS, build_sketches, load_sketches
+from fome_zero.streaming import stream_aggregates
+from fome_zero.tiles import PYRAMID_KEYS, build_pyramid, load_pyramid
+
+#====================================================================================================
+# DADOS DE TESTE
+#====================================================================================================
+
+# O zomato.csv da raiz do projeto (independente de FOME_ZERO_DATA)
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'zomato.csv')
+
+# Blocos pequenos, para que o arquivo passe por vários blocos e por duplicatas entre eles
+CHUNK_ROWS = 1000
+
+@pytest.fixture(scope = 'module')
+def full():
+    return compact_frame(clean_code_vectorized(read_raw(CSV_PATH)))
+
+@pytest.fixture(scope = 'module')
+def streamed():
+    return stream_aggregates(CSV_PATH, CHUNK_ROWS)
+
+#====================================================================================================
+# AGREGADOS EM STREAMING x ARQUIVO INTEIRO
+#====================================================================================================
+
+def test_streamed_cube_matches_full(full, streamed):
+    assert_frame_equal(streamed.cube, build_cube(full, CuisineBridge(full['cuisine_list'])))
+
+def test_streamed_pyramid_matches_full(full, streamed):
+    completa = build_pyramid(full)
+
+    assert_frame_equal(streamed.pyramid[PYRAMID_KEYS + ['restaurants']], completa[PYRAMID_KEYS + ['restaurants']])
+    assert np.allclose(streamed.pyramid[['lat_sum', 'lon_sum']], completa[['lat_sum', 'lon_sum']])
+
+def test_streamed_leaders_match_full(full, streamed):
+    completos = build_leaders(full)
+    por_id = lambda frame: frame.sort_values('restaurant_id').reset_index(drop = True)
+
+    assert_frame_equal(por_id(streamed.leaders.candidates), por_id(completos.candidates), check_dtype = False)
+    assert_frame_equal(streamed.leaders.totals, completos.totals)
+    pd.testing.assert_series_equal(streamed.leaders.votes.sort_index(), completos.votes.sort_index())
+
+def test_streamed_sketches_match_full(full, streamed):
+    completos = build_sketches(full, CuisineBridge(full['cuisine_list']))
+
+    for level in LEVELS:
+        assert streamed.sketches[level].keys() == completos[level].keys()
+        for chave, (hll, _) in completos[level].items():
+            assert np.array_equal(streamed.sketches[level][chave][0].registers, hll.registers)
+
+def test_streamed_geo_matches_full(full, streamed):
+    assert_frame_equal(streamed.geo, full[GEO_COLUMNS].reset_index(drop = True))
+
+#====================================================================================================
+# UMA ÚNICA PASSADA PELO CSV
+#====================================================================================================
+
+# Com o arquivo lido em blocos, todos os carregadores usam a mesma passada
+
+def test_loaders_share_one_pass(tmp_path, monkeypatch):
+    path = str(tmp_path / 'zomato.csv')
+    shutil.copy(CSV_PATH, path)
+
+    passadas = []
+    clean_chunks = ingest.clean_chunks
+
+    def contar(*args, **kwargs):
+        passadas.append(args)
+        return clean_chunks(*args, **kwargs)
+
+    monkeypatch.setattr(ingest, 'STREAM_MIN_BYTES', 0)
+    monkeypatch.setattr(streaming, 'clean_chunks', contar)
+
+    load_cube(path)
+    load_sketches(path)
+    load_pyramid(path)
+    load_leaders(path)
+    load_geo_index(path)
+
+    assert len(passadas) == 1
+    assert not os.path.exists(tmp_path / 'zomato.v4.feather')
@@ -2,122 +2,20 @@
 # BIBLIOTECAS
 #====================================================================================================
 
-import pandas as pd
-import numpy as np
-import inflection
-import folium
-from folium.plugins import MarkerCluster
-from matplotlib import pyplot as plt
 from PIL import Image
-import plotly.express as px
 import streamlit as st
-from streamlit_folium import folium_static
+from streamlit_folium import st_folium
 
-#====================================================================================================
-# FUNÇÕES
-#====================================================================================================
-
-# Renomear e padronizar as colunas
-
-def rename_columns(dataframe):
-    df = dataframe.copy()
-    title = lambda x: inflection.titleize(x)
-    snakecase = lambda x: inflection.underscore(x)
-    spaces = lambda x: x.replace(" ", "")
-    cols_old = list(df.columns)
-    cols_old = list(map(title, cols_old))
-    cols_old = list(map(spaces, cols_old))
-    cols_new = list(map(snakecase, cols_old))
-    df.columns = cols_new
-
-    return df
-
-# Nomear os países por meio do código
-
-COUNTRIES = {
-1: "India",
-14: "Australia",
-30: "Brazil",
-37: "Canada",
-94: "Indonesia",
-148: "New Zeland",
-162: "Philippines",
-166: "Qatar",
-184: "Singapure",
-189: "South Africa",
-191: "Sri Lanka",
-208: "Turkey",
-214: "United Arab Emirates",
-215: "England",
-216: "United States of America",
-}
-
-def country_name(country_id):
-    return COUNTRIES[country_id]
-
-# Categorizar os intervalos de preço
-
-def create_price_tye(price_range):
-    if price_range == 1:
-        return "Cheap"
-    elif price_range == 2:
-        return "Normal"
-    elif price_range == 3:
-        return "Expensive"
-    else:
-        return "Gourmet"
-
-# Nomear as colunas por meio de código
-COLORS = {
-"3F7E00": "darkgreen",
-"5BA829": "green",
-"9ACD32": "lightgreen",
-"CDD614": "orange",
-"FFBA00": "red",
-"CBCBC8": "darkred",
-"FF7800": "darkred",
-}
-
-def color_name(color_code):
-    return COLORS[color_code]
-
-# Limpeza e organização
-
-def clean_code(df):
-    
-    data = df.copy()
-
-    # Renomeando os arquivos
-    data = rename_columns(data)
-
-    # Criação de colunas
-    data['country'] = data.loc[:,'country_code'].apply(lambda x: country_name(x))
-    data['price_type'] = data.loc[:, 'price_range'].apply(lambda x: create_price_tye(x))
-    data['color'] = data.loc[:, 'rating_color'].apply(lambda x: color_name(x))
+from fome_zero import queries, views
+from fome_zero.geo import load_geo_index
+from fome_zero.incremental import bind_session
+from fome_zero.instrument import finish_rerun, span, start_rerun
+from fome_zero.maps import build_tiled_map
+from fome_zero.panel import performance_panel
+from fome_zero.tiles import WORLD_VIEW, load_pyramid, needs_refresh, view_from_map
 
-    # Pegando apenas o primeiro elemento do tipo de cozinha
-    data = data.loc[data['cuisines'].notnull(), :]
-    data['cuisines'] = data.loc[:, 'cuisines'].astype(str).apply(lambda x: x.split(',')[0])
-
-    # Removendo colunas desnecessárias
-    data = data.drop(columns = ['country_code','locality_verbose', 'switch_to_order_menu','rating_color'])
-
-    # Removendo dados duplicados
-    data = data.drop_duplicates(subset='restaurant_id', keep='first')
-    data = data.loc[data['average_cost_for_two'] != 0, :]
-
-    # Resetando o index
-    data = data.reset_index(drop = True)
-    
-    return data
-
-#====================================================================================================
-# CARREGANDO ARQUIVO E FAZENDO LIMPEZA
-#====================================================================================================
-
-df = pd.read_csv('zomato.csv')
-
-data = clean_code(df)
+start_rerun('Home')
+bind_session(st.session_state)
 
 #====================================================================================================
 # SIDEBAR - Topo
@@ -146,17 +44,16 @@ st.sidebar.markdown ('''___''')
 st.sidebar.markdown ('# Filtros')
 
 # País
-paises = list (data['country'].unique())
+with span('carregamento'):
+    paises = queries.country_list()
 country_options = st.sidebar.multiselect('Selecione os países: ', paises, default = paises)
 
-#---------------------------------------------------------
-# Habilidatação dos filtros
-#---------------------------------------------------------
+# Rankings de notas pela nota bayesiana, ponderada pelos votos (fome_zero.ranking)
+notas_bayes = st.sidebar.checkbox('Notas ponderadas pelos votos', value = True)
 
-# Filtro País
+# Indicadores gerais (zerados quando nenhum país está selecionado)
 
-linhas = data['country'].isin(country_options)
-data = data.loc[linhas, :]
+kpis = queries.overview(country_options).iloc[0]
 
 #====================================================================================================
 # SIDEBAR - Final
@@ -169,74 +66,70 @@ st.sidebar.markdown ('###### Data Analyst: Geová Silvério')
 # Layout - Visão Home
 #====================================================================================================
 
-with st.container():
+with st.container(), span('indicadores'):
     
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
                
-        contagem = data['restaurant_id'].nunique()
+        contagem = kpis['restaurants']
         col1.metric('Restaurantes Cadastrados', value = contagem)
                
-        contagem = data.loc[data['has_table_booking'] == 1,:].shape[0]
+        contagem = kpis['table_booking']
         col1.metric('Restaurantes que aceitam reserva', value = contagem)
         
     with col2:
                
-        contagem = data.loc[data['has_online_delivery'] == 1,:].shape[0]
+        contagem = kpis['online_delivery']
         col2.metric('Restaurantes com pedido online', value = contagem)
         
-        contagem = data.loc[data['is_delivering_now'] == 1,:].shape[0]
+        contagem = kpis['delivering_now']
         col2.metric('Restaurantes que fazem entrega', value = contagem)
 
     with col3:
               
-        contagem = data['country'].nunique()
+        contagem = kpis['n_countries']
         col3.metric('Países Cadastrados', value = contagem)
     
-        contagem = data['city'].nunique()
+        contagem = kpis['n_cities']
         col3.metric('Cidades Cadastradas', value = contagem)
         
     with col4:
         
-        contagem = data['cuisines'].nunique()
+        contagem = kpis['n_cuisines']
         col4.metric('Culinárias Ofertadas', value = contagem)
         
-        contagem = data['votes'].sum()
+        contagem = kpis['votes']
         col4.metric('Avaliações feitas na plataforma', value = contagem)
 
-with st.container():
-
-    # Armazenamento dos dados
-
-    datamapa = data[['restaurant_name', 'longitude', 'latitude', 'cuisines', 'average_cost_for_two', 'currency', 'aggregate_rating', 'color']].reset_index(drop = True)
-
-    # Criando o mapa
-    mapa = folium.Map(zoom_start = 15)
+with st.container(), span('mapa'):
 
-    #Criando os clusters
-    cluster = MarkerCluster().add_to(mapa)
+    # Criando o mapa pela área visível: o servidor manda os grupos pré-calculados do zoom atual e,
+    # só com zoom alto, os restaurantes individuais da área (só então as colunas do índice espacial
+    # são carregadas, e filtradas pela área e pelos países antes de qualquer cópia)
+    vista = st.session_state.get('home_mapa_vista', WORLD_VIEW)
+    pontos = lambda: load_geo_index().data
+    with span('montagem'):
+        mapa, area = build_tiled_map(load_pyramid(countries = country_options), vista, country_options, pontos)
 
-    icon = 'fa-cutlery'
+    # Exibindo o mapa; se o usuário mudar o zoom ou sair da área enviada, o mapa é refeito
+    with span('st_folium'):
+        retorno = st_folium(mapa, width = 1024, height = 600, returned_objects = ['zoom', 'bounds'])
 
-    #Colocando os pinos
-    for index, location_info in datamapa.iterrows():
-        folium.Marker([location_info['latitude'],       
-                       location_info['longitude']],
-                       icon = folium.Icon(color=location_info['color'], icon=icon, prefix='fa'),
-                       popup = folium.Popup(f"""<h6> <b> {location_info['restaurant_name']} </b> </h6> <br>
-                                            Cozinha: {location_info['cuisines']} <br>
-                                            Preço médio para dois: {location_info['average_cost_for_two']} ({location_info['currency']}) <br>
-                                            Avaliação: {location_info['aggregate_rating']} / 5.0 <br> """,
-                                            max_width= len(f"{location_info['restaurant_name']}")*20)).add_to(cluster)
+    nova = view_from_map(retorno)
+    if needs_refresh(vista, nova, area):
+        st.session_state['home_mapa_vista'] = nova
+        st.experimental_rerun()
 
-    # Exibindo o mapa
-    folium_static(mapa, width = 1024, height = 600)  
-
-with st.container():
+with st.container(), span('top 10'):
        
     st.markdown('#### Top 10 restaurantes')
     
-    df1 = data[['restaurant_id', 'restaurant_name', 'country', 'city', 'cuisines', 'currency', 'average_cost_for_two', 'aggregate_rating', 'votes']].sort_values(['aggregate_rating', 'restaurant_id'], ascending = [False, True]).reset_index(drop=True).head(10)
-    df1.columns=['ID','Nome','País','Cidade','Culinária', 'Moeda', 'Preço Médio - Prato p/2', 'Avaliação Média', 'Qt. Votos']
-    st.dataframe(df1.style.format(subset=['Preço Médio - Prato p/2', 'Avaliação Média'], formatter="{:.2f}")) 
+    st.dataframe(views.table('home_top10', country_options, bayesian = notas_bayes)) 
+
+#====================================================================================================
+# DESEMPENHO
+#====================================================================================================
+
+finish_rerun()
+performance_panel()